@@ -0,0 +1,69 @@
+"""Benchmark the headless mode of the game
+
+Usage:
+    headless.py [--ticks TICKS] [--repeat REPEAT] [--map MAP]
+
+Options:
+    --ticks TICKS      The number of ticks of each game [default: 500]
+    --repeat REPEAT    The number of games played in each mode [default: 5]
+    --map MAP          The map to play [default: bridge]
+
+Plays the same seeded games with and without the headless mode, checks they
+end in the same state, and reports the time per tick of both modes. Run it
+from the root of the repository with `python -m benchmarks.headless`.
+"""
+import time
+
+from docopt import docopt
+
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+
+
+def play(map_name, ticks, seed, headless):
+    game = Game(
+        "extermination",
+        ["terminator", "sniper", "randoman", "troll"],
+        Map.from_map_name(map_name),
+        initial_zombies=40,
+        minimum_zombies=20,
+        renderer=NoRender(),
+        agent_ids=["0", "1"],
+        headless=headless,
+    )
+    game.reset(seed=seed)
+    for agent in game.agents:
+        agent.set_action({"action_type": "attack_closest"})
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        game.step()
+    elapsed = time.perf_counter() - start
+
+    state = sorted((thing.name, thing.position, thing.life) for thing in game.world.things.values())
+    return elapsed, state
+
+
+def main():
+    arguments = docopt(__doc__)
+    ticks = int(arguments["--ticks"])
+    repeat = int(arguments["--repeat"])
+    map_name = arguments["--map"]
+
+    totals = {False: 0.0, True: 0.0}
+    for seed in range(repeat):
+        states = {}
+        for headless in (False, True):
+            elapsed, states[headless] = play(map_name, ticks, seed, headless)
+            totals[headless] += elapsed
+        if states[False] != states[True]:
+            raise AssertionError(f"The headless game diverged with seed {seed}")
+
+    for headless, label in ((False, "regular"), (True, "headless")):
+        per_tick = totals[headless] / (ticks * repeat) * 1e6
+        print(f"{label:>9}: {per_tick:8.1f} us/tick")
+    print(f"  speedup: {totals[False] / totals[True]:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark the memory used by each kind of entity
+
+Usage:
+    memory.py [--count COUNT]
+
+Options:
+    --count COUNT    The number of entities created of each kind [default: 10000]
+
+Creates many entities of each kind, as on a large map, and reports the memory
+allocated per entity, including its position (measured with tracemalloc). Run it from the root of the
+repository with `python -m benchmarks.memory`.
+"""
+import gc
+import tracemalloc
+
+from docopt import docopt
+
+from zombsole.things import Box, DeadBody, ObjectiveLocation, Wall, Zombie, Player
+
+
+ENTITIES = {
+    "Wall": lambda i: Wall((i, 0)),
+    "Box": lambda i: Box((i, 0)),
+    "ObjectiveLocation": lambda i: ObjectiveLocation((i, 0)),
+    "DeadBody": lambda i: DeadBody('zombie remains', 'green', (i, 0)),
+    "Zombie": lambda i: Zombie((i, 0)),
+    "Player": lambda i: Player('player', 'red', (i, 0)),
+}
+
+
+def measure(create, count):
+    # The positions are created first, so only the entities are measured
+    positions = list(range(count))
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    entities = [create(i) for i in positions]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list holding the entities isn't part of their cost
+    size = end - start - (len(entities) * 8)
+    return size / count
+
+
+def main():
+    arguments = docopt(__doc__)
+    count = int(arguments["--count"])
+    for name, create in ENTITIES.items():
+        print(f"{name:>17}: {measure(create, count):8.1f} bytes/entity")
+
+
+if __name__ == '__main__':
+    main()
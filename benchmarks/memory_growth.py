@@ -0,0 +1,95 @@
+"""Check the memory of a long game doesn't grow
+
+Usage:
+    memory_growth.py [--ticks TICKS] [--warm-up WARM_UP] [--reset-every RESET_EVERY] [--map MAP] [--max-growth MAX_GROWTH] [--event-history TICKS]
+
+Options:
+    --ticks TICKS              The ticks played [default: 2000]
+    --warm-up WARM_UP          The ticks played before measuring the memory
+                               [default: 300]
+    --reset-every RESET_EVERY  Reset the game every this many ticks, like a
+                               long session [default: 500]
+    --map MAP                  The map to play [default: bridge]
+    --max-growth MAX_GROWTH    The growth of the memory traced allowed after
+                               the warm up, in KiB [default: 256]
+    --event-history TICKS      The ticks of events kept by the world, as in
+                               the JSON sessions, or "all" [default: 10]
+
+Plays a long game (not headless, so with events), with a minimum of zombies
+so they keep dying and spawning, resetting it regularly, while tracing the
+memory allocations (see zombsole.memory). Reports the counts of the world and
+the memory traced every 100 ticks, and fails if the memory traced grew more
+than the allowed growth between the end of the warm up and the end. Run it from the root of the repository with
+`python -m benchmarks.memory_growth`.
+"""
+import gc
+import sys
+
+from docopt import docopt
+
+from zombsole.game import Game, Map
+from zombsole.memory import MemoryMonitor
+from zombsole.renderer import NoRender
+
+
+def main():
+    arguments = docopt(__doc__)
+    ticks = int(arguments["--ticks"])
+    warm_up = int(arguments["--warm-up"])
+    reset_every = int(arguments["--reset-every"])
+    max_growth = int(arguments["--max-growth"]) * 1024
+    event_history = None if arguments["--event-history"] == "all" else int(arguments["--event-history"])
+
+    game = Game(
+        "survival",
+        ["terminator", "terminator", "sniper", "sniper"],
+        Map.from_map_name(arguments["--map"]),
+        initial_zombies=60,
+        minimum_zombies=60,
+        renderer=NoRender(),
+        agent_ids=["0"],
+        event_history=event_history,
+    )
+    monitor = MemoryMonitor(interval=100, top=5, trace=True)
+    game.memory_monitor = monitor
+    monitor.start()
+    try:
+        game.reset(seed=0)
+        baseline = None
+        for tick in range(1, ticks + 1):
+            game.agents[0].set_action({"action_type": "attack_closest"})
+            game.step()
+            if tick == warm_up:
+                gc.collect()
+                baseline = monitor.record(game, "warm up")
+            if tick % reset_every == 0 and tick < ticks:
+                game.reset(seed=tick)
+
+        gc.collect()
+        final = monitor.record(game, "end")
+    finally:
+        monitor.stop()
+
+    for report in monitor.reports:
+        print(f"{report['reason']:>7} tick {report['tick']:>4}: "
+              f"{report['tracemalloc']['current'] / 1024:8.1f} KiB traced, "
+              f"{sum(report['things'].values())} things, "
+              f"{sum(report['decorations'].values())} decorations, "
+              f"{report['events']} events, {report['pool']} pooled")
+    print("top allocators at the end:")
+    for allocator in final["tracemalloc"]["top"]:
+        print(f"    {allocator['size'] / 1024:8.1f} KiB in {allocator['count']:>6} blocks: {allocator['location']}")
+
+    if baseline is None:
+        print("the game ended during the warm up, play more ticks than --warm-up")
+        return 1
+    growth = monitor.traced_growth(baseline)
+    print(f"growth since the warm up: {growth / 1024:.1f} KiB (allowed {max_growth / 1024:.1f} KiB)")
+    if growth > max_growth:
+        print("FAILED: the memory grew")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
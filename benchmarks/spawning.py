@@ -0,0 +1,51 @@
+"""Benchmark the zombie spawning of a game
+
+Usage:
+    spawning.py [--zombies ZOMBIES] [--kills KILLS] [--rounds ROUNDS] [--map MAP]
+
+Options:
+    --zombies ZOMBIES  The minimum number of zombies of the game [default: 500]
+    --kills KILLS      The number of zombies killed before each round [default: 10]
+    --rounds ROUNDS    The number of spawning rounds [default: 200]
+    --map MAP          The map to play [default: bridge]
+
+Kills some zombies before each round, and reports the time the game takes to
+spawn zombies back to the minimum. Run it from the root of the repository
+with `python -m benchmarks.spawning`.
+"""
+import time
+
+from docopt import docopt
+
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.things import Zombie
+
+
+def main():
+    arguments = docopt(__doc__)
+    zombies = int(arguments["--zombies"])
+    kills = int(arguments["--kills"])
+    rounds = int(arguments["--rounds"])
+
+    game = Game("survival", [], Map.from_map_name(arguments["--map"]),
+                initial_zombies=zombies, minimum_zombies=zombies,
+                renderer=NoRender(), headless=True)
+    game.reset(seed=0)
+    elapsed = 0.0
+    for _ in range(rounds):
+        victims = [thing for thing in game.world.things.values()
+                   if isinstance(thing, Zombie)][:kills]
+        for zombie in victims:
+            zombie.life = 0
+        game.world.clean_dead_things()
+
+        start = time.perf_counter()
+        game.spawn_zombies_to_maintain_minimum()
+        elapsed += time.perf_counter() - start
+
+    print(f"{elapsed / rounds * 1e6:8.1f} us/round")
+
+
+if __name__ == '__main__':
+    main()
@@ -109,6 +109,7 @@ setup(
         'console_scripts': [
             'zombsole=zombsole.play:play',
             'zombsole-stdio-json=zombsole.interactive_json:play_interactive_json',
+            'zombsole-server=zombsole.interactive_server:serve_interactive_json',
         ],
     },
     project_urls={
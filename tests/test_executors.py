@@ -0,0 +1,97 @@
+# tests/test_executors.py
+import pytest
+from zombsole.core import World
+from zombsole.executors import ProcessExecutor, SerialExecutor, ThreadExecutor, build_executor
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.things import Player
+
+
+class BrokenBot(Player):
+    CONCURRENT_NEXT_STEP = True
+
+    def next_step(self, things, t):
+        raise ValueError("broken bot")
+
+
+class PlanningBot(Player):
+    """Keeps state of its own in its __dict__."""
+    CONCURRENT_NEXT_STEP = True
+
+    def __init__(self, *args, **kwargs):
+        super(PlanningBot, self).__init__(*args, **kwargs)
+        self.calls = 0
+        self.plan = []
+
+    def next_step(self, things, t):
+        self.calls += 1
+        self.plan = [(thing, t) for thing in things.values() if thing is not self]
+        return 'heal', self.plan[0][0]
+
+
+def play(executor):
+    game = Game("extermination", ["terminator", "sniper", "troll", "randoman", "hamster"],
+                Map.from_map_name("bridge"), initial_zombies=20, minimum_zombies=10,
+                renderer=NoRender(), agent_ids=["0"], executor=executor)
+    game.reset(seed=3)
+    states = []
+    for _ in range(40):
+        game.agents[0].set_action({"action_type": "attack_closest"})
+        game.step()
+        states.append(sorted((thing.name, thing.position, thing.life, thing.status)
+                             for thing in game.world.things.values()))
+    if game.executor is not None:
+        game.executor.shutdown()
+    return states
+
+
+@pytest.mark.parametrize("executor", ["serial", "threads:4", "processes:2"])
+def test_executors_play_the_same_game(executor):
+    assert play(executor) == play(None)
+
+
+@pytest.mark.parametrize("executor", [SerialExecutor(), ThreadExecutor(2), ProcessExecutor(2)])
+def test_executor_errors_become_events(executor):
+    world = World((5, 5), debug=False)
+    world.executor = executor
+    bot = BrokenBot("broken", "red", (1, 1))
+    world.spawn_thing(bot)
+    world.spawn_thing(Player("idle", "red", (3, 3)))
+    world.step()
+    assert (0, bot, u'error with next_step: broken bot') in world.events
+
+    world.debug = True
+    with pytest.raises(ValueError):
+        world.step()
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("executor", [ThreadExecutor(2), ProcessExecutor(2)])
+def test_executors_keep_the_state_of_the_bots(executor):
+    world = World((5, 5), debug=True)
+    world.executor = executor
+    bot = PlanningBot("planner", "red", (1, 1))
+    friend = Player("friend", "red", (3, 3))
+    world.spawn_thing(bot)
+    world.spawn_thing(friend)
+    for _ in range(2):
+        world.step()
+    assert bot.calls == 2
+    assert len(bot.plan) == 1 and bot.plan[0][0] is friend and bot.plan[0][1] == 1
+    executor.shutdown()
+
+
+def test_build_executor():
+    assert isinstance(build_executor("threads:3"), ThreadExecutor)
+    assert build_executor("threads:3").workers == 3
+    for executor_id in ["gpu", "threads:0", "processes:x"]:
+        with pytest.raises(ValueError):
+            build_executor(executor_id)
+
+
+def test_bots_opt_in_to_concurrency():
+    from zombsole.players import hamster, randoman, sniper, terminator, troll
+    assert not Player.CONCURRENT_NEXT_STEP
+    assert terminator.Terminator.CONCURRENT_NEXT_STEP and sniper.Sniper.CONCURRENT_NEXT_STEP
+    assert troll.Troll.CONCURRENT_NEXT_STEP
+    assert not randoman.RandoMan.CONCURRENT_NEXT_STEP and not hamster.Hamster.CONCURRENT_NEXT_STEP
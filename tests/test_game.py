@@ -1,7 +1,12 @@
 # tests/test_game.py
+import pickle
+import random
+import threading
 import pytest
 from gymnasium.spaces.discrete import Discrete
+from zombsole.game import Game, Map
 from zombsole.gym_env import ZombsoleGymEnv, ZombsoleGymEnvDiscreteAction
+from zombsole.renderer import NoRender
 from zombsole.things import Zombie
 
 
@@ -147,3 +152,80 @@ def test_discrete_game_closest_attack():
     gym_env.reset()
     assert True
 
+
+
+def play_headless(headless, ticks):
+    game = Game(
+        "extermination",
+        ["terminator", "sniper", "randoman", "troll"],
+        Map.from_map_name("bridge"),
+        initial_zombies=20,
+        minimum_zombies=10,
+        renderer=NoRender(),
+        agent_ids=["0"],
+        headless=headless,
+    )
+    game.reset(seed=3)
+    states = []
+    for t in range(ticks):
+        game.agents[0].set_action({"action_type": ["attack", "heal", "move"][t % 3], "parameter": [1, 0]})
+        game.step()
+        states.append(sorted((thing.name, thing.position, thing.life) for thing in game.world.things.values()))
+    return game, states
+
+
+def test_game_headless_is_identical():
+    game, states = play_headless(False, 80)
+    headless_game, headless_states = play_headless(True, 80)
+    assert headless_states == states
+    assert len(game.world.events) > 0
+    assert headless_game.world.events == []
+
+
+def test_gym_env_headless_without_render_mode():
+    gym_env = ZombsoleGymEnv("extermination", [], "boxed", 0, render_mode=None)
+    assert gym_env.game.headless and gym_env.game.world.headless
+
+
+
+def test_game_random_is_isolated():
+    def play(seed, states):
+        game = Game("extermination", ["terminator", "randoman", "hamster"], Map.from_map_name("bridge"),
+                    initial_zombies=10, renderer=NoRender())
+        game.reset(seed=seed)
+        for _ in range(10):
+            # other code drawing random numbers between the ticks
+            draws.append(random.random())
+            game.step()
+            states.append(sorted((thing.position, thing.life) for thing in game.world.things.values()))
+        return states
+
+    draws = []
+    random.seed(1)
+    expected = play(3, [])
+    assert play(3, []) == expected
+    # the global generator was neither reseeded nor drawn from by the games
+    random.seed(1)
+    assert draws == [random.random() for _ in range(20)]
+
+    # games played at the same time, while another thread draws random numbers
+    stop = threading.Event()
+    noise = threading.Thread(target=lambda: [random.random() for _ in iter(stop.is_set, True)])
+    noise.start()
+    results = [[] for _ in range(3)]
+    threads = [threading.Thread(target=play, args=(3, states)) for states in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    noise.join()
+    assert results == [expected] * 3
+
+
+def test_world_random_is_pickled():
+    game = Game("extermination", ["randoman"], Map.from_map_name("bridge"), initial_zombies=5,
+                renderer=NoRender(), flat_grid=True)
+    world = pickle.loads(pickle.dumps(game.world))
+    assert world.things.random is world.random
+    assert world.random.getstate() == game.random.getstate()
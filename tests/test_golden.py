@@ -0,0 +1,94 @@
+# tests/test_golden.py
+from os import path
+
+import pytest
+from zombsole.core import World
+from zombsole.golden import (Trace, check_traces, default_scenarios, first_divergence,
+                             load_traces, record_trace, save_traces, state_digest)
+from zombsole.things import Box, Wall, Zombie
+
+
+GOLDEN_FILE = path.join(path.dirname(__file__), 'golden', 'traces.json')
+
+
+@pytest.fixture(scope="module")
+def goldens():
+    return load_traces(GOLDEN_FILE)
+
+
+def some_goldens(goldens):
+    return [golden for golden in goldens
+            if golden.scenario.map_name in ("bridge", "city_for_safehouse")]
+
+
+def test_golden_traces_cover_every_map_and_rules(goldens):
+    assert ([golden.scenario.name for golden in goldens] ==
+            [scenario.name for scenario in default_scenarios()])
+
+
+def test_reference_engine_matches_golden_traces(goldens):
+    assert [str(divergence) for divergence in check_traces(goldens)] == []
+
+
+@pytest.mark.parametrize("game_options", [
+    {"flat_grid": True},
+    {"headless": True},
+    {"executor": "threads:2"},
+])
+def test_alternative_engines_match_golden_traces(goldens, game_options):
+    assert [str(divergence)
+            for divergence in check_traces(some_goldens(goldens), **game_options)] == []
+
+
+def test_first_divergence_is_reported(goldens):
+    golden = some_goldens(goldens)[0]
+    changed = Trace.from_dict(golden.to_dict())
+    changed.observations[7] = "00000000"
+    changed.state[9] = "00000000"
+    divergence = first_divergence(golden, changed)
+    assert (divergence.tick, divergence.channel) == (7, "observations")
+    assert str(divergence) == f"{golden.scenario.name} diverges at tick 7 (observations)"
+
+    # the game changed on purpose
+    divergence = first_divergence(golden, record_trace(golden.scenario,
+                                                       action_resolution="simultaneous"))
+    assert divergence is not None
+
+
+def test_traces_round_trip(tmp_path):
+    scenario = default_scenarios(ticks=5)[0]
+    trace = record_trace(scenario, headless=True)
+    assert trace.events is None
+    file_path = str(tmp_path / "traces.json")
+    save_traces(file_path, [trace])
+    loaded, = load_traces(file_path)
+    assert loaded.scenario.to_dict() == scenario.to_dict()
+    assert loaded.state == trace.state
+    assert loaded.events is None
+    assert first_divergence(loaded, trace) is None
+
+
+def test_state_digest_is_independent_of_the_storage():
+    def build_world(things):
+        world = World((4, 4))
+        for thing in things:
+            if isinstance(thing, Zombie):
+                thing.life = 50
+            world.spawn_thing(thing)
+        return world
+
+    # the terrain classes are stored in the order they're added
+    first = build_world([Wall((0, 0)), Box((1, 1)), Zombie((2, 2))])
+    second = build_world([Zombie((2, 2)), Box((1, 1)), Wall((0, 0))])
+    assert first.terrain.classes != second.terrain.classes
+    assert state_digest(first) == state_digest(second)
+
+    # the terrain stored as things, as an alternative engine could
+    third = build_world([Zombie((2, 2))])
+    for thing in [Box((1, 1)), Wall((0, 0))]:
+        third.things[thing.position] = thing
+    assert state_digest(third) == state_digest(first)
+
+    first.terrain.get((1, 1)).life -= 1
+    first.terrain.drop_materialized()
+    assert state_digest(first) != state_digest(second)
@@ -0,0 +1,55 @@
+# tests/test_grid.py
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.grid import FlatGrid
+from zombsole.renderer import NoRender
+from zombsole.things import Box, Wall, Zombie
+from zombsole.utils import adjacent_positions, possible_moves
+
+
+def test_neighbours_handle_bounds():
+    grid = FlatGrid((3, 2))
+    assert grid.index((2, 1)) == 5
+    assert grid.index((3, 0)) is None and grid.index((0, -1)) is None
+    neighbours = grid.neighbours[grid.index((0, 0))]
+    assert [position for _, position in neighbours] == adjacent_positions((0, 0))
+    assert [cell for cell, _ in neighbours] == [3, grid.outside, 1, grid.outside]
+
+
+def test_flat_world_lookups():
+    world = World((5, 5), flat_grid=True)
+    world.spawn_thing(Wall((1, 0)))
+    world.spawn_thing(Box((0, 1)))
+    zombie = Zombie((0, 0))
+    world.spawn_thing(zombie)
+
+    assert world.things.get((0, 0)) is zombie
+    assert isinstance(world.things.get((1, 0)), Wall)
+    assert world.things.get((4, 4)) is None and (4, 4) not in world.things
+    # the positions outside of the world are free, as in the regular mode
+    assert possible_moves(zombie, world.things) == [(0, -1), (-1, 0)]
+
+    world.thing_move(zombie, (0, -1))
+    world.thing_move(zombie, (1, 1))
+    assert zombie.position == (0, 0)
+    del world.things[(0, 0)]
+    assert world.things.get((0, 0)) is None and world.things.grid.cell_count == 25
+
+
+def play(map_name, flat_grid):
+    game = Game("extermination", ["terminator", "sniper", "troll", "hamster"], Map.from_map_name(map_name),
+                initial_zombies=30, minimum_zombies=20, renderer=NoRender(), agent_ids=["0"],
+                flat_grid=flat_grid)
+    game.reset(seed=11)
+    states = []
+    for t in range(100):
+        game.agents[0].set_action({"action_type": ["attack_closest", "move"][t % 2], "parameter": [1, 0]})
+        game.step()
+        states.append([(thing.name, thing.position, thing.life) for thing in game.world.things.values()])
+    return states
+
+
+@pytest.mark.parametrize("map_name", ["bridge", "fort"])
+def test_flat_grid_is_identical(map_name):
+    assert play(map_name, True) == play(map_name, False)
@@ -58,3 +58,98 @@ def test_gym_make_env_v1():
     env = gym.make("jvstinian/Zombsole-SurroundingsView-v0", render_mode=None)
     with not_raises(Exception):
         check_env(env.unwrapped, skip_render_check=True)
+
+def test_step_sequence():
+    gym_env = ZombsoleGymEnv(
+        "extermination",
+        [],
+        "boxed",
+        "0", # agent_id
+        initial_zombies=1,
+        minimum_zombies=0,
+        render_mode=None,
+        debug=True
+    )
+    heal = {"action_type": "heal", "parameter": [0, 0]}
+    transitions = gym_env.step_sequence([heal] * 3, return_all=True)
+    assert len(transitions) == 3
+    assert gym_env.game.world.t == 2
+
+    observation, reward, done, truncated, info = gym_env.step_sequence([heal] * 4)
+    assert info["ticks"] == 4
+    assert gym_env.game.world.t == 6
+    assert observation.shape == gym_env.observation_space.shape
+
+def test_action_repeat():
+    gym_env = ZombsoleGymEnv(
+        "extermination",
+        [],
+        "boxed",
+        "0", # agent_id
+        initial_zombies=1,
+        minimum_zombies=0,
+        render_mode=None,
+        action_repeat=4,
+        debug=True
+    )
+    _, _, _, _, info = gym_env.step({"action_type": "heal", "parameter": [0, 0]})
+    assert info["ticks"] == 4
+    assert gym_env.game.world.t == 3
+
+@pytest.mark.parametrize("scope,position_encoding,channels", [
+    ("world", "simple", 2), ("world", "channels", 4),
+    ("surroundings:11", "simple", 2), ("surroundings:11", "channels", 4),
+])
+def test_observations_objective_distance(scope, position_encoding, channels):
+    gym_env = ZombsoleGymEnv(
+        "safehouse",
+        [],
+        "city_for_safehouse",
+        "0", # agent_id
+        initial_zombies=0,
+        minimum_zombies=0,
+        render_mode=None,
+        observation_scope=scope,
+        observation_position_encoding=position_encoding,
+        observation_objective_distance=True,
+        debug=False
+    )
+    observation = gym_env.get_observation()
+    assert observation.shape[0] == channels
+    assert gym_env.observation_space.contains(observation)
+
+    game = gym_env.game
+    distances = observation[-1]
+    if scope == "world":
+        for objective in game.map.objectives:
+            assert distances[objective[1], objective[0]] == 0
+    else:
+        agent = game.agents[0]
+        expected = game.world.navigation.objective_distance(agent.position)
+        assert distances[5, 5] == min(expected, 255)
+
+def test_objective_distance_evacuation_excludes_observer():
+    gym_env = ZombsoleGymEnv(
+        "evacuation",
+        ["terminator"],
+        "city_for_evacuation",
+        "0", # agent_id
+        initial_zombies=0,
+        minimum_zombies=0,
+        render_mode=None,
+        observation_objective_distance=True,
+        debug=False
+    )
+    observation = gym_env.get_observation()
+    game = gym_env.game
+    agent = game.agents[0]
+    teammate = [player for player in game.players][0]
+    assert observation[-1, teammate.position[1], teammate.position[0]] == 0
+    assert observation[-1, agent.position[1], agent.position[0]] > 0
+
+def test_objective_distance_invalid_rules():
+    with pytest.raises(ValueError):
+        ZombsoleGymEnv(
+            "extermination", [], "bridge", "0",
+            render_mode=None, observation_objective_distance=True
+        )
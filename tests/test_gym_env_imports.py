@@ -1,4 +1,7 @@
 # tests/test_gym_env_imports.py
+import json
+import subprocess
+import sys
 import pytest
 from tests.helpers import not_raises
 
@@ -8,3 +11,36 @@ def test_imports():
         import zombsole.gym_env
         import zombsole.game
 
+
+HEAVY_MODULES = ["cv2", "PIL", "termcolor"]
+
+# Generous budget for importing the environments, which should only cost
+# gymnasium and numpy; loading the rendering backends adds noticeably more
+IMPORT_BUDGET_SECONDS = 2.0
+
+
+def import_in_subprocess(module_name):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module_name}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module_name", [
+    "zombsole.gym_env", "zombsole.gym.multiagent_env", "zombsole.interactive_json", "zombsole.game"
+])
+def test_import_skips_rendering_backends(module_name):
+    result = import_in_subprocess(module_name)
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_renderer_backends_still_importable():
+    from zombsole.renderer import TerminalRenderer, OpencvRenderer, build_renderer
+    assert isinstance(build_renderer("terminal", False, (10, 10), 1), TerminalRenderer)
+    assert isinstance(build_renderer("opencv", False, (10, 10), 1), OpencvRenderer)
@@ -0,0 +1,171 @@
+# tests/test_interactive_json.py
+import io
+import json
+import pytest
+from zombsole import interactive_binary
+from zombsole.interactive_json import GymEnvManager, JsonStdioTransport
+
+
+def json_line(tag, parameters=None):
+    obj = {"tag": tag}
+    if parameters is not None:
+        obj["parameters"] = parameters
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+def json_frame(tag, parameters=None):
+    return interactive_binary.frame(bytes([interactive_binary.FRAME_JSON]) + json_line(tag, parameters))
+
+
+def read_json_lines(data):
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def game_config(agent_ids):
+    return {
+        "rules_name": "extermination",
+        "map_name": "boxed",
+        "players": [],
+        "agent_ids": agent_ids,
+        "initial_zombies": 1,
+        "minimum_zombies": 0,
+    }
+
+
+def run_manager(requests, use_multiagent_env=False):
+    stdout = io.BytesIO()
+    transport = JsonStdioTransport(stdin=io.BytesIO(b"".join(requests)), stdout=stdout)
+    manager = GymEnvManager(None, use_multiagent_env, transport=transport)
+    manager.run()
+    return stdout.getvalue()
+
+
+def test_json_protocol():
+    output = run_manager([
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("StartGame"),
+        json_line("GameAction", {"action_type": "heal", "parameter": [0, 0]}),
+        json_line("Exit"),
+    ])
+    responses = read_json_lines(output)
+    assert [response["tag"] for response in responses] == \
+        ["GameState", "GameState", "GameObservation", "GameObservation", "GameState"]
+    assert len(responses[2]["parameters"]["observation"][0]) == 8
+
+
+def test_timing():
+    timed_action = (json.dumps({"tag": "GameAction", "timing": True,
+                                "parameters": {"action_type": "heal", "parameter": [0, 0]}}) + "\n").encode("utf-8")
+    output = run_manager([
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("StartGame"),
+        timed_action,
+        json_line("GameAction", {"action_type": "heal", "parameter": [0, 0]}),
+        json_line("Exit"),
+    ])
+    responses = read_json_lines(output)
+    assert [response["tag"] for response in responses] == \
+        ["GameState", "GameState", "GameObservation", "GameObservation", "GameObservation", "GameState"]
+    # only the response to the request sent with "timing" has the step time
+    assert [response.get("step_time") is not None for response in responses] == \
+        [False, False, False, True, False, False]
+    assert 0 < responses[3]["step_time"] < 1
+
+
+@pytest.mark.parametrize("use_multiagent_env,compression", [(False, "none"), (False, "zlib"), (True, "zlib")])
+def test_binary_protocol(use_multiagent_env, compression):
+    agent_id = "0" if use_multiagent_env else ""
+    output = run_manager([
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("SetProtocol", {"mode": "binary", "compression": compression}),
+        json_frame("StartGame"),
+        interactive_binary.encode_action_frame([(agent_id, {"action_type": "attack_closest"})]),
+        json_frame("Exit"),
+    ], use_multiagent_env=use_multiagent_env)
+
+    stream = io.BytesIO(output)
+    responses = [json.loads(stream.readline()) for _ in range(3)]
+    assert responses[2] == {"tag": "Protocol", "parameters": {"mode": "binary", "compression": compression}}
+
+    for _ in range(2):
+        body = interactive_binary.read_frame(stream)
+        assert body[0] == interactive_binary.FRAME_OBSERVATION
+        entries = interactive_binary.decode_observation_frame(body)
+        assert len(entries) == 1
+        entry_id, observation, reward, done, truncated = entries[0]
+        assert entry_id == agent_id
+        assert observation.ndim == 3
+
+    body = interactive_binary.read_frame(stream)
+    assert body[0] == interactive_binary.FRAME_JSON
+    assert json.loads(body[1:])["tag"] == "GameState"
+    with pytest.raises(EOFError):
+        interactive_binary.read_frame(stream)
+
+
+@pytest.mark.parametrize("use_multiagent_env", [False, True])
+def test_delta_observations(use_multiagent_env):
+    config = game_config(["0", "1"] if use_multiagent_env else ["0"])
+    config.update({"observation_delta": True, "delta_keyframe_interval": 3, "minimum_zombies": 3})
+    action = {"action_type": "move", "parameter": [1, 0]}
+    if use_multiagent_env:
+        action = {"0": action, "1": {"action_type": "attack_closest"}}
+    output = run_manager(
+        [json_line("GameConfigUpdate", config), json_line("StartGame")]
+        + [json_line("GameAction", action) for _ in range(4)]
+        + [json_line("Resync"), json_line("Exit")],
+        use_multiagent_env=use_multiagent_env
+    )
+    observations = [response["parameters"] for response in read_json_lines(output)
+                    if response["tag"] == "GameObservation"]
+    assert [observation["sequence"] for observation in observations] == [0, 1, 2, 3, 4, 5]
+    assert [observation["keyframe"] for observation in observations] == [True, False, False, True, False, True]
+
+    current = None
+    for observation in observations[:-1]:
+        if observation["keyframe"]:
+            current = observation["observation"]
+        elif use_multiagent_env:
+            for agent_id, rows in observation["observation_delta"].items():
+                for channel, y, row in rows:
+                    current[agent_id][channel][y] = row
+        else:
+            for channel, y, x, value in observation["observation_delta"]:
+                current[channel][y][x] = value
+    assert current == observations[-1]["observation"]
+
+
+@pytest.mark.parametrize("return_mode", ["last", "all"])
+def test_game_action_batch(return_mode):
+    output = run_manager([
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("StartGame"),
+        json_line("GameActionBatch", {"action": {"action_type": "heal"}, "repeat": 3, "return": return_mode}),
+        json_line("Exit"),
+    ])
+    response = read_json_lines(output)[3]
+    if return_mode == "last":
+        assert response["tag"] == "GameObservation"
+        assert response["parameters"]["info"]["ticks"] == 3
+    else:
+        assert response["tag"] == "GameObservationBatch"
+        assert len(response["parameters"]["transitions"]) == 3
+
+
+def test_game_action_batch_binary():
+    output = run_manager([
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("SetProtocol", {"mode": "binary"}),
+        json_frame("StartGame"),
+        json_frame("GameActionBatch", {"actions": [{"action_type": "heal"}] * 2, "return": "all"}),
+        json_frame("Exit"),
+    ])
+    stream = io.BytesIO(output)
+    for _ in range(3):
+        stream.readline()
+    interactive_binary.read_frame(stream)  # StartGame observation
+    header = interactive_binary.read_frame(stream)
+    assert json.loads(header[1:]) == {"tag": "GameObservationBatch", "parameters": {"count": 2}}
+    for _ in range(2):
+        body = interactive_binary.read_frame(stream)
+        assert body[0] == interactive_binary.FRAME_OBSERVATION
@@ -0,0 +1,100 @@
+# tests/test_interactive_server.py
+import asyncio
+import json
+from zombsole.interactive_server import GameSocketServer
+
+
+def request_line(tag, request_id=None, game_id=None, parameters=None):
+    obj = {"tag": tag}
+    for key, value in [("request_id", request_id), ("game_id", game_id), ("parameters", parameters)]:
+        if value is not None:
+            obj[key] = value
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+GAME_CONFIG = {
+    "rules_name": "extermination",
+    "map_name": "boxed",
+    "players": [],
+    "agent_ids": ["0"],
+    "initial_zombies": 1,
+    "minimum_zombies": 0,
+}
+
+
+async def run_client(path, game_id):
+    reader, writer = await asyncio.open_unix_connection(path)
+    # All the requests are pipelined, without waiting for the responses
+    writer.write(b"".join([
+        request_line("GameConfigUpdate", 1, game_id, GAME_CONFIG),
+        request_line("StartGame", 2, game_id),
+        request_line("GameAction", 3, game_id, {"action_type": "heal", "parameter": [0, 0]}),
+        request_line("Exit", 4),
+    ]))
+    await writer.drain()
+    responses = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        responses.append(json.loads(line))
+    writer.close()
+    return responses
+
+
+async def run_clients(path):
+    server = GameSocketServer(False, threads=2)
+    socket_server = await server.start_unix(path)
+    async with socket_server:
+        results = await asyncio.gather(*[run_client(path, game_id) for game_id in [None, None, "g"]])
+    server.close()
+    return results
+
+
+def test_socket_server_pipelining(tmp_path):
+    results = asyncio.run(run_clients(str(tmp_path / "zombsole.sock")))
+    for client_index, responses in enumerate(results):
+        assert responses[0]["tag"] == "GameState"
+        correlated = [(response["request_id"], response["tag"]) for response in responses if "request_id" in response]
+        if client_index < 2:
+            assert correlated == [(1, "GameState"), (2, "GameObservation"), (3, "GameObservation"), (4, "GameState")]
+        else:
+            # The requests of game "g" and the Exit of the default game are handled concurrently
+            assert sorted(correlated) == [(1, "GameState"), (2, "GameObservation"), (3, "GameObservation"),
+                                          (4, "GameState")]
+            assert all(response.get("game_id") == "g" for response in responses
+                       if response.get("request_id") in (1, 2, 3))
+
+
+async def run_unknown_game_client(path):
+    server = GameSocketServer(False, threads=2)
+    socket_server = await server.start_unix(path)
+    async with socket_server:
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"".join([
+            request_line("GameAction", 1, "typo", {"action_type": "heal", "parameter": [0, 0]}),
+            request_line("StartGame", 2, "typo"),
+            request_line("Exit", 3, "typo"),
+            request_line("GameStatus", 4, "typo"),
+            request_line("Exit", 5),
+        ]))
+        await writer.drain()
+        responses = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            responses.append(json.loads(line))
+        writer.close()
+    server.close()
+    return responses
+
+
+def test_socket_server_unknown_games(tmp_path):
+    responses = asyncio.run(run_unknown_game_client(str(tmp_path / "zombsole.sock")))
+    typo = [response for response in responses if response.get("game_id") == "typo"]
+    # no game is created for the requests of an unknown game id
+    assert [(response["request_id"], response["tag"]) for response in typo] == [
+        (1, "Error"), (2, "Error"), (3, "GameState"), (4, "Error")]
+    assert typo[0]["parameters"] == "There is no game with id typo"
+    assert typo[2]["parameters"]["status"] == "exiting"
@@ -0,0 +1,57 @@
+# tests/test_interactive_sessions.py
+import io
+import json
+import pytest
+from zombsole.interactive_json import JsonStdioTransport
+from zombsole.interactive_sessions import GameSessionServer
+
+
+def json_line(tag, game_id=None, parameters=None):
+    obj = {"tag": tag}
+    if game_id is not None:
+        obj["game_id"] = game_id
+    if parameters is not None:
+        obj["parameters"] = parameters
+    return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+def game_config():
+    return {
+        "rules_name": "extermination",
+        "map_name": "boxed",
+        "players": [],
+        "agent_ids": ["0"],
+        "initial_zombies": 1,
+        "minimum_zombies": 0,
+    }
+
+
+@pytest.mark.parametrize("workers", ["none", "thread", "process"])
+def test_multi_game_server(workers):
+    game_ids = ["a", "b", "c"]
+    requests = []
+    for game_id in game_ids:
+        requests.append(json_line("GameConfigUpdate", game_id, game_config()))
+        requests.append(json_line("StartGame", game_id))
+    for game_id in game_ids:
+        requests.append(json_line("GameAction", game_id, {"action_type": "heal", "parameter": [0, 0]}))
+    requests.append(json_line("GameStatus"))
+    requests.append(json_line("Exit", "a"))
+    requests.append(json_line("GameAction", "a", {"action_type": "heal", "parameter": [0, 0]}))
+    requests.append(json_line("Exit"))
+
+    stdout = io.BytesIO()
+    transport = JsonStdioTransport(stdin=io.BytesIO(b"".join(requests)), stdout=stdout)
+    server = GameSessionServer(None, False, transport=transport, workers=workers)
+    server.run()
+
+    responses = [json.loads(line) for line in stdout.getvalue().decode("utf-8").splitlines()]
+    assert responses[0] == {"tag": "Sessions", "parameters": {"game_ids": [], "active": True}}
+    assert responses[-1] == {"tag": "Sessions", "parameters": {"game_ids": [], "active": False}}
+
+    for game_id in game_ids:
+        tags = [response["tag"] for response in responses if response.get("game_id") == game_id]
+        assert tags[:3] == ["GameState", "GameObservation", "GameObservation"]
+        assert tags[3] == "GameState"
+    errors = [response for response in responses if response["tag"] == "Error"]
+    assert [error["game_id"] for error in errors] == ["a"]
@@ -0,0 +1,109 @@
+# tests/test_latency.py
+import time
+import pytest
+from zombsole.core import World
+from zombsole.executors import ThreadExecutor
+from zombsole.game import Game, Map
+from zombsole.latency import LatencyStats, TimeBudgets
+from zombsole.renderer import NoRender
+from zombsole.things import Player
+from zombsole.players.troll import Troll
+
+
+class SlowBot(Player):
+    CONCURRENT_NEXT_STEP = True
+
+    def next_step(self, things, t):
+        time.sleep(0.05)
+        return 'heal', self
+
+
+class SlowBrokenBot(Player):
+    def next_step(self, things, t):
+        time.sleep(0.02)
+        raise KeyError("broken")
+
+
+def test_latency_stats():
+    stats = LatencyStats()
+    for elapsed in range(1, 101):
+        stats.add(elapsed / 1000, overrun=elapsed > 95)
+    assert stats.calls == 100 and stats.overruns == 5
+    assert stats.mean == pytest.approx(0.0505)
+    assert stats.p99 == pytest.approx(0.099) and stats.maximum == pytest.approx(0.1)
+
+
+def test_time_budgets():
+    budgets = TimeBudgets(default=1.0, classes={"Player": 0.5, "Troll": 0.2}, players={"special": 0.1})
+    assert budgets.budget(Troll("troll", "red")) == 0.2
+    assert budgets.budget(Troll("special", "red")) == 0.1
+    assert budgets.budget(SlowBot("slow", "red")) == 0.5
+    assert TimeBudgets().budget(SlowBot("slow", "red")) is None
+
+
+@pytest.mark.parametrize("executor", [None, ThreadExecutor(2)])
+def test_bots_over_budget_are_idle(executor):
+    world = World((5, 5), debug=True)
+    world.executor = executor
+    world.budgets = TimeBudgets(classes={"SlowBot": 0.01})
+    slow = SlowBot("slow", "red", (1, 1))
+    slow.life = 50
+    troll = Troll("troll", "red", (3, 3))
+    world.spawn_thing(slow)
+    world.spawn_thing(troll)
+
+    start = time.perf_counter()
+    world.step()
+    if executor is not None:
+        # the call is abandoned at its deadline
+        assert time.perf_counter() - start < 0.04
+    assert slow.life == 50
+    assert (0, slow, u'exceeded its time budget (10.0 ms), idle') in world.events
+    assert world.latency[slow].overruns == 1
+    assert world.latency[troll].overruns == 0 and world.latency[troll].calls == 1
+    if executor is not None:
+        executor.shutdown()
+
+
+def test_abandoned_calls_without_budget():
+    executor = ThreadExecutor(2)
+    world = World((5, 5), debug=True)
+    world.executor = executor
+    world.budgets = TimeBudgets(classes={"SlowBot": 0.01})
+    slow = SlowBot("slow", "red", (1, 1))
+    world.spawn_thing(slow)
+    world.step()
+
+    # the bot is still busy with the abandoned call, but has no budget now
+    world.budgets = None
+    world.step()
+    assert (1, slow, u'exceeded its time budget, idle') in world.events
+    assert world.latency[slow].overruns == 2
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_errors_over_budget_are_reported(debug):
+    world = World((5, 5), debug=debug)
+    world.budgets = TimeBudgets(classes={"SlowBrokenBot": 0.01})
+    broken = SlowBrokenBot("broken", "red", (1, 1))
+    world.spawn_thing(broken)
+
+    if debug:
+        with pytest.raises(KeyError):
+            world.step()
+    else:
+        world.step()
+        assert (0, broken, u"error with next_step: 'broken'") in world.events
+    assert world.latency[broken].overruns == 1
+
+
+def test_game_latency_stats():
+    game = Game("extermination", ["troll", "sniper"], Map.from_map_name("bridge"),
+                initial_zombies=5, renderer=NoRender(), agent_ids=["0"])
+    for _ in range(3):
+        game.step()
+    stats = game.get_latency_stats()
+    assert [entry["name"] for entry in stats] == ["troll", "sniper", "agent"]
+    assert stats[2]["agent_id"] == "0"
+    assert all(entry["calls"] == 3 and entry["overruns"] == 0 for entry in stats)
@@ -0,0 +1,90 @@
+# tests/test_loadtest.py
+import json
+import pytest
+import os
+from zombsole.loadtest import (
+    PHASES, MultiGameServer, game_config, load_stream, percentile, run_load_test, synthetic_stream
+)
+
+
+def config(agent_ids):
+    return game_config("extermination", "boxed", [], agent_ids, 1, 0)
+
+
+def test_percentile():
+    values = list(range(1, 1001))
+    assert percentile(values, 50) == 500
+    assert percentile(values, 99) == 990
+    assert percentile(values, 99.9) == 999
+    assert percentile([3], 99.9) == 3
+    assert percentile([], 50) is None
+
+
+def test_synthetic_stream():
+    requests = synthetic_stream(config(["0", "1"]), actions=3, multi_agent=True)
+    assert [request["tag"] for request in requests] == [
+        "GameConfigUpdate", "StartGame", "GameAction", "GameAction", "GameAction", "Exit"]
+    assert sorted(requests[2]["parameters"]) == ["0", "1"]
+    assert requests[2]["parameters"]["0"] != requests[2]["parameters"]["1"]
+    assert synthetic_stream(config(["0"]), actions=1)[2]["parameters"] == {"action_type": "attack_closest"}
+
+
+def test_load_stream(tmp_path):
+    stream_path = tmp_path / "stream.jsonl"
+    stream_path.write_text('{"tag": "StartGame", "game_id": "recorded"}\n\n{"tag": "Exit"}\n')
+    assert load_stream(str(stream_path)) == [{"tag": "StartGame"}, {"tag": "Exit"}]
+
+    stream_path.write_text(json.dumps({"tag": "SetProtocol", "parameters": {"mode": "binary"}}) + "\n")
+    with pytest.raises(ValueError):
+        load_stream(str(stream_path))
+
+
+@pytest.mark.parametrize("multi_agent,multi_game", [(False, False), (True, True)])
+def test_run_load_test(multi_agent, multi_game):
+    agent_ids = ["0", "1"] if multi_agent else ["0"]
+    requests = synthetic_stream(config(agent_ids), actions=5, multi_agent=multi_agent)
+    report = run_load_test(requests, sessions=2, multi_agent=multi_agent, multi_game=multi_game)
+
+    stats = report.stats
+    assert stats.errors == 0
+    assert stats.tags() == ["Exit", "GameAction", "GameConfigUpdate", "StartGame"]
+    assert stats.count("GameAction") == 10
+    assert stats.count() == 2 * len(requests) + stats.restarts
+    for phase in PHASES:
+        p50, p99, p999 = stats.percentiles("GameAction", phase)
+        assert 0 <= p50 <= p99 <= p999
+    assert report.throughput > 0
+    assert "GameAction" in report.format()
+
+
+def test_responses_are_routed_by_game_id():
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb") as reader, os.fdopen(write_fd, "wb") as writer, \
+            open(os.devnull, "wb") as sink:
+        writer.write(b'{"tag": "GameState"}\n')
+        writer.flush()
+        server = MultiGameServer(reader, sink)
+        first, second = server.channel("first"), server.channel("second")
+        # the game_id isn't always the last key
+        writer.write(b'{"game_id": "second", "tag": "GameState", "request_id": 2}\n')
+        writer.write(b'{"tag": "Error", "parameters": "oops", "game_id": "first", "step_time": 0.5}\n')
+        writer.write(b'{"tag": "GameState"}\n')
+    response, decode = first.receive()
+    assert response["tag"] == "Error" and response["step_time"] == 0.5 and decode >= 0
+    assert second.receive()[0]["request_id"] == 2
+    server.thread.join()
+    assert server.unrouted == [{"tag": "GameState"}]
+    assert first.address({"tag": "StartGame"}) == {"tag": "StartGame", "game_id": "first"}
+
+
+def test_errors_are_counted():
+    report = run_load_test([{"tag": "GameAction", "parameters": {"action_type": "attack_closest"}},
+                            {"tag": "Exit"}], sessions=1)
+    assert report.stats.errors == 1
+
+
+def test_run_load_test_options():
+    with pytest.raises(ValueError):
+        run_load_test([], sessions=0)
+    with pytest.raises(ValueError):
+        run_load_test([], rate=-1)
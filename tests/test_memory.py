@@ -0,0 +1,91 @@
+# tests/test_memory.py
+import io
+import json
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.interactive_json import SESSION_EVENT_HISTORY, GameConfig, GymEnvManager, JsonStdioTransport
+from zombsole.memory import MemoryMonitor, memory_report
+from zombsole.renderer import NoRender
+from zombsole.things import Zombie
+from tests.test_interactive_json import game_config, json_line, read_json_lines, run_manager
+
+
+def build_game():
+    return Game("survival", ["terminator", "sniper"], Map.from_map_name("bridge"),
+                initial_zombies=20, minimum_zombies=20, renderer=NoRender())
+
+
+def test_memory_report():
+    game = build_game()
+    game.reset(seed=1)
+    for _ in range(5):
+        game.step()
+    report = memory_report(game)
+    assert report["tick"] == 4
+    assert report["things"]["Zombie"] == game.world.zombie_count
+    assert sum(report["things"].values()) == len(game.world.things)
+    assert report["terrain"] > 0
+    assert sum(report["decorations"].values()) == len(game.world.decoration)
+    assert report["events"] == len(game.world.events)
+    json.dumps(report)
+
+
+@pytest.mark.parametrize("event_history", [None, 5])
+def test_event_history(event_history):
+    world = World((10, 3), event_history=event_history)
+    zombie = Zombie((0, 0))
+    world.spawn_thing(zombie)
+    for _ in range(15):
+        world.step()
+    ticks = sorted(set(t for t, _, _ in world.events))
+    if event_history is None:
+        assert ticks == list(range(15))
+    else:
+        assert ticks == list(range(world.t - event_history, world.t + 1))
+
+
+@pytest.mark.parametrize("use_multiagent_env", [False, True])
+def test_session_event_history(use_multiagent_env):
+    transport = JsonStdioTransport(stdin=io.BytesIO(), stdout=io.BytesIO())
+    manager = GymEnvManager(None, use_multiagent_env, transport=transport)
+    manager.set_game_config(GameConfig.from_dict(game_config(["0"])))
+    assert manager.gym_env.game.world.event_history == SESSION_EVENT_HISTORY
+
+
+def test_memory_monitor():
+    game = build_game()
+    monitor = MemoryMonitor(interval=10, top=3, trace=True)
+    game.memory_monitor = monitor
+    monitor.start()
+    try:
+        game.reset(seed=1)
+        for _ in range(25):
+            game.step()
+        game.reset(seed=2)
+    finally:
+        monitor.stop()
+
+    assert [(report["reason"], report["tick"], report["resets"]) for report in monitor.reports] == [
+        ("reset", -1, 1), ("tick", 0, 1), ("tick", 10, 1), ("tick", 20, 1), ("reset", -1, 2)]
+    tracemalloc_report = monitor.last_report["tracemalloc"]
+    assert tracemalloc_report["current"] > 0
+    assert len(tracemalloc_report["top"]) == 3
+    assert monitor.traced_growth() is not None
+
+    with pytest.raises(ValueError):
+        MemoryMonitor(interval=0)
+
+
+def test_game_status_memory_report():
+    responses = read_json_lines(run_manager([
+        json_line("GameStatus"),
+        json_line("GameConfigUpdate", game_config(["0"])),
+        json_line("StartGame"),
+        json_line("GameStatus"),
+        json_line("Exit"),
+    ]))
+    assert "memory" not in responses[1]["parameters"]
+    memory = responses[4]["parameters"]["memory"]
+    assert memory["things"]["Agent"] == 1
+    assert memory["events"] == 0
@@ -154,3 +154,39 @@ def test_multiagent_discrete_action_game(env4p_discrete):
 
     assert True
 
+
+def test_multiagent_step_sequence(env2p):
+    actions = {
+        "0": {"action_type": "heal", "parameter": [0, 0]},
+        "1": {"action_type": "heal", "parameter": [0, 0]},
+    }
+    observations, rewards, done, truncated, info = env2p.step_sequence([actions] * 3)
+    assert info["ticks"] == 3
+    assert env2p.game.world.t == 2
+    assert set(observations) == {"0", "1"}
+    assert set(rewards) == {"0", "1"}
+
+    transitions = env2p.step_sequence([actions] * 2, return_all=True)
+    assert len(transitions) == 2
+    assert env2p.game.world.t == 4
+
+
+def test_objective_distance_observations():
+    env = MultiagentZombsoleEnv(
+        "safehouse",
+        [],
+        "city_for_safehouse",
+        ["0", "1"], # agent_ids
+        initial_zombies=0,
+        minimum_zombies=0,
+        render_mode=None,
+        observation_surroundings_width=21,
+        observation_objective_distance=True,
+        debug=True
+    )
+    observations, _ = env.reset()
+    navigation = env.game.world.navigation
+    for agent in env.game.agents:
+        observation = observations[agent.agent_id]
+        assert observation.shape == (4, 21, 21)
+        assert observation[-1, 10, 10] == min(navigation.objective_distance(agent.position), 255)
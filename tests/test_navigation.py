@@ -0,0 +1,92 @@
+# tests/test_navigation.py
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.navigation import Navigation
+from zombsole.renderer import NoRender
+from zombsole.things import Box
+
+
+# A 5x3 world split in two by a column of obstacles, with one box
+#   . . # . .
+#   . . B . .
+#   . . # . .
+def split_navigation():
+    return Navigation((5, 3), [(2, 0), (2, 1), (2, 2)], objectives=[(4, 1)])
+
+
+def test_components_and_fields():
+    navigation = split_navigation()
+    assert navigation.component_count == 2
+    assert not navigation.connected((0, 0), (4, 0))
+    assert navigation.connected((3, 0), (4, 2))
+    assert navigation.objective_distance((3, 0)) == 2
+    assert navigation.objective_distance((0, 0)) is None
+    assert navigation.walkable_neighbours((1, 1)) == [(1, 2), (1, 0), (0, 1)]
+
+
+def test_paths_are_cached_and_updated():
+    navigation = split_navigation()
+    assert navigation.find_path((0, 1), (4, 1)) is None
+    path = navigation.find_path((3, 0), (4, 2))
+    assert len(path) == 3 and path[-1] == (4, 2)
+    assert ((3, 0), (4, 2), 0) in navigation.paths
+
+    navigation.remove_obstacle((2, 1))
+    assert navigation.version == 1 and navigation.component_count == 2
+    assert navigation.connected((0, 0), (4, 0))
+    # the path which can't be shortened is kept, the unreachable one is dropped
+    assert ((3, 0), (4, 2), 1) in navigation.paths
+    assert ((0, 1), (4, 1), 1) not in navigation.paths
+    assert navigation.find_path((0, 1), (4, 1)) == [(1, 1), (2, 1), (3, 1), (4, 1)]
+    assert navigation.objective_distance((0, 0)) == 5
+
+
+def test_unreachable_goals_next_to_removed_obstacles():
+    # a 5x3 world with two columns of obstacles, the right one unreachable
+    #   . . # # .
+    #   . . # # .
+    #   . . # # .
+    navigation = Navigation((5, 3), [(2, 0), (2, 1), (2, 2), (3, 0), (3, 1), (3, 2)])
+    assert navigation.find_path((0, 1), (3, 1)) is None
+    assert navigation.find_path((0, 0), (4, 0)) is None
+
+    # no components are merged, but the obstacle at (3, 1) can be reached
+    navigation.remove_obstacle((2, 1))
+    assert navigation.component_count == 2
+    assert navigation.find_path((0, 1), (3, 1)) == [(1, 1), (2, 1), (3, 1)]
+    assert ((0, 0), (4, 0), 1) in navigation.paths
+
+
+def test_world_updates_its_navigation():
+    world = World((5, 3), debug=True)
+    for position in [(2, 0), (2, 2)]:
+        world.spawn_thing(Box(position))
+    world.spawn_thing(Box((2, 1)))
+    world.navigation = split_navigation()
+    world.things.get((2, 1)).life = 0
+    world.step()
+    assert world.navigation.is_walkable((2, 1))
+    assert world.navigation.version == 1
+
+
+def test_world_navigation_is_built_lazily():
+    world = World((5, 3), debug=True)
+    for position in [(2, 0), (2, 1), (2, 2)]:
+        world.spawn_thing(Box(position))
+    world.navigation_source = split_navigation
+    world.things.get((2, 1)).life = 0
+    world.step()
+    assert world._navigation is None
+    # the terrain destroyed before is told to the navigation built
+    assert world.navigation.is_walkable((2, 1))
+    assert world.navigation.version == 1
+
+
+def test_game_navigation_is_copied_from_the_map():
+    map_ = Map.from_map_name("maze_for_safehouse")
+    game = Game("safehouse", [], map_, renderer=NoRender(), agent_ids=["0"])
+    game.reset()
+    assert map_.navigation is None
+    assert game.world.navigation is not map_.get_navigation()
+    agent = game.agents[0]
+    assert game.world.navigation.objective_distance(agent.position) is not None
@@ -0,0 +1,50 @@
+# tests/test_pools.py
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.pools import ThingPool
+from zombsole.renderer import NoRender
+from zombsole.things import DeadBody, Zombie, ZombieRemains
+
+
+def test_pool_max_size():
+    pool = ThingPool(max_size=2)
+    zombies = [Zombie() for _ in range(3)]
+    for zombie in zombies:
+        pool.release(zombie)
+    assert len(pool) == 2
+    assert pool.acquire(Zombie) is zombies[1]
+    assert pool.acquire(ZombieRemains) is None
+
+
+def test_dead_zombies_and_remains_are_recycled():
+    world = World((3, 3))
+    zombie = Zombie((1, 1))
+    assert zombie.dead_decoration is None
+    world.spawn_thing(zombie)
+    zombie.life = 0
+    world.clean_dead_things()
+    remains = world.decoration[(1, 1)]
+    assert isinstance(remains, DeadBody) and remains.name == "zombie remains"
+    assert world.pool.acquire(Zombie) is zombie
+
+    # remains covered by other remains are recycled for the next death
+    for position in [(1, 1), (2, 2)]:
+        other = Zombie(position)
+        world.spawn_thing(other)
+        other.life = 0
+        world.clean_dead_things()
+    assert world.decoration[(1, 1)] is not remains
+    assert world.decoration[(2, 2)] is remains
+
+
+def test_survival_game_reaches_steady_state():
+    game = Game("survival", ["terminator", "sniper"], Map.from_map_name("bridge"),
+                initial_zombies=40, minimum_zombies=40, renderer=NoRender(), headless=True)
+    game.reset(seed=0)
+    zombies = set()
+    for _ in range(300):
+        game.step()
+        zombies.update(id(thing) for thing in game.world.things.values() if isinstance(thing, Zombie))
+    assert game.world.zombie_deaths > 0
+    # the dead zombies were revived instead of creating new ones
+    assert len(zombies) == 40
@@ -0,0 +1,74 @@
+# tests/test_profiling.py
+import pstats
+import pytest
+from zombsole.game import Game, Map
+from zombsole.profiling import DeterministicProfiler, SamplingProfiler, build_profiler, profile_call
+from zombsole.renderer import NoRender
+
+
+def play_game():
+    game = Game("extermination", ["terminator", "sniper"], Map.from_map_name("bridge"),
+                initial_zombies=40, renderer=NoRender())
+    game.reset(seed=1)
+    for _ in range(60):
+        game.step()
+    return game.world.t
+
+
+def read_folded(file_path):
+    stacks = []
+    with open(file_path) as stacks_file:
+        for line in stacks_file:
+            frames, weight = line.rsplit(' ', 1)
+            stacks.append((frames.split(';'), int(weight)))
+    return stacks
+
+
+@pytest.mark.parametrize("profiler", ["cprofile", "sampling"])
+def test_profile_call(tmp_path, profiler):
+    file_path = str(tmp_path / "game.prof")
+    assert profile_call(play_game, file_path, profiler=profiler) == 59
+
+    stats = pstats.Stats(file_path)
+    assert any(name == "step" and file_name.endswith("core.py")
+               for file_name, _, name in stats.stats)
+    stacks = read_folded(file_path + ".folded")
+    assert stacks
+    assert any("zombsole.core:step:" in frame
+               for frames, _ in stacks for frame in frames)
+
+
+def test_module_filter(tmp_path):
+    file_path = str(tmp_path / "game.prof")
+    profile_call(play_game, file_path, module_filter="zombsole")
+
+    stats = pstats.Stats(file_path)
+    assert all("zombsole" in file_name for file_name, _, _ in stats.stats)
+    for frames, _ in read_folded(file_path + ".folded"):
+        assert all(frame.startswith("zombsole") for frame in frames)
+
+
+def test_deterministic_stacks_add_up():
+    profiler = DeterministicProfiler()
+    profiler.start()
+    play_game()
+    profiler.stop()
+    own_time = sum(stats[2] for stats in profiler.stats().values())
+    # the time of the stacks dropped (under a microsecond) is small
+    assert sum(profiler.stacks().values()) == pytest.approx(own_time * 1e6, rel=0.05)
+
+
+def test_profile_is_written_on_errors(tmp_path):
+    def broken():
+        raise KeyError("broken")
+
+    file_path = str(tmp_path / "broken.prof")
+    with pytest.raises(KeyError):
+        profile_call(broken, file_path, profiler=SamplingProfiler())
+    pstats.Stats(file_path)
+
+
+def test_build_profiler():
+    assert isinstance(build_profiler("sampling"), SamplingProfiler)
+    with pytest.raises(ValueError):
+        build_profiler("perf")
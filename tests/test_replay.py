@@ -0,0 +1,170 @@
+# tests/test_replay.py
+import pytest
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.replay import Replay, ReplayRecorder, ReplayFormatError
+from zombsole.scheduling import ZombieScheduler
+
+
+def full_state(game):
+    """The state of a game kept by the keyframes, comparable between games."""
+    world = game.world
+    objects = list(world.things.values()) + game.players + game.agents
+
+    def memory(thing):
+        if thing.target_memory is None:
+            return None
+        return sorted((target_class.__name__, target and target.position, chosen_distance, tick)
+                      for target_class, (target, chosen_distance, tick) in thing.target_memory.items()
+                      if target is None or target in objects)
+
+    return {
+        "t": world.t,
+        "deaths": (world.deaths, world.zombie_deaths, world.zombie_count),
+        "terrain": (bytes(world.terrain.kinds), world.terrain.lives.tobytes()),
+        "things": [(type(thing).__name__, thing.position, thing.life, thing.status, thing.weapon.name,
+                    memory(thing)) for thing in objects],
+        "pool": {thing_class.__name__: [thing.life for thing in things]
+                 for thing_class, things in world.pool.free.items() if things},
+        "decoration": [(thing.position, thing.name, thing.color) for thing in world.decoration.values()],
+        "regions": {name: list(region.positions) for name, region in world.spawn_regions.items()},
+        "scheduler": game.zombie_scheduler and sorted(
+            (thing.position, tick) for thing, tick in game.zombie_scheduler.last_actions.items()),
+        "random": game.random.getstate(),
+    }
+
+
+def record_game(file_path, ticks, keyframe_interval, **game_options):
+    game = Game(
+        "extermination",
+        ["terminator", "sniper", "randoman"],
+        Map.from_map_name("bridge"),
+        initial_zombies=20,
+        minimum_zombies=10,
+        renderer=NoRender(),
+        agent_ids=["0"],
+        **game_options
+    )
+    recorder = ReplayRecorder(game, file_path, "bridge", seed=7,
+                              keyframe_interval=keyframe_interval)
+    recorder.start()
+    states = []
+    for _ in range(ticks):
+        game.agents[0].set_action({"action_type": "move", "parameter": [1, 0]})
+        game.step()
+        states.append(sorted((thing.position, thing.life) for thing in game.world.things.values()))
+    recorder.close()
+    return states
+
+
+@pytest.mark.parametrize("keyframe_interval", [0, 25])
+def test_replay_resimulation(tmp_path, keyframe_interval):
+    file_path = str(tmp_path / "game.zsr")
+    states = record_game(file_path, 60, keyframe_interval)
+
+    replay = Replay.load(file_path)
+    assert len(replay) == 60
+    assert replay.seed == 7
+    assert replay.config["map_name"] == "bridge"
+    assert replay.result["ticks"] == 60
+    assert replay.ticks[0].agent_actions[0] == {"action_type": "move", "parameter": [1, 0]}
+
+    for tick, game in enumerate(replay.iter_ticks(start=1), start=1):
+        current = sorted((thing.position, thing.life) for thing in game.world.things.values())
+        assert current == states[tick - 1]
+
+    game = replay.seek(37)
+    assert game.world.t == 36
+    assert sorted((thing.position, thing.life) for thing in game.world.things.values()) == states[36]
+
+
+def test_replay_bad_file(tmp_path):
+    file_path = tmp_path / "not_a_replay.zsr"
+    file_path.write_bytes(b"garbage")
+    with pytest.raises(ReplayFormatError):
+        Replay.load(str(file_path))
+
+
+def test_replay_thing_actions(tmp_path):
+    file_path = str(tmp_path / "game.zsr")
+    record_game(file_path, 20, 0)
+
+    replay = Replay.load(file_path)
+    moves = [(position, target) for tick in replay.ticks
+             for position, action, target in tick.thing_actions
+             if action == "move"]
+    assert moves
+    # the moves are recorded from the position the thing had before moving
+    for (x, y), (target_x, target_y) in moves:
+        assert abs(target_x - x) + abs(target_y - y) == 1
+
+
+def test_replay_keyframes_with_executor(tmp_path):
+    file_path = str(tmp_path / "game.zsr")
+    states = record_game(file_path, 10, 2, executor="threads:2")
+
+    replay = Replay.load(file_path)
+    game = replay.seek(7, game=replay.build_game(executor="threads:2"))
+    assert sorted((thing.position, thing.life) for thing in game.world.things.values()) == states[6]
+    # the world restored from the keyframe uses the services of the game
+    assert game.world.executor is game.executor
+    game.executor.shutdown()
+
+
+@pytest.mark.parametrize("game_options", [
+    {"action_resolution": "simultaneous"},
+    {"targeting": "sticky"},
+    {"zombie_scheduler": ZombieScheduler(near_distance=5, interval=3), "flat_grid": True},
+])
+def test_replay_game_options(tmp_path, game_options):
+    file_path = str(tmp_path / "game.zsr")
+    states = record_game(file_path, 30, 10, **game_options)
+
+    replay = Replay.load(file_path)
+    for tick, game in enumerate(replay.iter_ticks(start=1), start=1):
+        assert sorted((thing.position, thing.life) for thing in game.world.things.values()) == states[tick - 1]
+    game = replay.seek(25)
+    assert sorted((thing.position, thing.life) for thing in game.world.things.values()) == states[24]
+
+
+def test_replay_initial_state_has_no_keyframe(tmp_path):
+    file_path = tmp_path / "game.zsr"
+    record_game(str(file_path), 1, 100)
+
+    replay = Replay.load(str(file_path))
+    assert replay.keyframes == {}
+    assert file_path.stat().st_size < 2000
+    assert replay.seek(1).world.t == 0
+
+
+@pytest.mark.parametrize("game_options", [
+    {},
+    {"targeting": "sticky", "flat_grid": True, "zombie_scheduler": ZombieScheduler(near_distance=5, interval=3)},
+])
+def test_replay_keyframes_rebuild_the_state(tmp_path, monkeypatch, game_options):
+    file_path = str(tmp_path / "game.zsr")
+    game = Game("extermination", ["terminator", "sniper", "randoman"], Map.from_map_name("bridge"),
+                initial_zombies=20, minimum_zombies=10, renderer=NoRender(), agent_ids=["0"],
+                **game_options)
+    recorder = ReplayRecorder(game, file_path, "bridge", seed=3, keyframe_interval=40)
+    recorder.start()
+    states = {}
+    for _ in range(160):
+        game.agents[0].set_action({"action_type": "attack_closest"})
+        game.step()
+        states[game.world.t + 1] = full_state(game)
+    recorder.close()
+    # zombies were recycled
+    assert game.world.pool.free
+
+    # the keyframes are explicit states, never unpickled
+    monkeypatch.setattr("pickle.loads", None)
+    replay = Replay.load(file_path)
+    assert sorted(replay.keyframes) == [40, 80, 120, 160]
+    for tick, keyframe in replay.keyframes.items():
+        # mostly the state of the random number generator
+        assert len(keyframe) < 6000
+        assert full_state(replay.seek(tick)) == states[tick]
+    # the re-simulation from a keyframe matches the recorded game
+    for tick, replayed in enumerate(replay.iter_ticks(start=45, stop=90), start=45):
+        assert full_state(replayed) == states[tick]
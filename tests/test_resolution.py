@@ -0,0 +1,122 @@
+# tests/test_resolution.py
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.resolution import SimultaneousResolver
+from zombsole.things import Box, Player, Zombie
+
+
+def build_world(things, flat_grid=False):
+    world = World((10, 3), debug=False, flat_grid=flat_grid)
+    for thing in things:
+        world.spawn_thing(thing)
+    world.t = 0
+    return world
+
+
+def events(world):
+    return {thing: message for _, thing, message in world.events}
+
+
+def test_contested_cell_blocks_every_move():
+    first = Zombie((0, 0))
+    second = Zombie((2, 0))
+    world = build_world([first, second])
+    SimultaneousResolver().resolve(world, [(first, 'move', (1, 0)),
+                                           (second, 'move', (1, 0))])
+    assert first.position == (0, 0)
+    assert second.position == (2, 0)
+    assert 'contested' in events(world)[first]
+
+
+@pytest.mark.parametrize("flat_grid", [False, True])
+def test_chain_of_moves_succeeds(flat_grid):
+    things = [Zombie((x, 0)) for x in range(3)]
+    world = build_world(things, flat_grid=flat_grid)
+    world.add_spawn_region('row', [(x, 0) for x in range(10)])
+    SimultaneousResolver().resolve(world, [(thing, 'move', (thing.position[0] + 1, 0))
+                                           for thing in things])
+    assert [thing.position for thing in things] == [(1, 0), (2, 0), (3, 0)]
+    assert all(world.things[thing.position] is thing for thing in things)
+    assert (0, 0) not in world.things
+    assert (0, 0) in world.spawn_regions['row']
+    assert (3, 0) not in world.spawn_regions['row']
+
+
+def test_blocked_chains_and_swaps_fail():
+    box = Box((3, 0))
+    first = Zombie((1, 0))
+    second = Zombie((2, 0))
+    left = Zombie((5, 1))
+    right = Zombie((6, 1))
+    world = build_world([box, first, second, left, right])
+    SimultaneousResolver().resolve(world, [(first, 'move', (2, 0)),
+                                           (second, 'move', (3, 0)),
+                                           (left, 'move', (6, 1)),
+                                           (right, 'move', (5, 1))])
+    assert [thing.position for thing in (first, second, left, right)] == [
+        (1, 0), (2, 0), (5, 1), (6, 1)]
+    assert events(world)[second] == 'hit box with his head'
+
+
+def test_damage_is_simultaneous():
+    player = Player("player", "red", (0, 0))
+    zombie = Zombie((1, 0))
+    player.life = 1
+    zombie.life = 1
+    world = build_world([player, zombie])
+    SimultaneousResolver().resolve(world, [(player, 'attack', zombie),
+                                           (zombie, 'attack', player)])
+    # both attacks hit, although any of them kills
+    assert player.life <= 0
+    assert zombie.life <= 0
+    world.clean_dead_things()
+    assert world.things == {}
+
+
+def test_healing_is_capped_before_damage():
+    player = Player("player", "red", (0, 0))
+    medic = Player("medic", "blue", (0, 1))
+    zombie = Zombie((1, 0))
+    player.life = player.MAX_LIFE - 1
+    world = build_world([player, medic, zombie])
+    SimultaneousResolver().resolve(world, [(zombie, 'attack', player),
+                                           (medic, 'heal', player)])
+    damage = player.MAX_LIFE - player.life
+    low, high = zombie.weapon.damage_range
+    assert low <= damage <= high
+    assert events(world)[medic] == 'healed player'
+
+
+def test_invalid_actions():
+    zombie = Zombie((0, 0))
+    world = build_world([zombie])
+    SimultaneousResolver().resolve(world, [(zombie, 'move', [1, 0])])
+    assert events(world)[zombie].startswith('error executing move action')
+    SimultaneousResolver().resolve(world, [(zombie, 'dance', None)])
+    assert events(world)[zombie] == 'unknown action "dance"'
+
+    world.debug = True
+    with pytest.raises(Exception):
+        SimultaneousResolver().resolve(world, [(zombie, 'attack', (1, 0))])
+
+
+@pytest.mark.parametrize("flat_grid", [False, True])
+def test_game_with_simultaneous_resolution(flat_grid):
+    game = Game("extermination", ["terminator", "sniper"], Map.from_map_name("bridge"),
+                initial_zombies=40, renderer=NoRender(), flat_grid=flat_grid,
+                action_resolution="simultaneous")
+    game.reset(seed=1)
+    for _ in range(30):
+        game.step()
+    positions = [thing.position for thing in game.world.things.values()]
+    assert len(positions) == len(set(positions))
+    assert all(game.world.things[thing.position] is thing
+               for thing in game.world.things.values())
+
+
+def test_invalid_action_resolution():
+    with pytest.raises(ValueError):
+        Game("extermination", ["terminator"], Map.from_map_name("bridge"),
+             renderer=NoRender(), action_resolution="random")
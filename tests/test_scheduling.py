@@ -0,0 +1,60 @@
+# tests/test_scheduling.py
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.scheduling import ZombieScheduler
+from zombsole.things import Player, Zombie
+
+
+def acting(scheduler, actors, ticks):
+    return [[thing.name for thing in scheduler.select(actors, t)] for t in range(ticks)]
+
+
+def test_far_zombies_act_less_often():
+    player = Player("player", "red", (0, 0))
+    near = Zombie((3, 0))
+    near.name = "near"
+    far = Zombie((30, 0))
+    far.name = "far"
+    asleep = Zombie((90, 0))
+    asleep.name = "asleep"
+    scheduler = ZombieScheduler(near_distance=5, interval=3, sleep_distance=50)
+    actors = [near, player, far, asleep]
+    assert acting(scheduler, actors, 4) == [
+        ["near", "player", "far"],
+        ["near", "player"],
+        ["near", "player"],
+        ["near", "player", "far"],
+    ]
+
+    # the player going away puts the near zombie to sleep, and wakes the
+    # other one up
+    player.position = (60, 0)
+    assert [[thing.name for thing in scheduler.select(actors, t)] for t in range(4, 7)] == [
+        ["player", "asleep"],
+        ["player"],
+        ["player", "far"],
+    ]
+
+
+def test_scheduler_validation():
+    with pytest.raises(ValueError):
+        ZombieScheduler(interval=0)
+    with pytest.raises(ValueError):
+        ZombieScheduler(near_distance=10, sleep_distance=5)
+
+
+def test_game_with_zombie_scheduler():
+    game = Game("extermination", ["terminator"], Map.from_map_name("bridge"),
+                initial_zombies=40, renderer=NoRender(), headless=True,
+                zombie_scheduler=ZombieScheduler(near_distance=10, interval=4, sleep_distance=40))
+    game.reset(seed=1)
+    positions = {thing: thing.position for thing in game.world.things.values()
+                 if isinstance(thing, Zombie)}
+    game.step()
+    player = game.players[0]
+    for zombie, position in positions.items():
+        if zombie.position != position:
+            # only the zombies not asleep moved
+            assert min(abs(zombie.position[0] - player.position[0]), 100) <= 41
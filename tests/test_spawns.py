@@ -0,0 +1,61 @@
+# tests/test_spawns.py
+import random
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.spawns import FreeCells
+from zombsole.things import Box, Zombie
+
+
+def test_free_cells_sample():
+    random.seed(0)
+    free_cells = FreeCells([(x, 0) for x in range(10)])
+    free_cells.discard((3, 0))
+    free_cells.discard((3, 0))
+    free_cells.add((0, 0))
+    assert len(free_cells) == 9 and (3, 0) not in free_cells
+
+    sample = free_cells.sample(4)
+    assert len(set(sample)) == 4 and (3, 0) not in sample
+    # the index is still consistent after the partial shuffle
+    assert all(free_cells.positions[index] == position
+               for position, index in free_cells.slots.items())
+    assert sorted(free_cells.sample(20)) == sorted(set(free_cells.positions))
+
+
+@pytest.mark.parametrize("flat_grid", [False, True])
+def test_spawn_region_updates(flat_grid):
+    world = World((3, 1), flat_grid=flat_grid)
+    world.spawn_thing(Box((2, 0)))
+    region = world.add_spawn_region('zombies', [(0, 0), (1, 0), (2, 0)])
+    assert sorted(region.positions) == [(0, 0), (1, 0)]
+
+    zombie = Zombie()
+    world.spawn_in_region([zombie], 'zombies')
+    assert zombie.position not in region and len(region) == 1
+
+    world.thing_move(zombie, (1, 0) if zombie.position == (0, 0) else (0, 0))
+    assert zombie.position not in region and len(region) == 1
+
+    zombie.life = 0
+    world.terrain.get((2, 0)).life = 0
+    world.clean_dead_things()
+    assert sorted(region.positions) == [(0, 0), (1, 0), (2, 0)]
+    assert world.zombie_count == 0
+
+    with pytest.raises(Exception):
+        world.spawn_in_region([Zombie() for _ in range(4)], 'zombies')
+
+
+def test_minimum_zombies_maintained():
+    game = Game("extermination", [], Map.from_map_name("bridge"),
+                initial_zombies=0, minimum_zombies=30, renderer=NoRender(),
+                agent_ids=["0"], headless=True)
+    for _ in range(20):
+        game.step()
+        zombies = [thing for thing in game.world.things.values() if isinstance(thing, Zombie)]
+        assert len(zombies) == game.world.zombie_count == 30
+        free = [position for position in game.map.zombie_spawns
+                if position not in game.world.things]
+        assert sorted(game.world.spawn_regions['zombies'].positions) == sorted(free)
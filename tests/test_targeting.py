@@ -0,0 +1,112 @@
+# tests/test_targeting.py
+import pytest
+from zombsole.core import World
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+from zombsole.targeting import sticky_closest
+from zombsole.things import Player, Zombie
+
+
+def build_world(sticky_targeting=True):
+    world = World((20, 3), sticky_targeting=sticky_targeting)
+    player = Player("player", "red", (0, 0))
+    first = Zombie((5, 0))
+    second = Zombie((8, 0))
+    for thing in [player, first, second]:
+        world.spawn_thing(thing)
+    return world, player, first, second
+
+
+def teleport(world, thing, position):
+    del world.things[thing.position]
+    thing.position = position
+    world.things[position] = thing
+
+
+def test_target_is_kept_within_hysteresis_band():
+    world, player, first, second = build_world()
+    assert sticky_closest(player, world.things, 0, Zombie) is first
+
+    # a closer zombie isn't noticed until the refresh
+    teleport(world, second, (1, 0))
+    assert sticky_closest(player, world.things, 1, Zombie) is first
+    assert sticky_closest(player, world.things, Player.TARGET_REFRESH_INTERVAL, Zombie) is second
+
+
+def test_target_is_searched_again():
+    world, player, first, second = build_world()
+    assert sticky_closest(player, world.things, 0, Zombie) is first
+
+    # the target moving out of the band
+    teleport(world, first, (5 + int(Player.TARGET_HYSTERESIS) + 5, 0))
+    assert sticky_closest(player, world.things, 1, Zombie) is second
+
+    # the target dying
+    second.life = 0
+    world.clean_dead_things()
+    assert sticky_closest(player, world.things, 2, Zombie) is first
+
+    # another target class
+    assert sticky_closest(first, world.things, 2, Player) is player
+    assert sticky_closest(player, world.things, 2, Player, exclude=player) is None
+
+
+def test_no_target_is_remembered_until_refresh():
+    world = World((10, 1), sticky_targeting=True)
+    player = Player("player", "red", (0, 0))
+    world.spawn_thing(player)
+    assert sticky_closest(player, world.things, 0, Zombie) is None
+    world.spawn_thing(Zombie((5, 0)))
+    assert sticky_closest(player, world.things, 1, Zombie) is None
+    assert sticky_closest(player, world.things, Player.TARGET_REFRESH_INTERVAL, Zombie) is not None
+
+
+def test_refresh_every_tick():
+    class Picky(Player):
+        TARGET_REFRESH_INTERVAL = 1
+
+    world, _, first, second = build_world()
+    picky = Picky("picky", "red", (12, 0))
+    world.spawn_thing(picky)
+    assert sticky_closest(picky, world.things, 0, Zombie) is second
+    teleport(world, first, (11, 0))
+    assert sticky_closest(picky, world.things, 1, Zombie) is first
+
+
+def test_targets_are_remembered_by_class():
+    world, player, first, second = build_world()
+    medic = Player("medic", "blue", (0, 1))
+    world.spawn_thing(medic)
+
+    # alternating attacks and heals, like the attack_closest and heal_closest
+    # actions of an agent
+    assert sticky_closest(player, world.things, 0, Zombie) is first
+    assert sticky_closest(player, world.things, 0, Player, exclude=player) is medic
+    teleport(world, second, (1, 0))
+    assert sticky_closest(player, world.things, 1, Zombie) is first
+    assert sticky_closest(player, world.things, 1, Player, exclude=player) is medic
+    assert player.target_memory[Zombie] == (first, 5, 0)
+    assert player.target_memory[Player][0] is medic
+
+
+def test_closest_target_without_memory():
+    world, player, first, second = build_world(sticky_targeting=False)
+    assert sticky_closest(player, world.things, 0, Zombie) is first
+    teleport(world, second, (1, 0))
+    assert sticky_closest(player, world.things, 1, Zombie) is second
+    assert player.target_memory is None
+
+
+def test_game_targeting():
+    def zombie_memories(targeting):
+        game = Game("extermination", ["sniper"], Map.from_map_name("bridge"), initial_zombies=5,
+                    minimum_zombies=5, renderer=NoRender(), targeting=targeting)
+        game.reset(seed=1)
+        for _ in range(3):
+            game.step()
+        return [thing.target_memory for thing in game.world.things.values() if isinstance(thing, Zombie)]
+
+    assert all(memory is None for memory in zombie_memories("closest"))
+    assert all(Player in memory for memory in zombie_memories("sticky"))
+    with pytest.raises(ValueError):
+        Game("extermination", [], Map.from_map_name("bridge"), renderer=NoRender(), targeting="random")
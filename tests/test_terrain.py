@@ -0,0 +1,55 @@
+# tests/test_terrain.py
+from zombsole.core import World
+from zombsole.players.agent import Agent
+from zombsole.things import Box, Wall, Zombie
+from zombsole.weapons import Rifle
+
+
+def test_terrain_is_not_iterated_but_found():
+    world = World((5, 5), debug=True)
+    world.spawn_thing(Wall((0, 0)))
+    world.spawn_thing(Box((1, 0)))
+    zombie = Zombie((2, 2))
+    world.spawn_thing(zombie)
+
+    assert list(world.things.values()) == [zombie]
+    assert (0, 0) in world.things and (1, 0) in world.things and (3, 3) not in world.things
+    assert world.things.get((3, 3)) is None
+    wall = world.things.get((0, 0))
+    assert isinstance(wall, Wall) and wall.position == (0, 0) and wall.life == Wall.MAX_LIFE
+    # materialized things are kept until the end of the tick
+    assert world.things[(0, 0)] is wall
+
+
+def test_terrain_damage_is_dropped_back_into_the_grid():
+    world = World((5, 5), debug=True)
+    world.spawn_thing(Box((1, 0)))
+    world.spawn_thing(Wall((0, 0)))
+
+    world.things.get((1, 0)).life -= 4
+    world.things.get((0, 0)).life = 0
+    world.step()
+
+    assert world.terrain.materialized == {}
+    assert world.terrain.life((1, 0)) == Box.MAX_LIFE - 4
+    assert world.things.get((1, 0)).life == Box.MAX_LIFE - 4
+    assert (0, 0) not in world.things
+    assert world.deaths == 1
+    assert [message for t, thing, message in world.events] == [u'died']
+
+
+def test_agent_destroys_box():
+    world = World((5, 5), debug=True)
+    world.spawn_thing(Box((2, 1)))
+    agent = Agent("0", "blue", position=(1, 1), weapon=Rifle())
+    world.spawn_thing(agent)
+
+    agent.set_action({"action_type": "attack", "parameter": [1, 0]})
+    world.step()
+
+    assert (2, 1) not in world.things
+    assert world.terrain.materialized == {}
+    assert world.deaths == 1
+    agent.set_action({"action_type": "move", "parameter": [1, 0]})
+    world.step()
+    assert agent.position == (2, 1)
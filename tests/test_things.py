@@ -0,0 +1,39 @@
+# tests/test_things.py
+import pickle
+import pytest
+from zombsole.things import Box, DeadBody, ObjectiveLocation, Wall, Zombie, ZombieRemains, Player
+from zombsole.weapons import Rifle, WeaponFactory, ZombieClaws
+
+
+@pytest.mark.parametrize("thing", [
+    Wall((0, 0)), Box((0, 0)), ObjectiveLocation((0, 0)), DeadBody("dead", "red", (0, 0)), ZombieRemains((0, 0)),
+    Zombie((0, 0)), Player("player", "red", (0, 0)),
+])
+def test_things_have_no_dict(thing):
+    assert not hasattr(thing, "__dict__")
+    copied = pickle.loads(pickle.dumps(thing))
+    assert (copied.name, copied.position, copied.life) == (thing.name, thing.position, thing.life)
+
+
+def test_weapons_are_shared_and_immutable():
+    assert Zombie((0, 0)).weapon is Zombie((1, 0)).weapon is ZombieClaws()
+    assert WeaponFactory.create_player_weapon("rifle") is Rifle()
+    assert pickle.loads(pickle.dumps(Rifle())) is Rifle()
+    with pytest.raises(AttributeError):
+        Rifle().max_range = 100
+
+
+def test_randoman_targets_the_terrain():
+    from zombsole.core import World
+    from zombsole.players.randoman import RandoMan
+    world = World((3, 3), debug=True)
+    world.spawn_thing(Wall((0, 0)))
+    randoman = RandoMan("randoman", "red", (1, 1))
+    world.spawn_thing(randoman)
+
+    targets = set()
+    for _ in range(50):
+        action, target = randoman.next_step(world.things, 0)
+        if action != 'move':
+            targets.add(type(target))
+    assert targets == {Wall, RandoMan}
@@ -0,0 +1,80 @@
+# tests/test_tournament.py
+import pytest
+from zombsole.play import parse_player_names
+from zombsole.tournament import (MIN_GAMES, ResultCache, TournamentStats, play_game,
+                                 run_tournament, wilson_interval)
+
+
+CONFIG = {
+    "rules_name": "extermination",
+    "player_names": ["terminator", "terminator", "sniper"],
+    "map_name": "hallway",
+    "size": None,
+    "initial_zombies": 10,
+    "minimum_zombies": 0,
+    "max_ticks": 200,
+}
+
+
+def test_play_game_is_seeded():
+    result = play_game(CONFIG, 3)
+    assert result == play_game(CONFIG, 3)
+    assert set(result) == {"won", "capped", "ticks", "survivors"}
+    assert 0 < result["ticks"] <= CONFIG["max_ticks"]
+
+
+def test_capped_games_are_not_won():
+    config = dict(CONFIG, rules_name="survival", max_ticks=5)
+    assert play_game(config, 0) == {"won": False, "capped": True, "ticks": 5, "survivors": 3}
+
+
+def test_stats():
+    results = [{"won": index % 4 != 0, "capped": False, "ticks": 10 + index % 3,
+                "survivors": 2} for index in range(40)]
+    stats = TournamentStats(results)
+    assert stats.games == 40
+    assert stats.win_rate == 0.75
+    low, high = stats.win_rate_interval
+    assert low < 0.75 < high
+    assert stats.survivors_interval == (2.0, 2.0)
+    assert stats.is_tight(0.2)
+    assert not stats.is_tight(0.05)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(10, 10)[1] == 1.0
+
+
+def test_tournament_stops_early_and_caches_results(tmp_path):
+    progress = []
+    stats = run_tournament(CONFIG, 200, precision=0.5, cache_dir=str(tmp_path),
+                           progress=progress.append)
+    assert stats.games == MIN_GAMES
+    assert len(progress) == 1
+
+    cache = ResultCache(str(tmp_path), CONFIG)
+    assert sorted(cache.results) == list(range(MIN_GAMES))
+    assert cache.get(4) == play_game(CONFIG, 4)
+    # a new code version doesn't use the cached results
+    assert ResultCache(str(tmp_path), CONFIG, version="0.0.0").results == {}
+
+    # the cached games aren't played again
+    cache.add(0, {"won": False, "capped": True, "ticks": 1, "survivors": 0})
+    cache.save()
+    stats = run_tournament(CONFIG, MIN_GAMES, cache_dir=str(tmp_path))
+    assert stats.capped == 1
+
+
+def test_tournament_in_processes():
+    serial = run_tournament(CONFIG, 8)
+    parallel = run_tournament(CONFIG, 8, jobs=2)
+    assert parallel.to_dict() == serial.to_dict()
+
+
+def test_tournament_validation():
+    with pytest.raises(ValueError):
+        run_tournament(CONFIG, 0)
+    with pytest.raises(ValueError):
+        run_tournament(CONFIG, 10, jobs=0)
+
+
+def test_parse_player_names():
+    assert parse_player_names("terminator:2,sniper") == ["terminator", "terminator", "sniper"]
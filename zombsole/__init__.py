@@ -1,3 +1,3 @@
 
-__version__ = "0.13.2"
+__version__ = "0.38.0"
 
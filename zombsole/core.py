@@ -1,25 +1,225 @@
 # coding: utf-8
 import random
+from time import perf_counter
 
-from zombsole.utils import distance
+from zombsole.grid import FlatGrid
+from zombsole.latency import BudgetExceeded, LatencyStats
+from zombsole.pools import ThingPool
+from zombsole.spawns import FreeCells
+from zombsole.terrain import Terrain
+from zombsole.utils import adjacent_positions, distance
 
 
 DEFAULT_COLOR = 'white'
 HEALING_RANGE = 3
 
+class WorldThings(dict):
+    """The things of a world, by position.
+
+       The static terrain (walls and boxes) isn't stored in the dict, but it
+       is found by get, [] and in, which materialize the static thing of the
+       position if needed. Iterating (and len) only covers the other things.
+
+       The random number generator of the world is passed along (as random),
+       for the bots drawing random numbers. It's None in the snapshots of the
+       executors, as the bots run concurrently don't draw any.
+    """
+    __slots__ = ('terrain', 'random')
+
+    def __init__(self, terrain, rng=None):
+        super(WorldThings, self).__init__()
+        self.terrain = terrain
+        self.random = rng
+
+    def __missing__(self, position):
+        thing = self.terrain.get(position)
+        if thing is None:
+            raise KeyError(position)
+        return thing
+
+    def get(self, position, default=None):
+        thing = dict.get(self, position)
+        if thing is None:
+            thing = self.terrain.get(position)
+            if thing is None:
+                return default
+        return thing
+
+    def __contains__(self, position):
+        return dict.__contains__(self, position) or position in self.terrain
+
+
+class FlatWorldThings(WorldThings):
+    """The things of a world in the flat grid mode, by position.
+
+       The things are also stored in a list indexed by cell (see
+       zombsole.grid), which is used for the lookups, while the dict keeps
+       the same iteration order as in the regular mode.
+    """
+    __slots__ = ('grid', 'cells')
+
+    def __init__(self, terrain, grid, rng=None):
+        super(FlatWorldThings, self).__init__(terrain, rng)
+        self.grid = grid
+        self.cells = [None] * (grid.cell_count + 1)
+
+    def __reduce__(self):
+        # the grid is needed before the things are set again
+        return (FlatWorldThings, (self.terrain, self.grid, self.random), None, None,
+                iter(dict.items(self)))
+
+    def __setitem__(self, position, thing):
+        dict.__setitem__(self, position, thing)
+        index = self.grid.index(position)
+        if index is not None:
+            self.cells[index] = thing
+
+    def __delitem__(self, position):
+        dict.__delitem__(self, position)
+        index = self.grid.index(position)
+        if index is not None:
+            self.cells[index] = None
+
+    def get(self, position, default=None):
+        # the index is computed inline, as this is the hottest lookup
+        x, y = position
+        width = self.grid.width
+        if not (0 <= x < width and 0 <= y < self.grid.height):
+            return dict.get(self, position, default)
+        index = y * width + x
+        thing = self.cells[index]
+        if thing is None:
+            if not self.terrain.kinds[index]:
+                return default
+            thing = self.terrain.get(position)
+        return thing
+
+    def __contains__(self, position):
+        x, y = position
+        width = self.grid.width
+        if not (0 <= x < width and 0 <= y < self.grid.height):
+            return dict.__contains__(self, position)
+        index = y * width + x
+        return self.cells[index] is not None or self.terrain.kinds[index] != 0
+
+    def free_moves(self, position):
+        """The adjacent positions (as in possible_moves) not occupied."""
+        index = self.grid.index(position)
+        if index is None:
+            return [adjacent for adjacent in adjacent_positions(position)
+                    if adjacent not in self]
+        cells = self.cells
+        kinds = self.terrain.kinds
+        return [neighbour for cell, neighbour in self.grid.neighbours[index]
+                if cells[cell] is None and not kinds[cell]]
+
+
 class World(object):
-    """World where to play the game."""
-    def __init__(self, size, debug=True):
+    """World where to play the game.
+
+       In headless mode, the cosmetic work of each tick is skipped: no events
+       are logged, the action results aren't formatted, and the things don't
+       format their status. The game itself is unchanged.
+
+       In flat grid mode, the things are also stored in a list indexed by
+       cell, with precomputed neighbours (see zombsole.grid), making lookups
+       and possible_moves cheaper. The game itself is unchanged.
+
+       With an event_history, only the events of the last event_history
+       ticks are kept, so long games don't accumulate them. All the events
+       are kept by default.
+
+       With sticky_targeting, the fighting things spawned get a target memory
+       (see zombsole.targeting), which changes the game. Without it, they
+       search their closest target every tick.
+
+       Every random number of the world (spawns, damage, zombies and bots)
+       is drawn from its own generator, rng (a random.Random, a new one if
+       not given), which the bots get as things.random.
+    """
+    def __init__(self, size, debug=True, headless=False, flat_grid=False,
+                 event_history=None, sticky_targeting=False, rng=None):
         self.size = size
         self.debug = debug
-        self.things = {}
+        self.headless = headless
+        self.flat_grid = flat_grid
+        self.event_history = event_history
+        self.sticky_targeting = sticky_targeting
+        self.random = rng if rng is not None else random.Random()
+        self.terrain = Terrain(size, headless=headless)
+        if flat_grid:
+            self.grid = FlatGrid(size)
+            self.things = FlatWorldThings(self.terrain, self.grid, self.random)
+        else:
+            self.grid = None
+            self.things = WorldThings(self.terrain, self.random)
         self.decoration = {}
         self.t = -1
         self.events = []
+        # The actions of the last tick, as (thing, position, action,
+        # parameter) tuples, with the positions the things had when they
+        # chose them
+        self.last_actions = []
+        # Optional navigation (see zombsole.navigation), told about the
+        # destroyed terrain. It's either set, or built on first access from
+        # the navigation_source (a function returning the navigation of the
+        # map, which is copied), as most games never use it
+        self._navigation = None
+        self.navigation_source = None
+        # The terrain destroyed before the navigation is built
+        self.destroyed_terrain = []
+        # Optional executor of the next_step calls (see zombsole.executors),
+        # they are made one after another if not set
+        self.executor = None
+        # Optional time budgets of the next_step calls (see zombsole.latency),
+        # and the latency statistics of the timed things
+        self.budgets = None
+        self.latency = {}
+        # Optional scheduler choosing the things asked for actions in each
+        # tick (see zombsole.scheduling), all of them if not set
+        self.scheduler = None
+        # Optional resolver applying all the actions of a tick at once (see
+        # zombsole.resolution), they are shuffled and applied one after
+        # another if not set
+        self.resolver = None
+        # Free cells of the spawn regions (see zombsole.spawns) by name, and
+        # the regions each of their positions belongs to
+        self.spawn_regions = {}
+        self.spawn_cells = {}
+        # Dead things to recycle (see zombsole.pools)
+        self.pool = ThingPool()
         self.deaths = 0
         self.zombie_deaths = 0
+        self.zombie_count = 0
         # self.player_deaths = 0 # To enable these, refactor might be best, as currently things imports core, so referencing Player creates a circular dependency
         # self.agent_deaths = 0
+
+    # The runtime services of a world, set by its game, which aren't part of
+    # its state (and can't always be pickled, like executors)
+    SERVICES = ('executor', 'budgets', 'scheduler', 'resolver', 'navigation_source')
+
+    def __getstate__(self):
+        """The state of the world (as pickled), without the runtime services
+           and the latency statistics."""
+        state = self.__dict__.copy()
+        for name in self.SERVICES:
+            state[name] = None
+        state['latency'] = {}
+        return state
+
+    @property
+    def navigation(self):
+        if self._navigation is None and self.navigation_source is not None:
+            navigation = self.navigation_source().copy()
+            for position in self.destroyed_terrain:
+                navigation.remove_obstacle(position)
+            self.destroyed_terrain = []
+            self._navigation = navigation
+        return self._navigation
+
+    @navigation.setter
+    def navigation(self, navigation):
+        self._navigation = navigation
     
     def spawn_thing(self, thing):
         """Add a thing to the world, or to the decoration layer.
@@ -27,54 +227,126 @@ class World(object):
            The thing will be spawned into the position it has in its .position
            attribute.
         """
+        if self.headless:
+            thing.headless = True
+        if isinstance(thing, FightingThing):
+            self.arm(thing)
+            if self.sticky_targeting and thing.target_memory is None:
+                thing.target_memory = {}
+
         if thing.is_decoration:
+            # a pooled decoration covered by the new one can be recycled
+            other = self.decoration.get(thing.position)
+            if other is not None and other is not thing and other.POOLED:
+                self.pool.release(other)
             self.decoration[thing.position] = thing
         else:
             other = self.things.get(thing.position)
             if other is None:
-                self.things[thing.position] = thing
+                if thing.TERRAIN:
+                    self.terrain.add(thing)
+                else:
+                    self.things[thing.position] = thing
+                    if getattr(thing, "name", "") == "zombie":
+                        self.zombie_count += 1
+                self.occupy(thing.position)
             else:
                 message = u"Can't place %s in a position occupied by %s."
                 raise Exception(message % (thing.name, other.name))
 
+    def add_spawn_region(self, name, positions=None):
+        """Index the free cells of a spawn region (all the world positions if
+           none are provided), kept up to date as things spawn, move and die.
+        """
+        if not positions:
+            positions = [(x, y)
+                         for x in range(self.size[0])
+                         for y in range(self.size[1])]
+        region = FreeCells(position for position in positions
+                           if position not in self.things)
+        for position in set(positions):
+            self.spawn_cells.setdefault(position, []).append(region)
+        self.spawn_regions[name] = region
+        return region
+
+    def arm(self, thing):
+        """Give a random weapon to a fighting thing created without one."""
+        if thing.weapon is None and thing.RANDOM_WEAPONS:
+            thing.weapon = self.random.choice(thing.RANDOM_WEAPONS)()
+
+    def occupy(self, position):
+        """Remove a position from the free cells of its spawn regions."""
+        regions = self.spawn_cells.get(position)
+        if regions:
+            for region in regions:
+                region.discard(position)
+
+    def vacate(self, position):
+        """Add a position to the free cells of its spawn regions."""
+        regions = self.spawn_cells.get(position)
+        if regions:
+            for region in regions:
+                region.add(position)
+
+    def spawn_in_region(self, things, name, fail_if_cant=True):
+        """Spawn a group of things in random free cells of a spawn region."""
+        self._spawn_in_free_cells(things, self.spawn_regions[name], fail_if_cant)
+
     def spawn_in_random(self, things, possible_positions=None,
                         fail_if_cant=True):
         """Spawn a group of things  in random positions."""
-        # if no positions provided, use all the world positions
+        # if no positions provided, use all the world positions (indexed the
+        # first time)
         if not possible_positions:
-            spawns = [(x, y)
-                      for x in range(self.size[0])
-                      for y in range(self.size[1])]
+            region = self.spawn_regions.get(None)
+            if region is None:
+                region = self.add_spawn_region(None)
         else:
-            spawns = possible_positions[:]
+            region = FreeCells(position for position in possible_positions
+                               if position not in self.things)
+        self._spawn_in_free_cells(things, region, fail_if_cant)
 
-        # remove occupied positions, and shuffle
-        spawns = [spawn for spawn in spawns
-                  if self.things.get(spawn) is None]
-        random.shuffle(spawns)
+    def _spawn_in_free_cells(self, things, region, fail_if_cant):
+        things = list(things)
+        spawns = region.sample(len(things), self.random)
 
         # try  to spawn each thing
-        for thing in things:
-            if spawns:
-                thing.position = spawns.pop()
-                self.spawn_thing(thing)
-            else:
-                if fail_if_cant:
-                    error = 'Not enough space to spawn %s' % thing.name
-                    raise Exception(error)
-                else:
-                    return
+        for thing, position in zip(things, spawns):
+            thing.position = position
+            self.spawn_thing(thing)
+
+        if len(spawns) < len(things) and fail_if_cant:
+            error = 'Not enough space to spawn %s' % things[len(spawns)].name
+            raise Exception(error)
 
     def event(self, thing, message):
         """Log an event."""
-        self.events.append((self.t, thing, message))
+        if not self.headless:
+            self.events.append((self.t, thing, message))
+
+    def forget_events(self):
+        """Drop the events older than event_history ticks (they are logged
+           in order)."""
+        oldest = self.t - self.event_history
+        count = 0
+        while count < len(self.events) and self.events[count][0] < oldest:
+            count += 1
+        if count:
+            del self.events[:count]
 
     def step(self):
         """Forward one instant of time."""
         self.t += 1
+        if self.event_history is not None:
+            self.forget_events()
         actions = self.get_actions()
-        random.shuffle(actions)
-        self.execute_actions(actions)
+        self.last_actions = [(thing, thing.position, action, parameter)
+                             for thing, action, parameter in actions]
+        if self.resolver is None:
+            self.random.shuffle(actions)
+            self.execute_actions(actions)
+        else:
+            self.resolver.resolve(self, actions)
         self.clean_dead_things()
 
     def get_actions(self):
@@ -82,9 +354,36 @@ class World(object):
         actions = []
         actors = [thing for thing in self.things.values()
                   if thing.ask_for_actions]
+        if self.scheduler is not None:
+            actors = self.scheduler.select(actors, self.t)
+        steps = None
+        if self.executor is not None:
+            # the results of the calls, in the order of the actors
+            steps = iter(self.executor.next_steps(actors, self.things, self.t,
+                                                  self.budgets))
         for thing in actors:
             try:
-                next_step = thing.next_step(self.things, self.t)
+                error = None
+                if steps is not None:
+                    next_step, error, elapsed = next(steps)
+                elif thing.TIMED:
+                    start = perf_counter()
+                    try:
+                        next_step = thing.next_step(self.things, self.t)
+                    except Exception as err:
+                        next_step, error = None, err
+                    elapsed = perf_counter() - start
+                else:
+                    next_step = thing.next_step(self.things, self.t)
+
+                # the latency is kept first, but the errors of the calls
+                # (other than the abandoned ones) are still reported
+                overrun = thing.TIMED and self.time_next_step(thing, elapsed, error)
+                if error is not None and not (overrun and isinstance(error, BudgetExceeded)):
+                    raise error
+                if overrun:
+                    continue
+
                 if isinstance(next_step, (tuple, list)) and len(next_step) == 2:
                     action, parameter = next_step
                     actions.append((thing, action, parameter))
@@ -100,6 +399,27 @@ class World(object):
 
         return actions
 
+    def time_next_step(self, thing, elapsed, error):
+        """Keep the latency of a next_step call, and check its budget.
+
+           Returns True if the thing exceeded its budget, and is idle.
+        """
+        stats = self.latency.get(thing)
+        if stats is None:
+            stats = self.latency[thing] = LatencyStats()
+        budget = self.budgets.budget(thing) if self.budgets is not None else None
+        overrun = isinstance(error, BudgetExceeded) or (
+            budget is not None and elapsed > budget)
+        stats.add(elapsed, overrun)
+        if overrun and not self.headless:
+            if budget is None:
+                # still busy with a call abandoned while it had a budget
+                self.event(thing, u'exceeded its time budget, idle')
+            else:
+                self.event(thing, u'exceeded its time budget (%.1f ms), idle'
+                           % (budget * 1000))
+        return overrun
+
     def execute_actions(self, actions):
         """Execute actions, and add their results as events."""
         for thing, action, parameter in actions:
@@ -119,19 +439,34 @@ class World(object):
                     raise
 
     def clean_dead_things(self):
-        """Remove dead things, and add dead decorations."""
+        """Remove dead things, and add dead decorations.
+
+           The materialized static things are dropped back into the terrain,
+           which removes the dead ones.
+        """
+        dead_terrain = self.terrain.drop_materialized()
         dead_things = [thing for thing in self.things.values()
                        if thing.life <= 0]
-        for thing in dead_things:
-            if thing.dead_decoration is not None:
-                thing.dead_decoration.position = thing.position
-                self.spawn_thing(thing.dead_decoration)
+        for thing in dead_terrain + dead_things:
+            dead_decoration = thing.create_dead_decoration(self.pool)
+            if dead_decoration is not None:
+                dead_decoration.position = thing.position
+                self.spawn_thing(dead_decoration)
 
-            del self.things[thing.position]
+            if not thing.TERRAIN:
+                del self.things[thing.position]
+                if thing.POOLED:
+                    self.pool.release(thing)
+            elif self._navigation is not None:
+                self._navigation.remove_obstacle(thing.position)
+            else:
+                self.destroyed_terrain.append(thing.position)
+            self.vacate(thing.position)
             self.event(thing, u'died')
             self.deaths += 1
             if getattr(thing, "name", "") == "zombie":
                 self.zombie_deaths += 1
+                self.zombie_count -= 1
             # elif isinstance(thing, Agent): # Agent is a subclass of player, so must be checked first
             #     self.agent_deaths += 1
             # elif isinstance(thing, Player):
@@ -146,10 +481,12 @@ class World(object):
             raise Exception(
                 u'Destination of movement should be a tuple or list')
 
+        event = None
         if self.within_bounds(destination):
-            obstacle = self.things.get(destination)
-            if obstacle is not None:
-                event = u'hit %s with his head' % obstacle.name
+            if destination in self.things:
+                if not self.headless:
+                    obstacle = self.things[destination]
+                    event = u'hit %s with his head' % obstacle.name
             elif distance(thing.position, destination) > 1:
                 event = u'tried to walk too fast, but physics forbade it'
             else:
@@ -157,10 +494,13 @@ class World(object):
                 # but also in our dict, for faster access
                 self.things[destination] = thing
                 del self.things[thing.position]
+                self.vacate(thing.position)
+                self.occupy(destination)
                 thing.position = destination
 
-                event = u'moved to ' + str(destination)
-        else:
+                if not self.headless:
+                    event = u'moved to ' + str(destination)
+        elif not self.headless:
                 event = u'Tried to move out of bounds to %s' % str(destination)
 
         return event
@@ -173,13 +513,16 @@ class World(object):
         if not isinstance(target, Thing):
             raise Exception(u'Target of attack should be a thing')
 
+        event = None
         if distance(thing.position, target.position) > thing.weapon.max_range:
-            event = u'tried to attack %s, but it is too far for a %s'
-            event = event % (target.name, thing.weapon.name)
+            if not self.headless:
+                event = u'tried to attack %s, but it is too far for a %s'
+                event = event % (target.name, thing.weapon.name)
         else:
-            damage = random.randint(*thing.weapon.damage_range)
+            damage = self.random.randint(*thing.weapon.damage_range)
             target.life -= damage
-            event = u'injured %s with a %s' % (target.name, thing.weapon.name)
+            if not self.headless:
+                event = u'injured %s with a %s' % (target.name, thing.weapon.name)
 
         return event
 
@@ -191,13 +534,16 @@ class World(object):
         if not isinstance(target, Thing):
             raise Exception(u'Target of healing should be a thing')
 
+        event = None
         if distance(thing.position, target.position) > HEALING_RANGE:
-            event = u'tried to heal %s, but it is too far away' % target.name
+            if not self.headless:
+                event = u'tried to heal %s, but it is too far away' % target.name
         else:
             # heal avoiding health overflow
-            heal = random.randint(target.MAX_LIFE // 10, target.MAX_LIFE // 4)
+            heal = self.random.randint(target.MAX_LIFE // 10, target.MAX_LIFE // 4)
             target.life = min(target.MAX_LIFE, target.life + heal)
-            event = u'healed ' + target.name
+            if not self.headless:
+                event = u'healed ' + target.name
 
         return event
 
@@ -209,8 +555,32 @@ class World(object):
 
 
 class Thing(object):
-    """Something in the world."""
+    """Something in the world.
+
+       Things use __slots__, as there can be many thousands of them in a
+       world. Subclasses should declare __slots__ too (empty if they don't add
+       attributes), or their instances get a __dict__ again.
+
+       Things of classes with TERRAIN set are static terrain, stored in the
+       terrain grid of the world (see zombsole.terrain). Those classes must
+       be constructed with just a position.
+
+       Dead things of classes with POOLED set are kept by the world to be
+       recycled (see zombsole.pools).
+    """
+    __slots__ = ('name', 'icon', 'icon_basic', 'color', 'life', 'position',
+                 'status', 'ask_for_actions', 'dead_decoration',
+                 'is_decoration', 'headless')
     MAX_LIFE = 1
+    TERRAIN = False
+    POOLED = False
+    # Whether the next_step calls are timed, and subject to time budgets (see
+    # zombsole.latency)
+    TIMED = False
+    # Whether next_step can run concurrently with the other things' (see
+    # zombsole.executors): it must not draw random numbers, and only change
+    # the thing itself
+    CONCURRENT_NEXT_STEP = False
 
     def __init__(self, name, icon, icon_basic, color, life, position=None,
                  ask_for_actions=False, dead_decoration=None,
@@ -228,21 +598,55 @@ class Thing(object):
         self.ask_for_actions = ask_for_actions
         self.dead_decoration = dead_decoration
         self.is_decoration = is_decoration
+        # Set when spawned in a headless world, so the status isn't formatted
+        self.headless = False
+
+    def create_dead_decoration(self, pool):
+        """The decoration to leave where the thing died, or None.
+
+           Things can create it lazily here (taking a recycled one from the
+           pool of the world) instead of keeping one while they are alive.
+        """
+        return self.dead_decoration
 
     def next_step(self, things, t):
         return None
 
 
 class Weapon(object):
-    """Weapon, capable of doing damage to things."""
+    """Weapon, capable of doing damage to things.
+
+       Weapons are immutable, so a single instance can be shared by all the
+       things using it.
+    """
+    __slots__ = ('name', 'max_range', 'damage_range')
+
     def __init__(self, name, max_range, damage_range):
-        self.name = name
-        self.max_range = max_range
-        self.damage_range = damage_range
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'max_range', max_range)
+        object.__setattr__(self, 'damage_range', tuple(damage_range))
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError(u'Weapons are immutable, %s can\'t be changed' % attribute)
+
+    def __reduce__(self):
+        return (Weapon, (self.name, self.max_range, self.damage_range))
 
 
 class FightingThing(Thing):
-    """Thing that has a weapon."""
+    """Thing that has a weapon.
+
+       The target_memory is used by the sticky targeting of the thing (see
+       zombsole.targeting), tuned with the TARGET_ class attributes. It's
+       None unless the thing is spawned in a world with sticky targeting.
+    """
+    __slots__ = ('weapon', 'target_memory')
+    # The weapon classes a thing created without a weapon gets one of (see
+    # World.arm)
+    RANDOM_WEAPONS = ()
+    TARGET_HYSTERESIS = 2.0
+    TARGET_REFRESH_INTERVAL = 10
+
     def __init__(self, name, icon, icon_basic, color, life, weapon,
                  position=None, dead_decoration=None):
         super(FightingThing, self).__init__(name, icon, icon_basic, color,
@@ -251,3 +655,4 @@ class FightingThing(Thing):
                                             dead_decoration=dead_decoration)
 
         self.weapon = weapon
+        self.target_memory = None
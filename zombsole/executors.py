@@ -0,0 +1,273 @@
+# coding: utf-8
+"""Executors for the next_step calls of the things of a world.
+
+Every thing decides its action from the same things, before any action is
+applied, so the decisions are independent and the next_step calls of slow
+bots can run concurrently. The executors return the results in the order of
+the actors, and the world turns them into actions (and errors into events)
+exactly as when the calls are made one after another.
+
+Only the things of classes with CONCURRENT_NEXT_STEP set are run by the
+workers, the others are run in the main thread, in order. The flag is off by
+default (for the zombies and for every bot), and a bot only sets it when it
+doesn't draw random numbers, like the built-in terminator, sniper and troll.
+As the workers don't draw random numbers, a seeded game plays the same with
+any executor.
+
+In a thread pool, the bots must only read the things and change their own
+attributes. In a process pool, each worker gets a pickled snapshot of the
+things, and sends back the results and the attributes of its bots (their
+__dict__ and slots), which are restored in the bots of the world. The things
+of the snapshot found in them (directly, or in lists, tuples, sets and dicts)
+are mapped back to the things of the world by position.
+
+The threads executor also enforces the time budgets of the bots (see
+zombsole.latency) while waiting: a call still running at its deadline is
+abandoned (the thread can't be stopped, so the bot stays idle until the call
+returns).
+"""
+import os
+import pickle
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from time import perf_counter
+
+from zombsole.core import Thing, WorldThings
+from zombsole.latency import BudgetExceeded
+
+
+class ActionExecutor(ABC):
+    @abstractmethod
+    def next_steps(self, actors, things, t, budgets=None):
+        """The results of the next_step calls of the actors, in order, as
+           (next_step result, error, elapsed seconds) tuples where error is
+           the exception raised by the call, or None."""
+        pass
+
+    def shutdown(self):
+        """Release the workers of the executor."""
+        pass
+
+
+def _call_next_step(thing, things, t):
+    start = perf_counter()
+    try:
+        return thing.next_step(things, t), None, perf_counter() - start
+    except Exception as err:
+        return None, err, perf_counter() - start
+
+
+class SerialExecutor(ActionExecutor):
+    """Calls next_step one after another (when the results are consumed)."""
+    def next_steps(self, actors, things, t, budgets=None):
+        for thing in actors:
+            yield _call_next_step(thing, things, t)
+
+
+class PoolExecutor(ActionExecutor):
+    """Base of the executors running next_step calls in a pool of workers,
+       created when first needed."""
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.pool = None
+
+    @abstractmethod
+    def create_pool(self):
+        pass
+
+    @abstractmethod
+    def submit(self, concurrent_actors, things, t, budgets):
+        """Submit the calls of the concurrent actors to the pool, returning a
+           function which waits for their results, in order."""
+        pass
+
+    def next_steps(self, actors, things, t, budgets=None):
+        if self.pool is None:
+            self.pool = self.create_pool()
+
+        concurrent_actors = [thing for thing in actors if thing.CONCURRENT_NEXT_STEP]
+        wait = self.submit(concurrent_actors, things, t, budgets) if concurrent_actors else list
+
+        # the other actors are run meanwhile, in order
+        results = [None if thing.CONCURRENT_NEXT_STEP else _call_next_step(thing, things, t)
+                   for thing in actors]
+
+        concurrent_results = iter(wait())
+        return [next(concurrent_results) if result is None else result
+                for result in results]
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+class ThreadExecutor(PoolExecutor):
+    """Runs the next_step calls in a thread pool, sharing the things."""
+    def __init__(self, workers=None):
+        super(ThreadExecutor, self).__init__(workers)
+        # the abandoned calls still running, by thing
+        self.running = {}
+
+    def create_pool(self):
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def submit(self, concurrent_actors, things, t, budgets):
+        start = perf_counter()
+        futures = []
+        for thing in concurrent_actors:
+            future = self.running.get(thing)
+            if future is not None and future.done():
+                del self.running[thing]
+                future = None
+            if future is None:
+                futures.append(self.pool.submit(_call_next_step, thing, things, t))
+            else:
+                # the bot is still busy with an abandoned call
+                futures.append(None)
+
+        def wait():
+            results = []
+            for thing, future in zip(concurrent_actors, futures):
+                budget = budgets.budget(thing) if budgets is not None else None
+                if future is None:
+                    results.append((None, BudgetExceeded(), 0.0))
+                    continue
+                try:
+                    if budget is None:
+                        results.append(future.result())
+                    else:
+                        timeout = max(0.0, start + budget - perf_counter())
+                        results.append(future.result(timeout=timeout))
+                except FutureTimeoutError:
+                    self.running[thing] = future
+                    results.append((None, BudgetExceeded(), perf_counter() - start))
+            return results
+        return wait
+
+
+def _next_steps_in_snapshot(snapshot, positions):
+    """Run the next_step calls of the actors at some positions of a pickled
+       snapshot of the things, in a worker process."""
+    things, t = pickle.loads(snapshot)
+    results = []
+    for position in positions:
+        thing = things[position]
+        next_step, error, elapsed = _call_next_step(thing, things, t)
+        if error is not None:
+            try:
+                pickle.dumps(error)
+            except Exception:
+                error = Exception(str(error))
+        results.append((_export(next_step, things), error, elapsed,
+                        _export(_thing_state(thing), things)))
+    return results
+
+
+def _thing_state(thing):
+    """The attributes of a thing, from its __dict__ and its slots."""
+    state = dict(getattr(thing, '__dict__', {}))
+    for thing_class in type(thing).__mro__:
+        slots = thing_class.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_%s%s' % (thing_class.__name__.lstrip('_'), name)
+            if hasattr(thing, name):
+                state[name] = getattr(thing, name)
+    return state
+
+
+def _export(value, things):
+    """A value with the things of a snapshot replaced by their positions."""
+    if isinstance(value, Thing):
+        if value.position is not None and things.get(value.position) is value:
+            return _ThingAt(value.position)
+        return value
+    value_type = type(value)
+    if value_type in (list, tuple, set, frozenset):
+        return value_type(_export(item, things) for item in value)
+    if value_type is dict:
+        return {_export(key, things): _export(item, things) for key, item in value.items()}
+    return value
+
+
+def _import(value, things):
+    """A value sent by a worker, with the positions replaced by the things
+       of the world."""
+    if isinstance(value, _ThingAt):
+        return things.get(value.position)
+    value_type = type(value)
+    if value_type in (list, tuple, set, frozenset):
+        return value_type(_import(item, things) for item in value)
+    if value_type is dict:
+        return {_import(key, things): _import(item, things) for key, item in value.items()}
+    return value
+
+
+class _ThingAt(object):
+    """Reference to the thing in a position, sent by the worker processes."""
+    __slots__ = ('position',)
+
+    def __init__(self, position):
+        self.position = position
+
+    def __reduce__(self):
+        return (_ThingAt, (self.position,))
+
+
+class ProcessExecutor(PoolExecutor):
+    """Runs the next_step calls in a process pool, on snapshots of the things."""
+    def create_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, concurrent_actors, things, t, budgets):
+        # the snapshot only has the things and the terrain (pickled once per
+        # tick), not the lookup tables of the flat grid mode
+        snapshot = WorldThings(things.terrain)
+        dict.update(snapshot, things)
+        snapshot = pickle.dumps((snapshot, t), pickle.HIGHEST_PROTOCOL)
+
+        chunk_count = min(len(concurrent_actors), self.workers or os.cpu_count() or 1)
+        chunks = [concurrent_actors[index::chunk_count] for index in range(chunk_count)]
+        futures = [self.pool.submit(_next_steps_in_snapshot, snapshot,
+                                    [thing.position for thing in chunk])
+                   for chunk in chunks]
+
+        def wait():
+            results = {}
+            for chunk, future in zip(chunks, futures):
+                for thing, (next_step, error, elapsed, state) in zip(chunk, future.result()):
+                    for name, value in _import(state, things).items():
+                        setattr(thing, name, value)
+                    results[id(thing)] = (_import(next_step, things), error, elapsed)
+            return [results[id(thing)] for thing in concurrent_actors]
+        return wait
+
+
+def build_executor(executor_id):
+    """Build an executor from its id: "serial", "threads" or "processes",
+       optionally followed by the number of workers, like "threads:8"."""
+    name, _, workers = executor_id.lower().partition(":")
+    if workers:
+        try:
+            workers = int(workers)
+        except ValueError:
+            workers = 0
+        if workers < 1:
+            raise ValueError(f"{executor_id} is not a valid executor id, the number of workers must be a positive integer")
+    else:
+        workers = None
+
+    if name == "serial":
+        return SerialExecutor()
+    elif name == "threads":
+        return ThreadExecutor(workers)
+    elif name == "processes":
+        return ProcessExecutor(workers)
+    else:
+        raise ValueError(f"{executor_id} is not a valid executor id, must be \"serial\", \"threads\" or \"processes\", optionally followed by \":workers\".")
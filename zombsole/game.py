@@ -1,16 +1,19 @@
 # coding: utf-8
 from __future__ import print_function
 
+import copy
 import os
 from os import path
+import random
 import sys
 import time
-from termcolor import colored
 from itertools import cycle, islice
 from zombsole.rules.factory import RulesFactory
 from zombsole.core import World
+from zombsole.executors import build_executor
+from zombsole.navigation import Navigation
 from zombsole.things import Box, Wall, Zombie, ObjectiveLocation, Player
-from zombsole.renderer import TerminalRenderer, OpencvRenderer
+from zombsole.renderer import build_renderer
 from zombsole.weapons import WeaponFactory
 
 
@@ -22,8 +25,8 @@ def get_creator(module_name):
     return create_function
 
 # More or less following the approach for player and rules
-def create_agent(agent_id, weapon_name, rules_name, objectives):
-    weapon = WeaponFactory.create_player_weapon(weapon_name)
+def create_agent(agent_id, weapon_name, rules_name, objectives, rng=random):
+    weapon = WeaponFactory.create_player_weapon(weapon_name, rng)
     creator = get_creator('zombsole.players.agent')
     return creator(agent_id, weapon, rules_name, objectives)
 
@@ -40,6 +43,16 @@ class Map(object):
         self.player_spawns = player_spawns
         self.zombie_spawns = zombie_spawns
         self.objectives = objectives
+        self.navigation = None
+
+    def get_navigation(self):
+        """The navigation of the map (see zombsole.navigation), built once.
+
+           Games use copies of it, as it changes when terrain is destroyed.
+        """
+        if self.navigation is None:
+            self.navigation = Navigation.from_map(self)
+        return self.navigation
 
     @classmethod
     def from_file(cls, file_path):
@@ -111,14 +124,29 @@ class Game(object):
 
        This includes player and zombies spawning, game main loop, deciding when
        to stop, importing map data, drawing each update, etc.
+
+       Each game has its own random number generator (self.random), seeded
+       by reset, which is the generator of its worlds. The engine draws all
+       its random numbers from it, and the bots get it as things.random (see
+       World), so other code drawing random numbers, in any thread, neither
+       changes the game nor is reseeded by it.
     """
     def __init__(self, rules_name, player_names, map_, initial_zombies=0,
                  minimum_zombies=0, debug=False,
                  use_basic_icons=False,
-                 renderer=TerminalRenderer(False, debug=False),
+                 renderer="terminal",
                  agent_ids = [],
-                 agent_weapons = "rifle"):
+                 agent_weapons = "rifle",
+                 headless=False,
+                 flat_grid=False,
+                 executor=None,
+                 time_budgets=None,
+                 zombie_scheduler=None,
+                 action_resolution="sequential",
+                 event_history=None,
+                 targeting="closest"):
         self.players = []
+        self.random = random.Random()
 
         self.rules_name = rules_name
         self.rules = RulesFactory.create_rules(rules_name, self)
@@ -127,6 +155,40 @@ class Game(object):
         self.minimum_zombies = minimum_zombies
         self.debug = debug
         self.use_basic_icons = use_basic_icons
+        # Skip the cosmetic work of each tick (events and statuses), see World
+        self.headless = headless
+        # Use flat cell indexes in the engine, see World
+        self.flat_grid = flat_grid
+        # The ticks of events kept by the world (all of them if None), see
+        # World
+        self.event_history = event_history
+        # Optional executor of the next_step calls of the things (by id or
+        # instance), see zombsole.executors
+        if isinstance(executor, str):
+            executor = build_executor(executor)
+        self.executor = executor
+        # Optional time budgets of the bots (a zombsole.latency.TimeBudgets)
+        self.time_budgets = time_budgets
+        # Optional level of detail scheduling of the zombies (a
+        # zombsole.scheduling.ZombieScheduler), which changes the game
+        self.zombie_scheduler = zombie_scheduler
+        # How the actions of each tick are applied: "sequential" (shuffled,
+        # one after another) or "simultaneous" (see zombsole.resolution),
+        # which changes the game
+        if action_resolution == "sequential":
+            self.resolver = None
+        elif action_resolution == "simultaneous":
+            from zombsole.resolution import SimultaneousResolver
+            self.resolver = SimultaneousResolver()
+        else:
+            raise ValueError(f"{action_resolution} is not a valid action resolution, must be \"sequential\" or \"simultaneous\".")
+        self.action_resolution = action_resolution
+        # How the fighting things choose their targets: "closest" (searched
+        # every tick) or "sticky" (remembered, see zombsole.targeting), which
+        # changes the game
+        if targeting not in ("closest", "sticky"):
+            raise ValueError(f"{targeting} is not a valid targeting, must be \"closest\" or \"sticky\".")
+        self.targeting = targeting
 
         self.player_names = player_names
         self.agent_ids = agent_ids
@@ -134,9 +196,20 @@ class Game(object):
         # with length matching the length of agent_ids
         self.__process_weapon_name_inputs__(agent_weapons)
         
+        # Optional replay recorder (see zombsole.replay), notified after each step
+        self.recorder = None
+        # Optional memory monitor (see zombsole.memory), notified after each
+        # step and reset
+        self.memory_monitor = None
+
         # Initialize world, players, agents
         self.__initialize_world__()
 
+        # The renderer can be given by id, so the rendering backend is only
+        # loaded when the game is created
+        if isinstance(renderer, str):
+            renderer = build_renderer(renderer, False, self.map.size,
+                                      len(self.player_names) + len(self.agent_ids))
         self.renderer = renderer
 
     def __process_weapon_name_inputs__(self, agent_weapons):
@@ -149,24 +222,71 @@ class Game(object):
             raise ValueError(f"{agent_weapons} is not a valid value for argument agent_weapons.  Value must be the weapon name as a string or a list of weapon names.")
 
     def __initialize_world__(self):
-        self.world = World(self.map.size, debug=self.debug)
+        self.world = self.build_world()
+        self.create_players()
+        self.spawn_players()
+        self.spawn_agents()
+        self.spawn_zombies(self.initial_zombies)
 
+    def build_world(self):
+        """A new world with the things and the spawn regions of the map, but
+           no players or zombies yet."""
+        world = World(self.map.size, debug=self.debug, headless=self.headless,
+                      flat_grid=self.flat_grid, event_history=self.event_history,
+                      sticky_targeting=self.targeting == "sticky",
+                      rng=self.random)
+
+        # The map things are copied so damage done in one game doesn't carry
+        # over to the next one (the static terrain is copied into the grid of
+        # the world)
         for thing in self.map.things:
-            self.world.spawn_thing(thing)
-
+            world.spawn_thing(thing if thing.TERRAIN else copy.copy(thing))
+        self.attach_services(world)
+        world.add_spawn_region('players', self.map.player_spawns)
+        world.add_spawn_region('zombies', self.map.zombie_spawns)
+        return world
+
+    def create_players(self):
+        """Create the players and agents of the game (not spawned yet), with
+           their weapons."""
         self.players = [create_player(name, self.rules_name,
                                       self.map.objectives)
                         for name in self.player_names]
+        # the players created without a weapon get one before spawning
+        for player in self.players:
+            self.world.arm(player)
 
         if self.agent_ids:
-            self.agents = [create_agent(agent_id, weapon_name, self.rules_name, self.map.objectives)
+            self.agents = [create_agent(agent_id, weapon_name, self.rules_name, self.map.objectives,
+                                        self.random)
                            for agent_id, weapon_name in zip(self.agent_ids, self.agent_weapons)]
         else:
             self.agents = []
 
-        self.spawn_players()
-        self.spawn_agents()
-        self.spawn_zombies(self.initial_zombies)
+    def attach_services(self, world):
+        """Set the runtime services of the game (executor, time budgets,
+           scheduler, resolver and the source of the navigation) in a world,
+           like one restored from a snapshot (which doesn't keep them)."""
+        # the navigation of the map is only built (and copied) for the
+        # worlds using it
+        world.navigation_source = self.map.get_navigation
+        world.executor = self.executor
+        world.budgets = self.time_budgets
+        world.scheduler = self.zombie_scheduler
+        world.resolver = self.resolver
+
+    def reset(self, seed=None):
+        """Start a new game in a fresh world.
+
+           If a seed is provided, the random number generator of the game
+           (not the global one of the random module) is seeded with it before
+           the world is built, making the game reproducible.
+        """
+        if seed is not None:
+            self.random.seed(seed)
+        self.__initialize_world__()
+        if self.memory_monitor is not None:
+            self.memory_monitor.record_reset(self)
 
     # Return both players and agents
     def get_all_players(self):
@@ -178,38 +298,62 @@ class Game(object):
     def get_players_health(self):
         return sum([thing.life for thing in self.players])
 
+    def get_latency_stats(self):
+        """The latency statistics of the next_step calls of the players and
+           agents (see zombsole.latency), as a list of dicts."""
+        stats = []
+        for player in self.get_all_players():
+            player_stats = self.world.latency.get(player)
+            if player_stats is not None:
+                entry = {"name": player.name, "agent_id": getattr(player, "agent_id", None)}
+                entry.update(player_stats.to_dict())
+                stats.append(entry)
+        return stats
+
     def spawn_players(self):
         """Spawn players using the provided player create functions."""
-        self.world.spawn_in_random(self.players, self.map.player_spawns)
+        self.world.spawn_in_region(self.players, 'players')
 
     def spawn_agents(self):
         """Spawn agents using the provided player create functions."""
-        self.world.spawn_in_random(self.agents, self.map.player_spawns)
+        self.world.spawn_in_region(self.agents, 'players')
 
     def spawn_zombies(self, count):
-        """Spawn N zombies in the world."""
-        zombies = [Zombie() for _ in range(count)]
-        self.world.spawn_in_random(zombies,
-                                   self.map.zombie_spawns,
-                                   fail_if_cant=False)
+        """Spawn N zombies in the world (as many as there's room for)."""
+        count = min(count, len(self.world.spawn_regions['zombies']))
+        zombies = []
+        for _ in range(count):
+            # dead zombies are recycled before creating new ones
+            zombie = self.world.pool.acquire(Zombie)
+            if zombie is None:
+                zombie = Zombie(rng=self.world.random)
+            else:
+                zombie.revive(rng=self.world.random)
+            zombies.append(zombie)
+        self.world.spawn_in_region(zombies, 'zombies', fail_if_cant=False)
 
     def spawn_zombies_to_maintain_minimum(self):
+        # maintain the flow of zombies if necessary (the world counts them,
+        # instead of scanning its things)
+        if self.world.zombie_count < self.minimum_zombies:
+            self.spawn_zombies(self.minimum_zombies - self.world.zombie_count)
+
+    def step(self):
+        """Forward the game one instant of time."""
+        self.world.step()
+
         # maintain the flow of zombies if necessary
-        zombies = [thing for thing in self.world.things.values()
-                    if isinstance(thing, Zombie)]
-        if len(zombies) < self.minimum_zombies:
-            self.spawn_zombies(self.minimum_zombies - len(zombies))
+        self.spawn_zombies_to_maintain_minimum()
+
+        if self.recorder is not None:
+            self.recorder.record_tick(self)
+        if self.memory_monitor is not None:
+            self.memory_monitor.record_tick(self)
 
     def play(self, frames_per_second=2.0):
         """Game main loop, ending in a game result with description."""
         while True:
-            self.world.step()
-
-            # maintain the flow of zombies if necessary
-            zombies = [thing for thing in self.world.things.values()
-                       if isinstance(thing, Zombie)]
-            if len(zombies) < self.minimum_zombies:
-                self.spawn_zombies(self.minimum_zombies - len(zombies))
+            self.step()
 
             self.draw()
 
@@ -224,6 +368,8 @@ class Game(object):
             if self.rules.game_ended():
                 won, description = self.rules.game_won()
 
+                from termcolor import colored
+
                 print('')
                 if won:
                     print(colored(u'WIN! ', 'green'))
@@ -0,0 +1,306 @@
+# coding: utf-8
+"""Golden traces of seeded games, to check engine optimisations against.
+
+A scenario is a seeded game of some rules on some map, with a fixed line-up
+of bots and an agent following a scripted list of actions. Its trace has, for
+each tick, short hashes of three channels:
+
+- state: the terrain and the things (position, class, name, life and weapon,
+  sorted by position), and the decorations.
+- events: the events of the tick (None for headless games, which skip them).
+- observations: the observation of the agent (see zombsole.gym.observation),
+  with the objective distance channel for the rules having one.
+
+The golden traces are recorded with the reference engine (the default options
+of Game) over every bundled map and rules, and stored as compact JSON (the
+hashes of each channel concatenated in a string). An alternative engine (like
+the flat_grid or headless options, or an executor) or observation encoder is
+checked by playing the same scenarios, and comparing the traces tick by tick:
+the first tick and channel diverging is reported. Options which change the
+game on purpose (like action_resolution, zombie_scheduler or targeting)
+diverge, and golden traces have to be recorded again when the game itself
+changes.
+
+Usage:
+    golden.py record [--output FILE] [--ticks TICKS]
+    golden.py check [--golden FILE] [--flat-grid] [--headless] [--executor EXECUTOR] [--scenario NAME]
+
+Options:
+    --output FILE          The file to write the traces to [default: tests/golden/traces.json]
+    --ticks TICKS          The ticks played in each scenario [default: 40]
+    --golden FILE          The golden traces to check [default: tests/golden/traces.json]
+    --flat-grid            Check the flat grid mode of the world
+    --headless             Check the headless mode (the events aren't checked)
+    --executor EXECUTOR    Check an executor of the next_step calls, like threads:4
+    --scenario NAME        Only check a scenario, like extermination/bridge
+
+Run it from the root of the repository with `python -m zombsole.golden`.
+"""
+from __future__ import print_function
+
+import json
+from hashlib import blake2b
+from os import listdir, path
+
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+
+
+TRACE_FORMAT_VERSION = 2
+# Characters of each hash (of a channel, for a tick)
+DIGEST_SIZE = 4
+DIGEST_CHARS = 2 * DIGEST_SIZE
+CHANNELS = ("state", "events", "observations")
+
+RULES_NAMES = ["extermination", "survival", "evacuation", "safehouse"]
+SCENARIO_PLAYERS = ["terminator", "sniper", "troll"]
+# The actions of the agent, repeated
+AGENT_ACTIONS = [
+    {"action_type": "attack_closest"},
+    {"action_type": "move", "parameter": [1, 0]},
+    {"action_type": "heal_closest"},
+    {"action_type": "move", "parameter": [0, 1]},
+    {"action_type": "attack_closest"},
+    {"action_type": "move", "parameter": [-1, 0]},
+]
+
+
+def map_names():
+    """The names of the bundled maps."""
+    return sorted(listdir(path.join(path.dirname(__file__), 'maps')))
+
+
+class Scenario(object):
+    """A seeded game played for some ticks."""
+    def __init__(self, rules_name, map_name, seed=0, ticks=40,
+                 initial_zombies=20, minimum_zombies=10):
+        self.rules_name = rules_name
+        self.map_name = map_name
+        self.seed = seed
+        self.ticks = ticks
+        self.initial_zombies = initial_zombies
+        self.minimum_zombies = minimum_zombies
+
+    @property
+    def name(self):
+        return f"{self.rules_name}/{self.map_name}"
+
+    def create_game(self, **game_options):
+        game = Game(self.rules_name, SCENARIO_PLAYERS, Map.from_map_name(self.map_name),
+                    initial_zombies=self.initial_zombies,
+                    minimum_zombies=self.minimum_zombies,
+                    renderer=NoRender(), agent_ids=["0"], **game_options)
+        game.reset(seed=self.seed)
+        return game
+
+    def to_dict(self):
+        return {
+            "rules_name": self.rules_name,
+            "map_name": self.map_name,
+            "seed": self.seed,
+            "ticks": self.ticks,
+            "initial_zombies": self.initial_zombies,
+            "minimum_zombies": self.minimum_zombies,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def default_scenarios(ticks=40, seed=0):
+    """A scenario for each bundled map and rules."""
+    return [Scenario(rules_name, map_name, seed=seed, ticks=ticks)
+            for rules_name in RULES_NAMES
+            for map_name in map_names()]
+
+
+def _digest(*parts):
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def state_digest(world):
+    """Hash of the terrain, the things and the decorations of a world.
+
+       The terrain and the things are hashed as a single listing sorted by
+       position, so the hash doesn't depend on how the engine stores them.
+    """
+    terrain = world.terrain
+    things = [(position, terrain.kind(position).__name__, terrain.kind(position).NAME,
+               terrain.life(position), None)
+              for position in terrain.positions()]
+    things.extend((thing.position, type(thing).__name__, thing.name, thing.life,
+                   getattr(getattr(thing, 'weapon', None), 'name', None))
+                  for thing in world.things.values())
+    things.sort()
+    decoration = sorted((thing.position, type(thing).__name__)
+                        for thing in world.decoration.values())
+    return _digest(things, decoration)
+
+
+def events_digest(events):
+    """Hash of some events of a world."""
+    return _digest([(t, thing.name, thing.position, message)
+                    for t, thing, message in events])
+
+
+def build_trace_observation(scenario, map_size):
+    """The observation of the agent recorded in the traces of a scenario."""
+    from zombsole.gym.observation import OBJECTIVE_DISTANCE_RULES, build_observation
+    return build_observation("world", "channels", map_size,
+                             objective_distance=scenario.rules_name in OBJECTIVE_DISTANCE_RULES)
+
+
+class Trace(object):
+    """The hashes of the channels of a scenario, for each tick. The channels
+       not recorded are None."""
+    def __init__(self, scenario, state=None, events=None, observations=None):
+        self.scenario = scenario
+        self.state = state
+        self.events = events
+        self.observations = observations
+
+    def to_dict(self):
+        data = {"scenario": self.scenario.to_dict()}
+        for channel in CHANNELS:
+            digests = getattr(self, channel)
+            data[channel] = None if digests is None else "".join(digests)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        channels = {}
+        for channel in CHANNELS:
+            digests = data.get(channel)
+            if digests is not None:
+                digests = [digests[index:index + DIGEST_CHARS]
+                           for index in range(0, len(digests), DIGEST_CHARS)]
+            channels[channel] = digests
+        return cls(Scenario.from_dict(data["scenario"]), **channels)
+
+
+def record_trace(scenario, observation=None, **game_options):
+    """Play a scenario, and return its trace.
+
+       observation: the encoder of the observations of the agent (anything
+       with a get_observation(game) method), the one of the golden traces by
+       default.
+       game_options: extra arguments of Game, like flat_grid=True.
+    """
+    game = scenario.create_game(**game_options)
+    if observation is None:
+        observation = build_trace_observation(scenario, game.map.size)
+    trace = Trace(scenario, state=[], observations=[],
+                  events=None if game.headless else [])
+
+    agent = game.agents[0]
+    # the events logged since the previous tick recorded (including the ones
+    # of the spawns, before the first tick)
+    events_seen = -2
+    try:
+        for t in range(scenario.ticks):
+            agent.set_action(AGENT_ACTIONS[t % len(AGENT_ACTIONS)])
+            game.step()
+
+            trace.state.append(state_digest(game.world))
+            if trace.events is not None:
+                trace.events.append(events_digest([event for event in game.world.events
+                                                   if event[0] > events_seen]))
+                events_seen = game.world.t
+            encoded = observation.get_observation(game)
+            trace.observations.append(_digest(encoded.shape, encoded.tobytes()))
+    finally:
+        if game.executor is not None:
+            game.executor.shutdown()
+    return trace
+
+
+class Divergence(object):
+    """The first tick (counting from 0) and channel of a trace differing
+       from its golden trace."""
+    def __init__(self, scenario, tick, channel):
+        self.scenario = scenario
+        self.tick = tick
+        self.channel = channel
+
+    def __str__(self):
+        return f"{self.scenario.name} diverges at tick {self.tick} ({self.channel})"
+
+
+def first_divergence(golden, trace):
+    """The first divergence of a trace from its golden trace, or None. Only
+       the channels recorded in both are compared."""
+    channels = [channel for channel in CHANNELS
+                if getattr(golden, channel) is not None and getattr(trace, channel) is not None]
+    ticks = min(len(getattr(golden, channel)) for channel in channels)
+    for tick in range(ticks):
+        for channel in channels:
+            if getattr(golden, channel)[tick] != getattr(trace, channel)[tick]:
+                return Divergence(golden.scenario, tick, channel)
+    if any(len(getattr(trace, channel)) != len(getattr(golden, channel)) for channel in channels):
+        return Divergence(golden.scenario, ticks, "length")
+    return None
+
+
+def check_traces(goldens, observation=None, **game_options):
+    """Play the scenarios of some golden traces with an alternative engine
+       or encoder (see record_trace), and return their divergences."""
+    divergences = []
+    for golden in goldens:
+        divergence = first_divergence(golden, record_trace(golden.scenario, observation,
+                                                           **game_options))
+        if divergence is not None:
+            divergences.append(divergence)
+    return divergences
+
+
+def save_traces(file_path, traces):
+    with open(file_path, 'w') as traces_file:
+        json.dump({"version": TRACE_FORMAT_VERSION,
+                   "traces": [trace.to_dict() for trace in traces]},
+                  traces_file, indent=1)
+        traces_file.write('\n')
+
+
+def load_traces(file_path):
+    with open(file_path) as traces_file:
+        data = json.load(traces_file)
+    if data.get("version") != TRACE_FORMAT_VERSION:
+        raise ValueError(f"{file_path} has golden traces of format version {data.get('version')}, expected {TRACE_FORMAT_VERSION}")
+    return [Trace.from_dict(trace) for trace in data["traces"]]
+
+
+def main():
+    from docopt import docopt
+
+    arguments = docopt(__doc__)
+    if arguments['record']:
+        traces = [record_trace(scenario)
+                  for scenario in default_scenarios(ticks=int(arguments['--ticks']))]
+        save_traces(arguments['--output'], traces)
+        print(f"Recorded {len(traces)} golden traces in {arguments['--output']}")
+    else:
+        goldens = load_traces(arguments['--golden'])
+        if arguments['--scenario']:
+            goldens = [golden for golden in goldens
+                       if golden.scenario.name == arguments['--scenario']]
+        game_options = {}
+        if arguments['--flat-grid']:
+            game_options['flat_grid'] = True
+        if arguments['--headless']:
+            game_options['headless'] = True
+        if arguments['--executor']:
+            game_options['executor'] = arguments['--executor']
+
+        divergences = check_traces(goldens, **game_options)
+        for divergence in divergences:
+            print(divergence)
+        print(f"{len(goldens) - len(divergences)} of {len(goldens)} scenarios match their golden traces")
+        return 1 if divergences else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+# coding: utf-8
+"""Flat index geometry of a world.
+
+In the flat grid mode of a world, the engine addresses cells with flat integer
+indexes (y * width + x) instead of (x, y) tuples, and keeps the occupancy in a
+preallocated list (see zombsole.core.FlatWorldThings). The things and the
+players still see tuple positions.
+
+Positions outside of the world share a single extra index, cell_count, of a
+cell that is always empty, so the neighbour tables need no bounds checks.
+"""
+
+
+class FlatGrid(object):
+    """Indexes and precomputed neighbours of the cells of a world."""
+    # Same order as zombsole.utils.adjacent_positions
+    DELTAS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+    def __init__(self, size):
+        self.size = size
+        self.width, self.height = size
+        self.cell_count = self.width * self.height
+        self.outside = self.cell_count
+        # The position tuples are created once, and shared
+        self.positions = [(index % self.width, index // self.width)
+                          for index in range(self.cell_count)]
+        self.neighbours = [self._neighbours(position) for position in self.positions]
+
+    def _neighbours(self, position):
+        neighbours = []
+        for dx, dy in FlatGrid.DELTAS:
+            neighbour = (position[0] + dx, position[1] + dy)
+            index = self.index(neighbour)
+            if index is None:
+                neighbours.append((self.outside, neighbour))
+            else:
+                neighbours.append((index, self.positions[index]))
+        return tuple(neighbours)
+
+    def index(self, position):
+        """Index of a position, or None if it's outside of the world."""
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
@@ -3,7 +3,7 @@ from os import path
 from gymnasium.core import Env
 from gymnasium.spaces import Text, Box, Dict, Sequence
 from gymnasium.spaces.discrete import Discrete
-from zombsole.gym.observation import build_surroundings_observation
+from zombsole.gym.observation import build_surroundings_observation, OBJECTIVE_DISTANCE_RULES
 from zombsole.gym.reward import MultiAgentRewards
 from zombsole.game import Game, Map
 from zombsole.renderer import build_renderer
@@ -27,10 +27,21 @@ class MultiagentZombsoleEnv(object):
                  observation_surroundings_width=21,
                  observation_position_encoding_style="channels",
                  agent_weapons="rifle",
-                 debug=False):
+                 action_repeat=1,
+                 observation_objective_distance=False,
+                 debug=False,
+                 event_history=None):
+        if action_repeat < 1:
+            raise ValueError("action_repeat must be at least 1")
+        if observation_objective_distance and rules_name not in OBJECTIVE_DISTANCE_RULES:
+            raise ValueError(f"observation_objective_distance is only available for the {', '.join(OBJECTIVE_DISTANCE_RULES)} rules")
+        self.action_repeat = action_repeat
         self.position_encoding_style = observation_position_encoding_style
         self.surroundings_width = observation_surroundings_width
-        self.single_agent_observation = build_surroundings_observation(self.surroundings_width, self.position_encoding_style)
+        self.single_agent_observation = build_surroundings_observation(
+            self.surroundings_width, self.position_encoding_style,
+            objective_distance=observation_objective_distance
+        )
 
         self.agents = agent_ids
         self.possible_agents = agent_ids
@@ -67,6 +78,9 @@ class MultiagentZombsoleEnv(object):
             renderer=renderer,
             agent_weapons=agent_weapons,
             debug=debug,
+            # Nobody reads the events and statuses when the game isn't rendered
+            headless=render_mode is None,
+            event_history=event_history,
         )
 
         self.reward_tracker = MultiAgentRewards(
@@ -124,22 +138,79 @@ class MultiagentZombsoleEnv(object):
             done (dict[AgentID, bool]): whether the episode has ended for each agent ID, in which case subsequent steps() calls might not return info for such an agent
             truncated (dict[AgentID, bool]): whether the episode has expired without a clear outcome for each agent ID, in which case further step() calls will return undefined results for that agent ID
             info (dict[AgentID, dict]): contains auxiliary diagnostic information (helpful for debugging, and sometimes learning) for each agent ID
+
+        When the environment was built with an action_repeat greater than 1,
+        the actions are repeated that many ticks (see step_sequence).
+        """
+        if self.action_repeat > 1:
+            return self.step_sequence([action] * self.action_repeat)
+
+        rewards, done, truncated = self._step_tick(action)
+
+        if self.frames_per_second is not None:
+            time.sleep(1.0 / self.frames_per_second)
+
+        observations = self.get_observation()
+        info = {}
+
+        # Update the active list of agents
+        self._update_active_agents()
+
+        return observations, rewards, done, truncated, info
+
+    def step_sequence(self, actions, return_all=False):
+        """
+        Applies a list of action dictionaries, one per tick, stopping early if the game ends.
+
+        By default, the observations are only built after the last tick, and a single
+        transition is returned with the rewards of all the ticks accumulated for each agent ID,
+        and the number of ticks played in the info dictionary (under "ticks").
+        If return_all is True, a list with the transition of each tick played is returned instead.
+        """
+        transitions = []
+        total_rewards = {}
+        done = {}
+        truncated = {}
+        observations = {}
+        ticks = 0
+        for action in actions:
+            rewards, done, truncated = self._step_tick(action)
+            ticks += 1
+            for agent_id, reward in rewards.items():
+                total_rewards[agent_id] = total_rewards.get(agent_id, 0.0) + reward
+
+            last = any(done.values()) or any(truncated.values()) or (ticks == len(actions))
+            if return_all:
+                transitions.append((self.get_observation(), rewards, done, truncated, {}))
+            elif last:
+                observations = self.get_observation()
+            self._update_active_agents()
+            if last:
+                break
+
+        if return_all:
+            return transitions
+        return observations, total_rewards, done, truncated, {"ticks": ticks}
+
+    def _update_active_agents(self):
+        self.agents = [agent.agent_id for agent in self.game.agents if agent.life > 0]
+
+    def _step_tick(self, action):
+        """
+        Forward the game one tick, without building the observations.
+
+        Returns the reward, terminated and truncated dictionaries of the tick, keyed by the
+        agents active before the tick.
         """
         agent_actions = self._process_action(action)
         for agent in self.game.agents:
             agent_action = agent_actions.get(agent.agent_id, {"action_type": "heal", "parameter": [0, 0]})
             agent.set_action(agent_action)
 
-        self.game.world.step()
+        self.game.step()
         
         rewardslist = self.reward_tracker.update(self.game.agents, self.game.world)
 
-        # maintain the flow of zombies if necessary
-        self.game.spawn_zombies_to_maintain_minimum()
-
-        if self.frames_per_second is not None:
-            time.sleep(1.0 / self.frames_per_second)
-
         doneflag = False
         truncatedflag = False
         end_reward = 0.0
@@ -160,26 +231,24 @@ class MultiagentZombsoleEnv(object):
                     rewards[agent.agent_id] = reward + end_reward
                 else:
                     rewards[agent.agent_id] = reward
-        observations = self.get_observation()
-        info = {}
         done = { agent_id: doneflag for agent_id in self.agents }
         truncated = { agent_id: truncatedflag for agent_id in self.agents }
 
-        # Update the active list of agents
-        self.agents = [agent.agent_id for agent in self.game.agents if agent.life > 0]
-
-        return observations, rewards, done, truncated, info
+        return rewards, done, truncated
 
     def reset(self, seed=None, options=None):
         """Resets the environment to an initial state and returns an initial
         observation.
 
+        A seed reseeds the random number generator of the game (see Game),
+        not the global one of the random module.
+
         Returns:
             dictionary of observations (dict[AgentID, ObsType]): the initial observations
             dictionary of info (dict[AgentID, dict]): additional information for each agent
         """
         self.agents = self.possible_agents
-        self.game.__initialize_world__()
+        self.game.reset(seed)
         self.reward_tracker.reset(self.game.agents, self.game.world)
         return self.get_observation(), {}
 
@@ -289,6 +358,8 @@ class MultiagentZombsoleEnvDiscreteAction(MultiAgentWrapper):
                  render_mode=None,
                  observation_surroundings_width=21,
                  agent_weapons="rifle",
+                 action_repeat=1,
+                 observation_objective_distance=False,
                  debug=False):
         env = MultiagentZombsoleEnv(
             rules_name, player_names, map_name, agent_ids, 
@@ -296,6 +367,8 @@ class MultiagentZombsoleEnvDiscreteAction(MultiAgentWrapper):
             render_mode=render_mode,
             observation_surroundings_width=observation_surroundings_width,
             agent_weapons=agent_weapons,
+            action_repeat=action_repeat,
+            observation_objective_distance=observation_objective_distance,
             debug=debug
         )
         super().__init__(env)
@@ -308,6 +381,9 @@ class MultiagentZombsoleEnvDiscreteAction(MultiAgentWrapper):
     def step(self, actions):
         return super().step(self.actions(actions))
 
+    def step_sequence(self, actions, return_all=False):
+        return self.env.step_sequence([self.actions(action) for action in actions], return_all=return_all)
+
     def actions(self, actions):
         return {
             agent_id: self.game_actions[action] for agent_id, action in actions.items()
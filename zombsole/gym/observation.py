@@ -2,10 +2,48 @@ from abc import ABC, abstractmethod
 from typing import Tuple
 from gymnasium.spaces import Box
 from zombsole.game import Game
+from zombsole.navigation import UNREACHABLE
 from zombsole.things import Wall
 import numpy as np
 
 
+# Rules with an objective distance channel, and the cap of the distances
+# (also used for the cells the objective can't be reached from)
+OBJECTIVE_DISTANCE_RULES = ["safehouse", "evacuation"]
+OBJECTIVE_DISTANCE_CAP = 255
+
+
+def objective_distances(game: Game, observer=None):
+    """The walkable distance from each cell of the world to the objective, as
+       a (height, width) array capped at OBJECTIVE_DISTANCE_CAP.
+
+       The objective is the closest objective location for safehouse (using
+       the distance field precomputed for the map), and the closest alive
+       teammate of the observer for evacuation (computed on each call).
+    """
+    navigation = game.world.navigation
+    if game.rules_name == "safehouse":
+        field = navigation.distance_field(game.map.objectives)
+    elif game.rules_name == "evacuation":
+        teammates = [player.position for player in game.get_all_players()
+                     if player.life > 0 and player is not observer]
+        field = navigation.compute_distance_field(teammates)
+    else:
+        raise ValueError(f"The objective distance channel isn't available for the {game.rules_name} rules, only for {', '.join(OBJECTIVE_DISTANCE_RULES)}")
+
+    width, height = game.world.size
+    distances = np.frombuffer(field, dtype=np.int32)[:width * height].reshape((height, width))
+    return np.where(distances == UNREACHABLE, OBJECTIVE_DISTANCE_CAP,
+                    np.minimum(distances, OBJECTIVE_DISTANCE_CAP))
+
+
+def surroundings_window(distances, position: Tuple[int, int], half_width: int):
+    """The window of the distances around a position (capped outside of the world)."""
+    padded = np.pad(distances, half_width, constant_values=OBJECTIVE_DISTANCE_CAP)
+    return padded[position[1]:position[1] + 2 * half_width + 1,
+                  position[0]:position[0] + 2 * half_width + 1]
+
+
 class SinglePlayerObservation(ABC):
     @abstractmethod
     def get_observation(self, game: Game):
@@ -33,18 +71,32 @@ class SinglePlayerObservation(ABC):
         'Shotgun': 14
     }
 
+    # Drawn outside of the world (the position isn't meaningful)
+    out_of_bounds_wall = Wall(None)
+
     @staticmethod
-    def encode_position_simple(world, position):
-        """Get the character to draw for a given position of the world."""
+    def thing_at(world, position):
+        """Get the thing to encode for a position of the world, and its life."""
+        if not world.within_bounds(position):
+            wall = SinglePlayerObservation.out_of_bounds_wall
+            return wall, wall.life
+
+        # static terrain is read from the grid, without materializing it
+        thing = world.terrain.prototype(position)
+        if thing is not None:
+            return thing, world.terrain.life(position)
+
         # decorations first, then things over them
-        if world.within_bounds(position):
-            thing = (world.things.get(position) or
-                     world.decoration.get(position))
-        else:
-            thing = Wall(position) # Note the position is out of bounds here
+        thing = (world.things.get(position) or
+                 world.decoration.get(position))
+        return thing, getattr(thing, 'life', 0)
 
+    @staticmethod
+    def encode_position_simple(world, position):
+        """Get the character to draw for a given position of the world."""
+        thing, life = SinglePlayerObservation.thing_at(world, position)
         if thing is not None:
-            adj_life = min(getattr(thing, 'life', 0), 100)
+            adj_life = min(life, 100)
             scaled_life = 15*adj_life//100
             thing_code = SinglePlayerObservation.thing_labels.get(thing.icon_basic, 0)
             weapon = getattr(thing, 'weapon', None)
@@ -57,15 +109,8 @@ class SinglePlayerObservation(ABC):
     @staticmethod
     def encode_position_as_channels(world, position):
         """Get the character to draw for a given position of the world."""
-        # decorations first, then things over them
-        if world.within_bounds(position):
-            thing = (world.things.get(position) or
-                     world.decoration.get(position))
-        else:
-            thing = Wall(position) # Note the position is out of bounds here
-
+        thing, life = SinglePlayerObservation.thing_at(world, position)
         if thing is not None:
-            life = getattr(thing, 'life', 0)
             weapon = getattr(thing, 'weapon', None)
             weapon_name = weapon.name if weapon is not None else 'none'
             weapon_code = SinglePlayerObservation.weapon_labels.get(weapon_name, 0)
@@ -119,61 +164,97 @@ class SinglePlayerObservation(ABC):
         ]
     
 
+# With objective_distance, the observations get an extra last channel with the
+# walkable distance to the objective (see objective_distances)
+
 class WorldSimpleObservation(SinglePlayerObservation):
-    def __init__(self, map_size: Tuple[int, int]):
+    def __init__(self, map_size: Tuple[int, int], objective_distance: bool = False):
         self.map_size = map_size
+        self.objective_distance = objective_distance
 
     def get_observation(self, game: Game):
         observation = np.array(SinglePlayerObservation.encode_world_simple(game.world), dtype=np.int32)
-        return observation.reshape( (1,) + observation.shape )
+        observation = observation.reshape( (1,) + observation.shape )
+        if self.objective_distance:
+            distances = objective_distances(game, game.agents[0])
+            observation = np.concatenate((observation, distances[np.newaxis].astype(np.int32)))
+        return observation
 
     def get_observation_space(self):
-        return Box(low=0, high=8*16*16, shape=(1, self.map_size[1], self.map_size[0]), dtype=np.int32)
+        channels = 2 if self.objective_distance else 1
+        return Box(low=0, high=8*16*16, shape=(channels, self.map_size[1], self.map_size[0]), dtype=np.int32)
 
 
 class WorldChannelsObservation(SinglePlayerObservation):
-    def __init__(self, map_size: Tuple[int, int]):
+    def __init__(self, map_size: Tuple[int, int], objective_distance: bool = False):
         self.map_size = map_size
+        self.objective_distance = objective_distance
 
     def get_observation(self, game: Game):
-        return np.array(SinglePlayerObservation.encode_world_with_channels(game.world), dtype=np.int32).transpose((2, 0, 1))
+        observation = np.array(SinglePlayerObservation.encode_world_with_channels(game.world), dtype=np.int32).transpose((2, 0, 1))
+        if self.objective_distance:
+            distances = objective_distances(game, game.agents[0])
+            observation = np.concatenate((observation, distances[np.newaxis].astype(np.int32)))
+        return observation
 
     def get_observation_space(self):
+        if self.objective_distance:
+            return Box(low=0, high=OBJECTIVE_DISTANCE_CAP, shape=(4, self.map_size[1], self.map_size[0]), dtype=np.int32)
         return Box(low=0, high=128, shape=(3, self.map_size[1], self.map_size[0]), dtype=np.int32)
 
 
 class SurroundingsSimpleObservation(SinglePlayerObservation):
-    def __init__(self, surroundings_width: int):
+    def __init__(self, surroundings_width: int, objective_distance: bool = False):
         self.width = surroundings_width
         self.half_width = surroundings_width // 2
+        self.objective_distance = objective_distance
 
     def get_observation(self, game: Game):
         agent = game.agents[0]
         observation = np.array(SinglePlayerObservation.encode_surroundings_simple(game.world, agent.position, self.half_width), dtype=np.int32)
-        return observation.reshape( (1,) + observation.shape )
+        observation = observation.reshape( (1,) + observation.shape )
+        if self.objective_distance:
+            distances = surroundings_window(objective_distances(game, agent), agent.position, self.half_width)
+            observation = np.concatenate((observation, distances[np.newaxis].astype(np.int32)))
+        return observation
 
     def get_observation_space(self):
-        return Box(low=0, high=8*16*16, shape=(1, self.width, self.width), dtype=np.int32)
+        channels = 2 if self.objective_distance else 1
+        return Box(low=0, high=8*16*16, shape=(channels, self.width, self.width), dtype=np.int32)
 
 
 class SurroundingsChannelsObservation(SinglePlayerObservation):
-    def __init__(self, surroundings_width: int):
+    def __init__(self, surroundings_width: int, objective_distance: bool = False):
         self.width = surroundings_width
         self.half_width = surroundings_width // 2
+        self.objective_distance = objective_distance
 
     def get_observation(self, game: Game):
         agent = game.agents[0]
-        return np.array(SinglePlayerObservation.encode_surroundings_with_channels(game.world, agent.position, self.half_width), dtype=np.int32).transpose((2, 0, 1))
+        observation = np.array(SinglePlayerObservation.encode_surroundings_with_channels(game.world, agent.position, self.half_width), dtype=np.int32).transpose((2, 0, 1))
+        if self.objective_distance:
+            distances = surroundings_window(objective_distances(game, agent), agent.position, self.half_width)
+            observation = np.concatenate((observation, distances[np.newaxis].astype(np.int32)))
+        return observation
 
     def get_observation_space(self):
+        if self.objective_distance:
+            return Box(low=0, high=OBJECTIVE_DISTANCE_CAP, shape=(4, self.width, self.width), dtype=np.int32)
         return Box(low=0, high=128, shape=(3, self.width, self.width), dtype=np.int32)
 
     # This additional method is used for MultiAgent observations
     def get_observation_at_position(self, game: Game, position: Tuple[int, int]):
-        return np.array(SinglePlayerObservation.encode_surroundings_with_channels(game.world, position, self.half_width)).transpose((2, 0, 1))
+        observation = np.array(SinglePlayerObservation.encode_surroundings_with_channels(game.world, position, self.half_width)).transpose((2, 0, 1))
+        if self.objective_distance:
+            # the observer is the agent at the position
+            observer = game.world.things.get(position)
+            distances = surroundings_window(objective_distances(game, observer), position, self.half_width)
+            observation = np.concatenate((observation, distances[np.newaxis].astype(observation.dtype)))
+        return observation
 
 
-def build_observation(scope: str, position_encoding_style: str, map_size: Tuple[int, int]) -> SinglePlayerObservation:
+def build_observation(scope: str, position_encoding_style: str, map_size: Tuple[int, int],
+                      objective_distance: bool = False) -> SinglePlayerObservation:
     lscope = scope.lower()
     is_world_scope = False
     surroundings_width = None
@@ -193,16 +274,17 @@ def build_observation(scope: str, position_encoding_style: str, map_size: Tuple[
 
     if is_world_scope:
         if lpes == "simple":
-            return WorldSimpleObservation(map_size)
+            return WorldSimpleObservation(map_size, objective_distance)
         else:
-            return WorldChannelsObservation(map_size)
+            return WorldChannelsObservation(map_size, objective_distance)
     else:
         if lpes == "simple":
-            return SurroundingsSimpleObservation(surroundings_width)
+            return SurroundingsSimpleObservation(surroundings_width, objective_distance)
         else:
-            return SurroundingsChannelsObservation(surroundings_width)
+            return SurroundingsChannelsObservation(surroundings_width, objective_distance)
 
-def build_surroundings_observation(surroundings_width: int, position_encoding_style: str) -> SinglePlayerObservation:
+def build_surroundings_observation(surroundings_width: int, position_encoding_style: str,
+                                   objective_distance: bool = False) -> SinglePlayerObservation:
     if (surroundings_width % 2 == 0) or (surroundings_width <= 1):
         raise ValueError("surroundings width must be an odd number greater than 1")
     
@@ -211,7 +293,7 @@ def build_surroundings_observation(surroundings_width: int, position_encoding_st
         raise ValueError(f"{lpes} must be \"simple\" or \"channels\"")
 
     if lpes == "simple":
-        return SurroundingsSimpleObservation(surroundings_width)
+        return SurroundingsSimpleObservation(surroundings_width, objective_distance)
     else:
-        return SurroundingsChannelsObservation(surroundings_width)
+        return SurroundingsChannelsObservation(surroundings_width, objective_distance)
 
@@ -5,7 +5,7 @@ from gymnasium.core import Env
 from gymnasium.spaces import Text, Box, Dict
 from gymnasium.spaces.discrete import Discrete
 from gymnasium.envs.registration import register
-from zombsole.gym.observation import build_observation
+from zombsole.gym.observation import build_observation, OBJECTIVE_DISTANCE_RULES
 from zombsole.gym.reward import AgentRewards
 from zombsole.game import Game, Map
 from zombsole.renderer import build_renderer
@@ -50,7 +50,16 @@ class ZombsoleGymEnv(Env):
                  minimum_zombies=0, render_mode=None,
                  observation_scope="world", observation_position_encoding="simple", 
                  agent_weapon="rifle",
-                 debug=False):
+                 action_repeat=1,
+                 observation_objective_distance=False,
+                 debug=False,
+                 event_history=None):
+        if action_repeat < 1:
+            raise ValueError("action_repeat must be at least 1")
+        if observation_objective_distance and rules_name not in OBJECTIVE_DISTANCE_RULES:
+            raise ValueError(f"observation_objective_distance is only available for the {', '.join(OBJECTIVE_DISTANCE_RULES)} rules")
+        self.action_repeat = action_repeat
+
         fdir = path.dirname(path.abspath(__file__))
         map_file = path.join(fdir, 'maps', map_name)
         map_ = Map.from_file(map_file)
@@ -68,10 +77,14 @@ class ZombsoleGymEnv(Env):
             renderer=renderer,
             agent_weapons=[agent_weapon],
             debug=debug,
+            # Nobody reads the events and statuses when the game isn't rendered
+            headless=render_mode is None,
+            event_history=event_history,
         )
 
         self.observation_handler = build_observation(
-                observation_scope, observation_position_encoding, map_.size
+                observation_scope, observation_position_encoding, map_.size,
+                objective_distance=observation_objective_distance
         )
         self.observation_space = self.observation_handler.get_observation_space()
 
@@ -102,6 +115,8 @@ class ZombsoleGymEnv(Env):
         to reset this environment's state.
 
         Accepts an action and returns a tuple (observation, reward, done, info).
+        When the environment was built with an action_repeat greater than 1,
+        the action is repeated that many ticks (see step_sequence).
 
         Args:
             action (object): an action provided by the agent
@@ -112,20 +127,53 @@ class ZombsoleGymEnv(Env):
             done (bool): whether the episode has ended, in which case further step() calls will return undefined results
             info (dict): contains auxiliary diagnostic information (helpful for debugging, and sometimes learning)
         """
-        self.game.agents[0].set_action(action)
+        if self.action_repeat > 1:
+            return self.step_sequence([action] * self.action_repeat)
 
-        frames_per_second=None
+        reward, done, truncated = self._step_tick(action)
+        observation = self.get_observation()
+        info = {}
 
-        self.game.world.step()
-        
-        reward = self.reward_tracker.update(self.game.agents, self.game.world)
+        return observation, reward, done, truncated, info
 
-        # maintain the flow of zombies if necessary
-        self.game.spawn_zombies_to_maintain_minimum()
+    def step_sequence(self, actions, return_all=False):
+        """Apply a list of actions, one per tick, stopping early if the game
+        ends or the agent dies.
 
-        observation = self.get_observation()
-        if frames_per_second is not None:
-            time.sleep(1.0 / frames_per_second)
+        By default, the observation is only built after the last tick, and a
+        single transition is returned with the rewards of all the ticks
+        accumulated, and the number of ticks played in the info dict (under
+        "ticks"). If return_all is True, a list with the transition of each
+        tick played is returned instead.
+        """
+        transitions = []
+        total_reward = 0.0
+        done = False
+        truncated = False
+        ticks = 0
+        for action in actions:
+            reward, done, truncated = self._step_tick(action)
+            total_reward += reward
+            ticks += 1
+            if return_all:
+                transitions.append((self.get_observation(), reward, done, truncated, {}))
+            if done or truncated:
+                break
+
+        if return_all:
+            return transitions
+        return self.get_observation(), total_reward, done, truncated, {"ticks": ticks}
+
+    def _step_tick(self, action):
+        """Forward the game one tick, without building the observation.
+
+        Returns the reward, done and truncated values of the tick.
+        """
+        self.game.agents[0].set_action(action)
+
+        self.game.step()
+        
+        reward = self.reward_tracker.update(self.game.agents, self.game.world)
 
         done = False
         truncated = False
@@ -139,10 +187,8 @@ class ZombsoleGymEnv(Env):
             truncated = True
             end_reward = self.reward_tracker.get_game_end_reward(False)
             reward += end_reward
-        
-        info = {}
 
-        return observation, reward, done, truncated, info
+        return reward, done, truncated
 
 
     def reset(self, seed=None, options=None):
@@ -155,11 +201,14 @@ class ZombsoleGymEnv(Env):
         words, each call of `reset()` should yield an environment suitable for
         a new episode, independent of previous episodes.
 
+        A seed reseeds the random number generator of the game (see Game),
+        not the global one of the random module.
+
         Returns:
             observation (object): the initial observation.
         """
         super().reset(seed=seed)
-        self.game.__initialize_world__()
+        self.game.reset(seed)
         self.reward_tracker.reset(self.game.agents, self.game.world)
         return self.get_observation(), {}
 
@@ -354,12 +403,16 @@ class ZombsoleGymEnvDiscreteAction(Wrapper):
                  initial_zombies=0, minimum_zombies=0, 
                  render_mode=None,
                  observation_scope="world", observation_position_encoding="simple", 
+                 action_repeat=1,
+                 observation_objective_distance=False,
                  debug=False):
         env = ZombsoleGymEnv(
             rules_name, player_names, map_name, agent_id, 
             initial_zombies=initial_zombies, minimum_zombies=minimum_zombies,
             render_mode=render_mode,
             observation_scope=observation_scope, observation_position_encoding=observation_position_encoding,
+            action_repeat=action_repeat,
+            observation_objective_distance=observation_objective_distance,
             debug=debug
         )
         super().__init__(env)
@@ -372,6 +425,9 @@ class ZombsoleGymEnvDiscreteAction(Wrapper):
     def step(self, action):
         return super().step(self.action(action))
 
+    def step_sequence(self, actions, return_all=False):
+        return self.env.step_sequence([self.action(action) for action in actions], return_all=return_all)
+
     def action(self, action):
         return self.game_actions[action]
 
@@ -0,0 +1,213 @@
+"""Binary framed encoding for the interactive protocol of zombsole-stdio-json
+
+The binary mode is negotiated from the JSON mode with a SetProtocol request:
+
+    {"tag": "SetProtocol", "parameters": {"mode": "binary", "compression": "zlib"}}
+
+The server acknowledges with a Protocol response, still in the JSON mode, and
+from then on both directions use length-prefixed frames. All integers and
+floats are little endian.
+
+Each frame is a u32 body length followed by the body, which starts with a u8
+frame type.
+
+Client to server:
+
+    FRAME_JSON (1): a utf-8 JSON GameRequest, as sent in the JSON mode.
+    FRAME_ACTION (2): a compact GameAction,
+        u16 entry count, and for each entry:
+            u8 agent id length, agent id (utf-8, empty in single agent mode),
+            u8 action code (index in ACTION_TYPES), i16 dx, i16 dy
+
+Server to client:
+
+    FRAME_JSON (1): a utf-8 JSON GameResponse, as sent in the JSON mode.
+    FRAME_OBSERVATION (3): a GameObservation,
+        u8 compression (0 for none, 1 for zlib), u16 entry count, and for each
+        entry:
+            u8 agent id length, agent id (utf-8, empty in single agent mode),
+            f64 reward, u8 flags (1: done, 2: truncated),
+            u8 dtype length, dtype (numpy dtype string, e.g. "<i4"),
+            u8 ndim, u32 for each dimension of the shape,
+            u32 data length, data (C order array bytes, compressed if enabled)
+
+A zero length dtype indicates the entry has no observation.
+
+A GameObservationBatch response is sent as a JSON frame with the number of
+transitions ({"tag": "GameObservationBatch", "parameters": {"count": n}}),
+followed by an observation frame for each transition.
+
+In both directions, a frame can be wrapped in a session frame addressing one
+of the games hosted by a multi-game server:
+
+    FRAME_SESSION (4): u8 game id length, game id (utf-8), wrapped frame body
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+
+FRAME_JSON = 1
+FRAME_ACTION = 2
+FRAME_OBSERVATION = 3
+FRAME_SESSION = 4
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_CODES = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+}
+
+FLAG_DONE = 1
+FLAG_TRUNCATED = 2
+
+ACTION_TYPES = [None, "move", "attack", "attack_closest", "heal", "heal_closest"]
+
+_FRAME_HEADER = struct.Struct("<I")
+_ACTION = struct.Struct("<Bhh")
+_ENTRY_COUNT = struct.Struct("<H")
+_OBSERVATION_HEADER = struct.Struct("<BH")
+_REWARD_FLAGS = struct.Struct("<dB")
+_U32 = struct.Struct("<I")
+
+
+def _pack_id(agent_id) -> bytes:
+    data = str(agent_id).encode("utf-8") if agent_id is not None else b""
+    return bytes([len(data)]) + data
+
+
+def _unpack_id(body: bytes, offset: int):
+    size = body[offset]
+    offset += 1
+    return body[offset:offset + size].decode("utf-8"), offset + size
+
+
+def frame(body: bytes) -> bytes:
+    """Prefix a frame body with its length."""
+    return _FRAME_HEADER.pack(len(body)) + body
+
+
+def read_frame(stream) -> bytes:
+    """Read a frame body from a binary stream, raising EOFError at the end."""
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        raise EOFError("end of stream")
+    (size,) = _FRAME_HEADER.unpack(header)
+    body = stream.read(size)
+    if len(body) < size:
+        raise EOFError("end of stream in the middle of a frame")
+    return body
+
+
+def encode_json_frame(obj, encoder: json.JSONEncoder) -> bytes:
+    return frame(bytes([FRAME_JSON]) + encoder.encode(obj).encode("utf-8"))
+
+
+def encode_session_frame(game_id, data: bytes) -> bytes:
+    """Wrap a frame (as returned by the encode functions) in a session frame."""
+    return frame(bytes([FRAME_SESSION]) + _pack_id(game_id) + data[_FRAME_HEADER.size:])
+
+
+def decode_session_frame(body: bytes):
+    """Decode the body of a session frame into the game id and the wrapped body."""
+    game_id, offset = _unpack_id(body, 1)
+    return game_id, body[offset:]
+
+
+def encode_action_frame(actions) -> bytes:
+    """Encode a list of (agent id, action dict) pairs as an action frame."""
+    body = bytearray([FRAME_ACTION])
+    body.extend(_ENTRY_COUNT.pack(len(actions)))
+    for agent_id, action in actions:
+        parameter = action.get("parameter", None) or (0, 0)
+        body.extend(_pack_id(agent_id))
+        body.extend(_ACTION.pack(ACTION_TYPES.index(action.get("action_type", None)),
+                                 int(parameter[0]), int(parameter[1])))
+    return frame(bytes(body))
+
+
+def decode_action_frame(body: bytes):
+    """Decode the body of an action frame into (agent id, action dict) pairs."""
+    (count,) = _ENTRY_COUNT.unpack_from(body, 1)
+    offset = 1 + _ENTRY_COUNT.size
+    actions = []
+    for _ in range(count):
+        agent_id, offset = _unpack_id(body, offset)
+        code, dx, dy = _ACTION.unpack_from(body, offset)
+        offset += _ACTION.size
+        if code >= len(ACTION_TYPES):
+            raise ValueError(f"{code} is not a valid action code")
+        actions.append((agent_id, {"action_type": ACTION_TYPES[code], "parameter": [dx, dy]}))
+    return actions
+
+
+def _encode_array(body: bytearray, array, compression: int, compression_level: int):
+    if array is None:
+        body.append(0)
+        return
+    array = np.asarray(array)
+    dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+    dtype_str = dtype.str.encode("ascii")
+    body.append(len(dtype_str))
+    body.extend(dtype_str)
+    body.append(array.ndim)
+    for dim in array.shape:
+        body.extend(_U32.pack(dim))
+    data = np.ascontiguousarray(array, dtype=dtype).tobytes()
+    if compression == COMPRESSION_ZLIB:
+        data = zlib.compress(data, compression_level)
+    body.extend(_U32.pack(len(data)))
+    body.extend(data)
+
+
+def encode_observation_frame(entries, compression: int = COMPRESSION_NONE,
+                             compression_level: int = 1) -> bytes:
+    """Encode observation entries as an observation frame.
+
+    Each entry is a tuple (agent id, observation array or None, reward, done, truncated).
+    """
+    body = bytearray([FRAME_OBSERVATION])
+    body.extend(_OBSERVATION_HEADER.pack(compression, len(entries)))
+    for agent_id, observation, reward, done, truncated in entries:
+        body.extend(_pack_id(agent_id))
+        flags = (FLAG_DONE if done else 0) | (FLAG_TRUNCATED if truncated else 0)
+        body.extend(_REWARD_FLAGS.pack(float(reward), flags))
+        _encode_array(body, observation, compression, compression_level)
+    return frame(bytes(body))
+
+
+def decode_observation_frame(body: bytes):
+    """Decode the body of an observation frame into entries.
+
+    The entries have the structure described in encode_observation_frame.
+    """
+    compression, count = _OBSERVATION_HEADER.unpack_from(body, 1)
+    offset = 1 + _OBSERVATION_HEADER.size
+    entries = []
+    for _ in range(count):
+        agent_id, offset = _unpack_id(body, offset)
+        reward, flags = _REWARD_FLAGS.unpack_from(body, offset)
+        offset += _REWARD_FLAGS.size
+        dtype_size = body[offset]
+        offset += 1
+        observation = None
+        if dtype_size:
+            dtype = np.dtype(body[offset:offset + dtype_size].decode("ascii"))
+            offset += dtype_size
+            ndim = body[offset]
+            offset += 1
+            shape = struct.unpack_from("<" + "I" * ndim, body, offset)
+            offset += _U32.size * ndim
+            (size,) = _U32.unpack_from(body, offset)
+            offset += _U32.size
+            data = body[offset:offset + size]
+            offset += size
+            if compression == COMPRESSION_ZLIB:
+                data = zlib.decompress(data)
+            observation = np.frombuffer(data, dtype=dtype).reshape(shape)
+        entries.append((agent_id, observation, reward,
+                        bool(flags & FLAG_DONE), bool(flags & FLAG_TRUNCATED)))
+    return entries
@@ -2,26 +2,78 @@
 
 Usage:
     ./zombsole-stdio-json --help
-    ./zombsole-stdio-json [-r RENDERER] [--multi-agent]
+    ./zombsole-stdio-json [-r RENDERER] [--multi-agent] [--multi-game [--workers WORKERS]] [--profile FILE] [--profiler PROFILER] [--profile-filter MODULE] [--trace-memory]
 
 Arguments:
     RENDERER: Should be one of the following: opencv or none
 
+Requests are read as JSON lines from stdin, and responses are written as JSON
+lines to stdout. A client can switch to the binary framed encoding described
+in zombsole.interactive_binary with a SetProtocol request.
+
+When the game config sets "observation_delta" to true, GameObservation
+responses (in the JSON mode) carry a sequence number, and only every
+"delta_keyframe_interval" observations (and on StartGame) a full "observation"
+(a keyframe). The other responses carry an "observation_delta" with the
+changes since the previous observation: a list of [channel, y, x, value]
+entries in single agent mode, or for each agent a list of [channel, y, row]
+entries with the changed rows. A client detecting a gap in the sequence
+numbers can send a Resync request to get a keyframe.
+
+The GameState response to a GameStatus request has a "memory" report of the
+game (see zombsole.memory), with the top allocators when tracing the memory
+allocations (--trace-memory).
+
+A GameActionBatch request plays several ticks with a single request, either
+repeating an action ("action" and "repeat") or applying a list of actions
+("actions"), stopping early if the game ends. With "return" set to "last" (the
+default) a single GameObservation is sent, with the rewards accumulated and the
+number of ticks played in the info (under "ticks"); with "all" a
+GameObservationBatch is sent with the "transitions" of all the ticks played.
+
+The responses to a request with "timing" set to true (in the JSON mode) carry
+a "step_time": the seconds the server took handling the request, without
+decoding it and encoding the responses (see zombsole.loadtest).
+
 Options:
     -h --help            Show this help.
     -r RENDERER          The renderer to use, either opencv or none
                          [default: none]
     -m, --multi-agent    Play Multi-Agent Zombsole
+    -g, --multi-game     Host many games, addressed by the game_id of each
+                         request (see zombsole.interactive_sessions)
+    --workers WORKERS    Where the games of a multi-game server run, either
+                         none (inline), thread or process [default: none]
+    --profile FILE       Profile the session, writing the statistics (pstats)
+                         to FILE, and the collapsed stacks (for flame
+                         graphs) to FILE.folded (see zombsole.profiling)
+    --profiler PROFILER  The profiler to use, either cprofile
+                         (deterministic) or sampling [default: cprofile]
+    --profile-filter MODULE
+                         Only report the frames of the modules of a
+                         package, like zombsole
+    --trace-memory       Trace the memory allocations (with tracemalloc), for
+                         the memory reports of the GameStatus responses
 """
 import sys
 import json
+import tracemalloc
+from time import perf_counter
 from json import JSONEncoder
 from typing import Dict, Union
 from abc import ABC, abstractmethod
 from docopt import docopt
+import numpy as np
 from zombsole.gym_env import ZombsoleGymEnv
 from zombsole.gym.multiagent_env import MultiagentZombsoleEnv
 from zombsole.renderer import GameRenderer, build_renderer
+from zombsole import interactive_binary
+from zombsole.memory import memory_report
+
+
+# The ticks of events kept by the games of the sessions (rendered games log
+# events), as a session can play for a long time
+SESSION_EVENT_HISTORY = 10
 
 
 class GameResponse(ABC):
@@ -41,6 +93,11 @@ class GameResponse(ABC):
 
 class GameStateEncoder(JSONEncoder):
     def default(self, o: GameResponse):
+        # Observations are kept as numpy arrays until they are encoded
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        elif isinstance(o, np.generic):
+            return o.item()
         try:
             d = o.to_dict()
         except TypeError:
@@ -51,33 +108,138 @@ class GameStateEncoder(JSONEncoder):
         return super().default(o)
 
 class GameStateResponse(GameResponse):
-    def __init__(self, status: str, active: bool, config_required: bool, last_observation: Union[None, Dict] = None):
+    def __init__(self, status: str, active: bool, config_required: bool, last_observation: Union[None, Dict] = None,
+                 memory: Union[None, Dict] = None):
         self.status = status
         self.active = active
         self.config_required = config_required
         self.last_observation = last_observation
+        # The memory report of the game (see zombsole.memory), only sent in
+        # the responses to GameStatus
+        self.memory = memory
 
     def get_tag(self) -> str:
         return "GameState"
     
     def get_parameters(self) -> Dict:
-        return {
+        parameters = {
             "status": self.status,
             "active": self.active,
             "config_required": self.config_required,
             "last_observation": self.last_observation
         }
+        if self.memory is not None:
+            parameters["memory"] = self.memory
+        return parameters
 
 class GameObservationResponse(GameResponse):
-    def __init__(self, last_observation: Dict = None):
+    def __init__(self, last_observation: Dict = None, delta_parameters: Dict = None):
         self.last_observation = last_observation
+        # Set when observation deltas are enabled (the binary mode always
+        # uses the full observation)
+        self.delta_parameters = delta_parameters
 
     def get_tag(self) -> str:
         return "GameObservation"
     
     def get_parameters(self) -> Dict:
+        if self.delta_parameters is not None:
+            return self.delta_parameters
         return self.last_observation
 
+class GameObservationBatchResponse(GameResponse):
+    def __init__(self, observations):
+        # A list of observation responses
+        self.observations = observations
+
+    def get_tag(self) -> str:
+        return "GameObservationBatch"
+
+    def get_parameters(self) -> Dict:
+        return {
+            "transitions": [observation.get_parameters() for observation in self.observations]
+        }
+
+class ProtocolResponse(GameResponse):
+    def __init__(self, mode: str, compression: str):
+        self.mode = mode
+        self.compression = compression
+
+    def get_tag(self) -> str:
+        return "Protocol"
+
+    def get_parameters(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "compression": self.compression
+        }
+
+class SessionResponse(GameResponse):
+    """A response of one of the games hosted by a multi-game server."""
+    def __init__(self, game_id: str, response: GameResponse):
+        self.game_id = game_id
+        self.response = response
+
+    def to_dict(self) -> Dict:
+        d = self.response.to_dict()
+        d["game_id"] = self.game_id
+        return d
+
+    def get_tag(self) -> str:
+        return self.response.get_tag()
+
+    def get_parameters(self) -> Dict:
+        return self.response.get_parameters()
+
+class CorrelatedResponse(GameResponse):
+    """A response to a request sent with a request_id (correlation id)."""
+    def __init__(self, request_id, response: GameResponse):
+        self.request_id = request_id
+        self.response = response
+
+    def to_dict(self) -> Dict:
+        d = self.response.to_dict()
+        d["request_id"] = self.request_id
+        return d
+
+    def get_tag(self) -> str:
+        return self.response.get_tag()
+
+    def get_parameters(self) -> Dict:
+        return self.response.get_parameters()
+
+class TimedResponse(GameResponse):
+    """A response to a request sent with "timing", with the seconds the server
+       took handling the request."""
+    def __init__(self, step_time: float, response: GameResponse):
+        self.step_time = step_time
+        self.response = response
+
+    def to_dict(self) -> Dict:
+        d = self.response.to_dict()
+        d["step_time"] = self.step_time
+        return d
+
+    def get_tag(self) -> str:
+        return self.response.get_tag()
+
+    def get_parameters(self) -> Dict:
+        return self.response.get_parameters()
+
+class SessionsResponse(GameResponse):
+    def __init__(self, game_ids, active: bool):
+        self.game_ids = game_ids
+        self.active = active
+
+    def get_tag(self) -> str:
+        return "Sessions"
+
+    def get_parameters(self) -> Dict:
+        return {
+            "game_ids": self.game_ids,
+            "active": self.active
+        }
+
 class ErrorResponse(GameResponse):
     def __init__(self, message: str):
         self.message = message
@@ -92,6 +254,8 @@ class GameConfig(object):
     def __init__(self, rules_name: str, map_name: str, players, agent_ids, 
         initial_zombies=10, minimum_zombies=10, 
         observation_scope="world", observation_position_encoding="simple", 
+        observation_delta=False, delta_keyframe_interval=100,
+        observation_objective_distance=False,
      ):
         self.rules_name = rules_name
         self.map_name = map_name
@@ -101,6 +265,75 @@ class GameConfig(object):
         self.minimum_zombies = minimum_zombies
         self.observation_scope = observation_scope
         self.observation_position_encoding = observation_position_encoding
+        self.observation_delta = observation_delta
+        self.delta_keyframe_interval = delta_keyframe_interval
+        self.observation_objective_distance = observation_objective_distance
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+class ObservationDeltaEncoder(object):
+    """Encodes observations as the changes since the previous observation."""
+    def __init__(self, use_multiagent_env: bool, keyframe_interval: int):
+        self.use_multiagent_env = use_multiagent_env
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        self.previous = None
+        self.sequence = -1
+
+    @staticmethod
+    def _changed_cells(previous, current):
+        changed = np.argwhere(previous != current)
+        values = current[tuple(changed.T)]
+        return np.column_stack((changed, values)).tolist()
+
+    @staticmethod
+    def _changed_rows(previous, current):
+        if previous is None or previous.shape != current.shape:
+            rows = np.ones(current.shape[:2], dtype=bool)
+        else:
+            rows = (previous != current).any(axis=2)
+        return [[channel, y, current[channel, y]] for channel, y in np.argwhere(rows).tolist()]
+
+    def _is_keyframe(self, observation):
+        if self.previous is None or self.keyframe_interval <= 1:
+            return True
+        if self.sequence % self.keyframe_interval == 0:
+            return True
+        return (not self.use_multiagent_env) and (self.previous.shape != observation.shape)
+
+    def encode(self, last_observation: Dict, force_keyframe: bool = False) -> Dict:
+        self.sequence += 1
+        observation = last_observation["observation"]
+        parameters = dict(last_observation)
+        parameters["sequence"] = self.sequence
+        if force_keyframe or self._is_keyframe(observation):
+            parameters["keyframe"] = True
+        else:
+            del parameters["observation"]
+            parameters["keyframe"] = False
+            if self.use_multiagent_env:
+                parameters["observation_delta"] = {
+                    agent_id: self._changed_rows(self.previous.get(agent_id), agent_observation)
+                    for agent_id, agent_observation in observation.items()
+                }
+            else:
+                parameters["observation_delta"] = self._changed_cells(self.previous, observation)
+        self.previous = observation
+        return parameters
+
+class ProtocolConfig(object):
+    def __init__(self, mode: str = "json", compression: str = "none", compression_level: int = 1):
+        if mode not in ["json", "binary"]:
+            raise ValueError(f"{mode} is not a valid protocol mode, must be either \"json\" or \"binary\"")
+        if compression not in interactive_binary.COMPRESSION_CODES:
+            raise ValueError(f"{compression} is not a valid compression, must be either \"none\" or \"zlib\"")
+        self.mode = mode
+        self.compression = compression
+        self.compression_level = compression_level
 
     @classmethod
     def from_dict(cls, d):
@@ -123,28 +356,53 @@ class GameManagementInterface(ABC):
     def step_with_agent_action(self, action: Dict):
         pass
 
+    @abstractmethod
+    def step_with_agent_actions(self, actions, return_all: bool):
+        pass
+
     @abstractmethod
     def exit(self):
         pass
 
+    @abstractmethod
+    def set_protocol(self, protocol_config: ProtocolConfig):
+        pass
+
+    @abstractmethod
+    def resync(self):
+        pass
+
 class GameRequest(ABC):
     @staticmethod
     def decode_hook(jsonobj):
         if "tag" in jsonobj:
-            if (jsonobj["tag"] in ["GameConfigUpdate", "GameAction"]) and ("parameters" not in jsonobj):
+            if (jsonobj["tag"] in ["GameConfigUpdate", "GameAction", "GameActionBatch", "SetProtocol"]) and ("parameters" not in jsonobj):
                 raise ValueError(f"A GameRequest with tag {jsonobj['tag']} must have key \"parameters\"")
             if jsonobj["tag"] == "GameConfigUpdate":
-                return GameConfigUpdateRequest.from_dict(jsonobj["parameters"])
+                request = GameConfigUpdateRequest.from_dict(jsonobj["parameters"])
             elif jsonobj["tag"] == "GameStatus":
-                return GameStatusRequest()
+                request = GameStatusRequest()
             elif jsonobj["tag"] == "Exit":
-                return ExitRequest()
+                request = ExitRequest()
             elif jsonobj["tag"] == "StartGame":
-                return StartGameRequest()
+                request = StartGameRequest()
             elif jsonobj["tag"] == "GameAction":
-                return GameActionRequest(jsonobj["parameters"])
+                request = GameActionRequest(jsonobj["parameters"])
+            elif jsonobj["tag"] == "GameActionBatch":
+                request = GameActionBatchRequest.from_dict(jsonobj["parameters"])
+            elif jsonobj["tag"] == "SetProtocol":
+                request = SetProtocolRequest.from_dict(jsonobj["parameters"])
+            elif jsonobj["tag"] == "Resync":
+                request = ResyncRequest()
             else:
-                raise ValueError("GameRequest \"tag\" must be \"GameConfigUpdate\", \"GameAction\", \"GameStatus\", \"StartGame\", or \"Exit\"")
+                raise ValueError("GameRequest \"tag\" must be \"GameConfigUpdate\", \"GameAction\", \"GameActionBatch\", \"GameStatus\", \"StartGame\", \"SetProtocol\", \"Resync\", or \"Exit\"")
+            # The game addressed by the request, when a server hosts many games
+            request.game_id = jsonobj.get("game_id", None)
+            # The correlation id echoed in the responses, when requests are pipelined
+            request.request_id = jsonobj.get("request_id", None)
+            # Whether the responses carry the time spent handling the request
+            request.timing = bool(jsonobj.get("timing", False))
+            return request
         else: # Simply pass the object through (used where objects are passed as parameters)
             return jsonobj
 
@@ -192,15 +450,182 @@ class GameActionRequest(object):
     def update_game_manager(self, game_manager: GameManagementInterface):
         game_manager.step_with_agent_action(self.action)
 
+class GameActionBatchRequest(object):
+    def __init__(self, actions, return_all: bool = False):
+        self.actions = actions
+        self.return_all = return_all
+
+    @classmethod
+    def from_dict(cls, d: Dict):
+        if "actions" in d:
+            actions = d["actions"]
+        elif "action" in d:
+            actions = [d["action"]] * int(d.get("repeat", 1))
+        else:
+            raise ValueError("A GameActionBatch request must have either \"actions\" or \"action\" parameters")
+        return_mode = d.get("return", "last")
+        if return_mode not in ["last", "all"]:
+            raise ValueError(f"{return_mode} is not a valid return mode, must be either \"last\" or \"all\"")
+        return cls(actions, return_all=(return_mode == "all"))
+
+    def update_game_manager(self, game_manager: GameManagementInterface):
+        game_manager.step_with_agent_actions(self.actions, self.return_all)
+
+class ResyncRequest(object):
+    def __init__(self):
+        pass
+
+    def update_game_manager(self, game_manager: GameManagementInterface):
+        game_manager.resync()
+
+class SetProtocolRequest(object):
+    def __init__(self, protocol_config: ProtocolConfig):
+        self.protocol_config = protocol_config
+
+    @classmethod
+    def from_dict(cls, protocol_config_obj: Dict):
+        return cls(ProtocolConfig.from_dict(protocol_config_obj))
+
+    def update_game_manager(self, game_manager: GameManagementInterface):
+        game_manager.set_protocol(self.protocol_config)
+
+class GameTransport(ABC):
+    """Reads requests from and writes responses to the client."""
+    @abstractmethod
+    def read_request(self):
+        """Read the next request, raising EOFError when the client is gone."""
+        pass
+
+    @abstractmethod
+    def write_response(self, response: GameResponse):
+        pass
+
+class JsonStdioTransport(GameTransport):
+    """One JSON object per line, in both directions."""
+    def __init__(self, stdin=None, stdout=None):
+        # The binary buffers are used so no data is read ahead by a text
+        # wrapper when switching to the binary mode.
+        self.stdin = stdin if stdin is not None else sys.stdin.buffer
+        self.stdout = stdout if stdout is not None else sys.stdout.buffer
+        self.response_encoder = GameStateEncoder(indent=None)
+
+    def read_request(self):
+        message = self.stdin.readline()
+        if not message:
+            raise EOFError("end of input")
+        return json.loads(message, object_hook=GameRequest.decode_hook)
+
+    def write_response(self, response: GameResponse):
+        self.stdout.write(self.response_encoder.encode(response.to_dict()).encode("utf-8") + b"\n")
+        self.stdout.flush()
+
+class BinaryStdioTransport(GameTransport):
+    """Length-prefixed frames, see zombsole.interactive_binary."""
+    def __init__(self, use_multiagent_env: bool, compression: str = "none", compression_level: int = 1,
+                 stdin=None, stdout=None):
+        self.use_multiagent_env = use_multiagent_env
+        self.compression = interactive_binary.COMPRESSION_CODES[compression]
+        self.compression_level = compression_level
+        self.stdin = stdin if stdin is not None else sys.stdin.buffer
+        self.stdout = stdout if stdout is not None else sys.stdout.buffer
+        self.response_encoder = GameStateEncoder(indent=None)
+
+    def read_request(self):
+        body = interactive_binary.read_frame(self.stdin)
+        if not body:
+            raise ValueError("empty frame")
+        game_id = None
+        if body[0] == interactive_binary.FRAME_SESSION:
+            game_id, body = interactive_binary.decode_session_frame(body)
+        request = self._decode_request(body)
+        if game_id is not None:
+            request.game_id = game_id
+        return request
+
+    def _decode_request(self, body: bytes):
+        frame_type = body[0]
+        if frame_type == interactive_binary.FRAME_JSON:
+            return json.loads(body[1:], object_hook=GameRequest.decode_hook)
+        elif frame_type == interactive_binary.FRAME_ACTION:
+            actions = interactive_binary.decode_action_frame(body)
+            if self.use_multiagent_env:
+                return GameActionRequest(dict(actions))
+            elif len(actions) == 1:
+                return GameActionRequest(actions[0][1])
+            else:
+                raise ValueError("an action frame must have a single entry when playing single agent zombsole")
+        else:
+            raise ValueError(f"{frame_type} is not a valid request frame type")
+
+    def _observation_entries(self, last_observation: Dict):
+        observation = last_observation["observation"]
+        if self.use_multiagent_env:
+            reward = last_observation["reward"]
+            done = last_observation["done"]
+            truncated = last_observation["truncated"]
+            agent_ids = list(observation) + [agent_id for agent_id in reward if agent_id not in observation]
+            return [
+                (agent_id, observation.get(agent_id), reward.get(agent_id, 0.0),
+                 done.get(agent_id, False), truncated.get(agent_id, False))
+                for agent_id in agent_ids
+            ]
+        else:
+            return [(None, observation, last_observation["reward"],
+                     last_observation["done"], last_observation["truncated"])]
+
+    def _observation_frame(self, response: GameObservationResponse) -> bytes:
+        return interactive_binary.encode_observation_frame(
+            self._observation_entries(response.last_observation),
+            compression=self.compression,
+            compression_level=self.compression_level
+        )
+
+    def write_response(self, response: GameResponse):
+        game_id = None
+        if isinstance(response, SessionResponse):
+            game_id, response = response.game_id, response.response
+        if isinstance(response, TimedResponse):
+            # the timing is only sent in the JSON mode
+            response = response.response
+        if isinstance(response, GameObservationResponse):
+            frames = [self._observation_frame(response)]
+        elif isinstance(response, GameObservationBatchResponse):
+            # A batch is sent as a JSON frame with the number of transitions,
+            # followed by an observation frame for each transition
+            header = {"tag": response.get_tag(), "parameters": {"count": len(response.observations)}}
+            frames = [interactive_binary.encode_json_frame(header, self.response_encoder)]
+            frames.extend(self._observation_frame(observation) for observation in response.observations)
+        else:
+            frames = [interactive_binary.encode_json_frame(response.to_dict(), self.response_encoder)]
+        if game_id is not None:
+            frames = [interactive_binary.encode_session_frame(game_id, data) for data in frames]
+        self.stdout.write(b"".join(frames))
+        self.stdout.flush()
+
+def build_transport(protocol_config: ProtocolConfig, use_multiagent_env: bool, stdin=None, stdout=None) -> GameTransport:
+    if protocol_config.mode == "binary":
+        return BinaryStdioTransport(
+            use_multiagent_env,
+            compression=protocol_config.compression,
+            compression_level=protocol_config.compression_level,
+            stdin=stdin,
+            stdout=stdout
+        )
+    else:
+        return JsonStdioTransport(stdin=stdin, stdout=stdout)
+
 class GymEnvManager(GameManagementInterface):
-    def __init__(self, render_mode: str, use_multiagent_env: bool):
+    def __init__(self, render_mode: str, use_multiagent_env: bool, transport: GameTransport = None):
         self.game_config = None
         self.gym_env = None
         self.keep_going = True
         self.last_observation = None
-        self.response_encoder = GameStateEncoder(indent=None)
         self.render_mode = render_mode
         self.use_multiagent_env = use_multiagent_env
+        self.transport = transport if transport is not None else JsonStdioTransport()
+        self.delta_encoder = None
+        # When the request being handled was sent with "timing"
+        self.request_start = None
 
     def _initialize_gym(self):
         if self.game_config is not None:
@@ -216,8 +641,10 @@ class GymEnvManager(GameManagementInterface):
                     initial_zombies=self.game_config.initial_zombies, 
                     minimum_zombies=self.game_config.minimum_zombies,
                     observation_surroundings_width=swidth,
+                    observation_objective_distance=self.game_config.observation_objective_distance,
                     render_mode=self.render_mode,
-                    debug=False
+                    debug=False,
+                    event_history=SESSION_EVENT_HISTORY
                 )
             else: # single agent
                 self.gym_env = ZombsoleGymEnv(
@@ -229,10 +656,18 @@ class GymEnvManager(GameManagementInterface):
                     minimum_zombies=self.game_config.minimum_zombies,
                     observation_scope=self.game_config.observation_scope,
                     observation_position_encoding=self.game_config.observation_position_encoding,
+                    observation_objective_distance=self.game_config.observation_objective_distance,
                     render_mode=self.render_mode,
-                    debug=False
+                    debug=False,
+                    event_history=SESSION_EVENT_HISTORY
                 )
             self.last_observation = None
+            if self.game_config.observation_delta:
+                self.delta_encoder = ObservationDeltaEncoder(
+                    self.use_multiagent_env, self.game_config.delta_keyframe_interval
+                )
+            else:
+                self.delta_encoder = None
     
     def _env_status(self):
         if not self.keep_going:
@@ -249,19 +684,33 @@ class GymEnvManager(GameManagementInterface):
         return GameStateResponse(status, self.keep_going, config_required, self.last_observation)
 
     def _resposne_to_stdout(self, response):
-        print(self.response_encoder.encode(response.to_dict()))
+        if self.request_start is not None:
+            response = TimedResponse(perf_counter() - self.request_start, response)
+        self.transport.write_response(response)
 
-    def run(self):
-        self._resposne_to_stdout(self._get_game_state())
+    def run(self, send_initial_state=True):
+        if send_initial_state:
+            self._resposne_to_stdout(self._get_game_state())
         while self.keep_going:
-            message = input()
             try: 
-                obj = json.loads(message, object_hook=GameRequest.decode_hook)
+                obj = self.transport.read_request()
+            except EOFError:
+                break
             except Exception as ex:
                 err = ErrorResponse(str(ex))
                 self._resposne_to_stdout(err)
             else:
-                obj.update_game_manager(self)
+                self.handle_request(obj)
+
+    def handle_request(self, request):
+        if getattr(request, "timing", False):
+            self.request_start = perf_counter()
+        try:
+            request.update_game_manager(self)
+        except Exception as ex:
+            self._resposne_to_stdout(ErrorResponse(str(ex)))
+        finally:
+            self.request_start = None
     
     # Implementing the interface
     def set_game_config(self, game_config: GameConfig):
@@ -272,20 +721,10 @@ class GymEnvManager(GameManagementInterface):
         )
 
     def get_game_status(self):
-        self._resposne_to_stdout(
-            self._get_game_state()
-        )
-    
-    def _observation_json_ready(self, observation):
-        # Convert numpy arrays to python lists for JSON serialization
-        if self.use_multiagent_env:
-            ret = {}
-            # Go through the observation records, and convert numpy arrays to python lists
-            for agent_id in observation:
-                ret[agent_id] = observation[agent_id].tolist()
-            return ret
-        else: # single-agent
-            return observation.tolist()
+        response = self._get_game_state()
+        if self.gym_env is not None:
+            response.memory = memory_report(self.gym_env.game)
+        self._resposne_to_stdout(response)
     
     def _initial_values(self):
         if self.use_multiagent_env:
@@ -303,8 +742,7 @@ class GymEnvManager(GameManagementInterface):
             return reward, done, truncated, info
 
     def start_game(self):
-        origobs, _ = self.gym_env.reset()
-        observation = self._observation_json_ready(origobs)
+        observation, _ = self.gym_env.reset()
         reward, done, truncated, info = self._initial_values()
         self.last_observation = {
             "observation": observation,
@@ -313,29 +751,60 @@ class GymEnvManager(GameManagementInterface):
             "truncated": truncated,
             "info": info
         }
-        self._resposne_to_stdout(
-            GameObservationResponse(
-                self.last_observation
-            )
-        )
+        if self.delta_encoder is not None:
+            self.delta_encoder.reset()
+        self._resposne_to_stdout(self._observation_response())
+
+    def _observation_response(self, force_keyframe=False):
+        delta_parameters = None
+        if self.delta_encoder is not None:
+            delta_parameters = self.delta_encoder.encode(self.last_observation, force_keyframe=force_keyframe)
+        return GameObservationResponse(self.last_observation, delta_parameters)
     
     def step_with_agent_action(self, action: Dict):
         observation, reward, done, truncated, info = self.gym_env.step(action)
         self.last_observation = {
-            "observation": self._observation_json_ready(observation),
+            "observation": observation,
             "reward": reward,
             "done": done,
             "truncated": truncated,
             "info": info
         }
 
-        self.gym_env.render()
+        if self.render_mode is not None:
+            self.gym_env.render()
 
-        self._resposne_to_stdout(
-            GameObservationResponse(
-                self.last_observation
-            )
-        )
+        self._resposne_to_stdout(self._observation_response())
+
+    def step_with_agent_actions(self, actions, return_all: bool):
+        if return_all:
+            transitions = self.gym_env.step_sequence(actions, return_all=True)
+        else:
+            transitions = [self.gym_env.step_sequence(actions)]
+
+        observations = []
+        for observation, reward, done, truncated, info in transitions:
+            self.last_observation = {
+                "observation": observation,
+                "reward": reward,
+                "done": done,
+                "truncated": truncated,
+                "info": info
+            }
+            observations.append(self._observation_response())
+
+        if self.render_mode is not None:
+            self.gym_env.render()
+
+        if return_all:
+            self._resposne_to_stdout(GameObservationBatchResponse(observations))
+        else:
+            self._resposne_to_stdout(observations[0])
+
+    def resync(self):
+        if self.last_observation is None:
+            raise ValueError("There is no game in progress to resync")
+        self._resposne_to_stdout(self._observation_response(force_keyframe=True))
 
     def exit(self):
         self.keep_going = False
@@ -343,6 +812,16 @@ class GymEnvManager(GameManagementInterface):
             self._get_game_state()
         )
 
+    def set_protocol(self, protocol_config: ProtocolConfig):
+        # The acknowledgement is sent using the current protocol
+        self._resposne_to_stdout(
+            ProtocolResponse(protocol_config.mode, protocol_config.compression)
+        )
+        self.transport = build_transport(
+            protocol_config, self.use_multiagent_env,
+            stdin=self.transport.stdin, stdout=self.transport.stdout
+        )
+
 def play_interactive_json():
     """Initiate a game, using the command line arguments as configuration."""
     arguments = docopt(__doc__)
@@ -354,9 +833,24 @@ def play_interactive_json():
     if renderer_id == "opencv":
         render_mode = "human"
     multiagent_flag = arguments["--multi-agent"]
-
-    game_manager = GymEnvManager(render_mode, multiagent_flag)
-    game_manager.run()
+    if arguments["--trace-memory"]:
+        tracemalloc.start()
+
+    if arguments["--multi-game"]:
+        from zombsole.interactive_sessions import GameSessionServer, WORKER_MODES
+        if arguments["--workers"] not in WORKER_MODES:
+            print("The workers must be one of \"none\", \"thread\" or \"process\".  Exiting...", file=sys.stderr)
+            sys.exit(1)
+        game_manager = GameSessionServer(render_mode, multiagent_flag, workers=arguments["--workers"])
+    else:
+        game_manager = GymEnvManager(render_mode, multiagent_flag)
+    if arguments["--profile"]:
+        from zombsole.profiling import profile_call
+        profile_call(game_manager.run, arguments["--profile"],
+                     profiler=arguments["--profiler"],
+                     module_filter=arguments["--profile-filter"])
+    else:
+        game_manager.run()
 
 if __name__ == '__main__':
     play_interactive_json()
@@ -0,0 +1,215 @@
+"""Serve the interactive JSON game protocol over sockets
+
+Usage:
+    ./zombsole-server --help
+    ./zombsole-server [--unix PATH | --host HOST --port PORT] [--multi-agent] [--threads THREADS]
+
+Options:
+    -h --help            Show this help.
+    --unix PATH          Listen on a Unix domain socket at PATH.
+    --host HOST          The host to listen on [default: 127.0.0.1]
+    --port PORT          The TCP port to listen on [default: 7312]
+    -m, --multi-agent    Play Multi-Agent Zombsole
+    --threads THREADS    The number of threads used to run game steps
+                         [default: 4]
+
+Each connection speaks the protocol of zombsole-stdio-json, with one JSON
+request per line and one JSON response per line. A connection hosts a game,
+and can host more games by adding a "game_id" key to its requests (see
+zombsole.interactive_sessions): a GameConfigUpdate request creates the game of
+an unknown game id, and other requests for it get an Error response. Requests can be pipelined: a client can send
+requests without waiting for the responses, adding a "request_id" key to the
+requests, which is echoed in their responses. The requests of each game are
+handled in order, while different games (of the same or of other connections)
+are stepped concurrently in a thread pool, so a slow client never stalls the
+others. Closing a connection (or sending an Exit request without game id)
+closes its games.
+"""
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from docopt import docopt
+from zombsole.interactive_json import (
+    GameTransport, GameStateEncoder, GameRequest, GymEnvManager, GameConfigUpdateRequest, ExitRequest,
+    SetProtocolRequest, ErrorResponse, GameStateResponse, CorrelatedResponse, SessionResponse
+)
+
+
+class CollectingTransport(GameTransport):
+    """Collects the responses written while a request is handled."""
+    def __init__(self):
+        self.responses = []
+
+    def read_request(self):
+        raise EOFError("the requests are submitted by the connection")
+
+    def write_response(self, response):
+        self.responses.append(response)
+
+    def take_responses(self):
+        responses = self.responses
+        self.responses = []
+        return responses
+
+
+class ConnectionGame(object):
+    """A game hosted by a connection, handling its requests in order."""
+    def __init__(self, connection: "ClientConnection", game_id):
+        self.connection = connection
+        self.game_id = game_id
+        self.transport = CollectingTransport()
+        self.manager = GymEnvManager(None, connection.server.use_multiagent_env, transport=self.transport)
+        self.requests = asyncio.Queue()
+        self.task = asyncio.ensure_future(self.process_requests())
+
+    def _handle_request(self, request):
+        # Runs in the executor
+        self.manager.handle_request(request)
+        return self.transport.take_responses()
+
+    async def process_requests(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self.requests.get()
+            if request is None:
+                break
+            responses = await loop.run_in_executor(self.connection.server.executor, self._handle_request, request)
+            for response in responses:
+                await self.connection.send(response, game_id=self.game_id, request_id=request.request_id)
+            if not self.manager.keep_going:
+                break
+
+    def initial_responses(self):
+        return [self.manager._get_game_state()]
+
+
+class ClientConnection(object):
+    def __init__(self, server: "GameSocketServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.games = {}
+        self.write_lock = asyncio.Lock()
+        self.response_encoder = GameStateEncoder(indent=None)
+
+    async def send(self, response, game_id=None, request_id=None):
+        if request_id is not None:
+            response = CorrelatedResponse(request_id, response)
+        if game_id is not None:
+            response = SessionResponse(game_id, response)
+        data = self.response_encoder.encode(response.to_dict()).encode("utf-8") + b"\n"
+        async with self.write_lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+    def _create_game(self, game_id):
+        game = ConnectionGame(self, game_id)
+        self.games[game_id] = game
+        return game
+
+    async def _close_games(self):
+        games = list(self.games.values())
+        self.games = {}
+        for game in games:
+            game.requests.put_nowait(None)
+        for game in games:
+            await game.task
+
+    async def handle(self):
+        # As with zombsole-stdio-json, the state of the (default) game is sent first
+        game = self._create_game(None)
+        for response in game.initial_responses():
+            await self.send(response)
+
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line, object_hook=GameRequest.decode_hook)
+                except Exception as ex:
+                    await self.send(ErrorResponse(str(ex)))
+                    continue
+
+                if isinstance(request, SetProtocolRequest):
+                    await self.send(ErrorResponse("Only the JSON protocol is supported by the socket server"),
+                                    game_id=request.game_id, request_id=request.request_id)
+                    continue
+
+                game = self.games.get(request.game_id)
+                if game is None:
+                    if isinstance(request, GameConfigUpdateRequest):
+                        game = self._create_game(request.game_id)
+                    else:
+                        if isinstance(request, ExitRequest):
+                            response = GameStateResponse("exiting", False, True)
+                        else:
+                            response = ErrorResponse(f"There is no game with id {request.game_id}")
+                        await self.send(response, game_id=request.game_id, request_id=request.request_id)
+                        continue
+                game.requests.put_nowait(request)
+                if isinstance(request, ExitRequest):
+                    del self.games[request.game_id]
+                    if request.game_id is None:
+                        await game.task
+                        break
+        except ConnectionError:
+            pass
+        finally:
+            await self._close_games()
+            self.writer.close()
+
+
+class GameSocketServer(object):
+    def __init__(self, use_multiagent_env: bool, threads: int = 4):
+        self.use_multiagent_env = use_multiagent_env
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.connections = set()
+
+    async def _handle_connection(self, reader, writer):
+        connection = ClientConnection(self, reader, writer)
+        self.connections.add(connection)
+        try:
+            await connection.handle()
+        finally:
+            self.connections.discard(connection)
+
+    async def start_unix(self, path: str):
+        return await asyncio.start_unix_server(self._handle_connection, path=path)
+
+    async def start_tcp(self, host: str, port: int):
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+async def _serve(server: GameSocketServer, unix_path, host, port):
+    if unix_path:
+        socket_server = await server.start_unix(unix_path)
+    else:
+        socket_server = await server.start_tcp(host, port)
+    async with socket_server:
+        await socket_server.serve_forever()
+
+
+def serve_interactive_json():
+    """Start the socket server, using the command line arguments as configuration."""
+    arguments = docopt(__doc__)
+    threads = int(arguments["--threads"])
+    if threads < 1:
+        print("The number of threads must be at least 1.  Exiting...", file=sys.stderr)
+        sys.exit(1)
+
+    server = GameSocketServer(arguments["--multi-agent"], threads=threads)
+    try:
+        asyncio.run(_serve(server, arguments["--unix"], arguments["--host"], int(arguments["--port"])))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == '__main__':
+    serve_interactive_json()
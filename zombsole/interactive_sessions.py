@@ -0,0 +1,248 @@
+"""Hosting many interactive games in a single server process
+
+Every request sent to a multi-game server carries a "game_id" key next to its
+"tag" (or is wrapped in a session frame in the binary mode), and every
+response of a game carries the id of the game:
+
+    {"tag": "GameConfigUpdate", "game_id": "g1", "parameters": {...}}
+    {"tag": "StartGame", "game_id": "g1"}
+
+A GameConfigUpdate request for an unknown game id creates the game, and an
+Exit request with a game id closes that game. Requests without a game id are
+handled by the server: GameStatus lists the hosted games, SetProtocol changes
+the protocol of the connection, and Exit closes all the games and stops the
+server.
+
+Each game can be run inline (in the thread reading the requests), in a worker
+thread, or in a worker process. With workers, the responses of different games
+can arrive in any order, but the responses of each game keep the order of its
+requests.
+"""
+import multiprocessing
+import queue
+import threading
+from abc import ABC, abstractmethod
+from zombsole.interactive_json import (
+    GameTransport, JsonStdioTransport, GymEnvManager, GameConfigUpdateRequest, GameStatusRequest,
+    ExitRequest, SetProtocolRequest, ErrorResponse, ProtocolResponse, SessionResponse,
+    SessionsResponse, GameStateResponse, build_transport
+)
+
+
+WORKER_MODES = ["none", "thread", "process"]
+
+
+class SessionTransport(GameTransport):
+    """Writes the responses of a game to the shared transport of the server."""
+    def __init__(self, game_id: str, server: "GameSessionServer"):
+        self.game_id = game_id
+        self.server = server
+
+    def read_request(self):
+        raise EOFError("the requests of a session are submitted by the server")
+
+    def write_response(self, response):
+        self.server.write_response(SessionResponse(self.game_id, response))
+
+
+class QueueTransport(SessionTransport):
+    """Reads the requests of a game from a queue, for worker threads."""
+    def __init__(self, game_id: str, server: "GameSessionServer"):
+        super().__init__(game_id, server)
+        self.requests = queue.Queue()
+
+    def read_request(self):
+        request = self.requests.get()
+        if request is None:
+            raise EOFError("session closed")
+        return request
+
+
+class ConnectionTransport(GameTransport):
+    """Exchanges requests and responses over a multiprocessing connection."""
+    def __init__(self, connection):
+        self.connection = connection
+
+    def read_request(self):
+        return self.connection.recv()
+
+    def write_response(self, response):
+        self.connection.send(response)
+
+
+class GameSession(ABC):
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+
+    @abstractmethod
+    def submit(self, request):
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Wait for the session to handle its pending requests (ending with an Exit request)."""
+        pass
+
+
+class InlineGameSession(GameSession):
+    def __init__(self, game_id: str, server: "GameSessionServer"):
+        super().__init__(game_id)
+        self.manager = GymEnvManager(
+            server.render_mode, server.use_multiagent_env,
+            transport=SessionTransport(game_id, server)
+        )
+
+    def submit(self, request):
+        self.manager.handle_request(request)
+
+    def close(self):
+        pass
+
+
+class ThreadGameSession(GameSession):
+    def __init__(self, game_id: str, server: "GameSessionServer"):
+        super().__init__(game_id)
+        self.transport = QueueTransport(game_id, server)
+        self.manager = GymEnvManager(server.render_mode, server.use_multiagent_env, transport=self.transport)
+        self.thread = threading.Thread(
+            target=self.manager.run, kwargs={"send_initial_state": False}, daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, request):
+        self.transport.requests.put(request)
+
+    def close(self):
+        self.thread.join()
+
+
+def _process_session_worker(connection, render_mode, use_multiagent_env):
+    manager = GymEnvManager(render_mode, use_multiagent_env, transport=ConnectionTransport(connection))
+    manager.run(send_initial_state=False)
+    connection.close()
+
+
+class ProcessGameSession(GameSession):
+    def __init__(self, game_id: str, server: "GameSessionServer"):
+        super().__init__(game_id)
+        self.server = server
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_process_session_worker,
+            args=(worker_connection, server.render_mode, server.use_multiagent_env),
+            daemon=True
+        )
+        self.process.start()
+        worker_connection.close()
+        # Forwards the responses of the worker to the client
+        self.thread = threading.Thread(target=self._forward_responses, daemon=True)
+        self.thread.start()
+
+    def _forward_responses(self):
+        while True:
+            try:
+                response = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            self.server.write_response(SessionResponse(self.game_id, response))
+
+    def submit(self, request):
+        self.connection.send(request)
+
+    def close(self):
+        self.thread.join()
+        self.process.join()
+        self.connection.close()
+
+
+def build_session(workers: str, game_id: str, server: "GameSessionServer") -> GameSession:
+    if workers == "none":
+        return InlineGameSession(game_id, server)
+    elif workers == "thread":
+        return ThreadGameSession(game_id, server)
+    elif workers == "process":
+        return ProcessGameSession(game_id, server)
+    else:
+        raise ValueError(f"{workers} is not a valid worker mode, must be either \"none\", \"thread\", or \"process\".")
+
+
+class GameSessionServer(object):
+    """Hosts many games, addressed by game id, over a single transport."""
+    def __init__(self, render_mode: str, use_multiagent_env: bool, transport: GameTransport = None,
+                 workers: str = "none"):
+        if workers not in WORKER_MODES:
+            raise ValueError(f"{workers} is not a valid worker mode, must be either \"none\", \"thread\", or \"process\".")
+        self.render_mode = render_mode
+        self.use_multiagent_env = use_multiagent_env
+        self.transport = transport if transport is not None else JsonStdioTransport()
+        self.workers = workers
+        self.sessions = {}
+        self.keep_going = True
+        self.write_lock = threading.Lock()
+
+    def write_response(self, response):
+        with self.write_lock:
+            self.transport.write_response(response)
+
+    def _sessions_state(self):
+        return SessionsResponse(list(self.sessions), self.keep_going)
+
+    def run(self):
+        self.write_response(self._sessions_state())
+        while self.keep_going:
+            try:
+                request = self.transport.read_request()
+            except EOFError:
+                break
+            except Exception as ex:
+                self.write_response(ErrorResponse(str(ex)))
+            else:
+                self.handle_request(request)
+        self.close_sessions()
+
+    def handle_request(self, request):
+        game_id = getattr(request, "game_id", None)
+        if isinstance(request, SetProtocolRequest):
+            self.set_protocol(request.protocol_config)
+        elif game_id is None:
+            if isinstance(request, ExitRequest):
+                self.keep_going = False
+                self.close_sessions()
+                self.write_response(self._sessions_state())
+            elif isinstance(request, GameStatusRequest):
+                self.write_response(self._sessions_state())
+            else:
+                self.write_response(ErrorResponse("A game_id is required for this request"))
+        else:
+            session = self.sessions.get(game_id)
+            if session is None:
+                if isinstance(request, GameConfigUpdateRequest):
+                    session = build_session(self.workers, game_id, self)
+                    self.sessions[game_id] = session
+                elif isinstance(request, ExitRequest):
+                    self.write_response(SessionResponse(game_id, GameStateResponse("exiting", False, True)))
+                    return
+                else:
+                    self.write_response(SessionResponse(game_id, ErrorResponse(f"There is no game with id {game_id}")))
+                    return
+            session.submit(request)
+            if isinstance(request, ExitRequest):
+                del self.sessions[game_id]
+                session.close()
+
+    def set_protocol(self, protocol_config):
+        with self.write_lock:
+            # The acknowledgement is sent using the current protocol
+            self.transport.write_response(ProtocolResponse(protocol_config.mode, protocol_config.compression))
+            self.transport = build_transport(
+                protocol_config, self.use_multiagent_env,
+                stdin=self.transport.stdin, stdout=self.transport.stdout
+            )
+
+    def close_sessions(self):
+        sessions = list(self.sessions.values())
+        self.sessions = {}
+        for session in sessions:
+            session.submit(ExitRequest())
+        for session in sessions:
+            session.close()
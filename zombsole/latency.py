@@ -0,0 +1,93 @@
+# coding: utf-8
+"""Time budgets and latency statistics of the next_step calls of the bots.
+
+The next_step calls of the things of classes with TIMED set (the players)
+are timed by the world, and their statistics kept per thing. A bot whose
+call takes longer than its budget is treated as idle for the tick, with an
+event. The budgets are checked when the calls return, except with the threads
+executor, which abandons the calls still running at their deadline (see
+zombsole.executors).
+"""
+from collections import deque
+
+
+# Calls kept per bot for the percentiles
+LATENCY_WINDOW = 1000
+
+
+class BudgetExceeded(Exception):
+    """A next_step call abandoned at the deadline of its budget."""
+    pass
+
+
+class LatencyStats(object):
+    """Latency statistics of the next_step calls of a bot, in seconds."""
+    def __init__(self, window=LATENCY_WINDOW):
+        self.calls = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.overruns = 0
+        self.recent = deque(maxlen=window)
+
+    def add(self, elapsed, overrun=False):
+        self.calls += 1
+        self.total += elapsed
+        self.maximum = max(self.maximum, elapsed)
+        self.recent.append(elapsed)
+        if overrun:
+            self.overruns += 1
+
+    @property
+    def mean(self):
+        return self.total / self.calls if self.calls else 0.0
+
+    def percentile(self, percent):
+        """A percentile of the recent calls (nearest rank)."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    @property
+    def p99(self):
+        return self.percentile(99)
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "mean": self.mean,
+            "p99": self.p99,
+            "max": self.maximum,
+            "overruns": self.overruns,
+        }
+
+    def format(self):
+        """A short summary for the stats panels of the renderers."""
+        summary = u'%.1fms p99 %.1fms' % (self.mean * 1000, self.p99 * 1000)
+        if self.overruns:
+            summary += u' overruns %i' % self.overruns
+        return summary
+
+
+class TimeBudgets(object):
+    """Time budgets of the next_step calls, in seconds.
+
+       The budget of a bot is the one of its name (for the players) if set,
+       else the one of its class (or of a base class, by class name), else
+       the default one. None means no budget.
+    """
+    def __init__(self, default=None, classes=None, players=None):
+        self.default = default
+        self.classes = dict(classes or {})
+        self.players = dict(players or {})
+
+    def budget(self, thing):
+        budget = self.players.get(thing.name)
+        if budget is not None:
+            return budget
+        for thing_class in type(thing).__mro__:
+            budget = self.classes.get(thing_class.__name__)
+            if budget is not None:
+                return budget
+        return self.default
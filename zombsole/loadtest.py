@@ -0,0 +1,471 @@
+# coding: utf-8
+"""Load tests of the JSON interface of zombsole-stdio-json.
+
+Usage:
+    loadtest.py [--sessions SESSIONS] [--multi-game [--workers WORKERS] | --connect ADDRESS] [--multi-agent] [--agents AGENTS] [--rate RATE] [--actions ACTIONS] [--stream FILE] [--rules RULES] [--map MAP] [--players PLAYERS] [--initial-zombies ZOMBIES] [--minimum-zombies ZOMBIES]
+
+Options:
+    -s, --sessions SESSIONS    The games played at the same time [default: 4]
+    -g, --multi-game           Play all the games in a single multi-game server
+                               (see zombsole.interactive_sessions), instead of
+                               a zombsole-stdio-json process for each game
+    --workers WORKERS          Where the games of the multi-game server run,
+                               either none, thread or process [default: thread]
+    --connect ADDRESS          Play all the games over a connection to a
+                               zombsole-server listening on HOST:PORT
+    -m, --multi-agent          Play Multi-Agent Zombsole
+    --agents AGENTS            The agents of each game [default: 1]
+    --rate RATE                The target rate of all the requests sent, per
+                               second, or 0 to send them as fast as the games
+                               answer [default: 0]
+    --actions ACTIONS          The GameAction requests of each synthetic
+                               stream [default: 200]
+    --stream FILE              Replay the requests of a JSON lines file (like
+                               the stdin of a recorded session) in each game,
+                               instead of a synthetic stream
+    --rules RULES              The rules of the synthetic games
+                               [default: extermination]
+    --map MAP                  The map of the synthetic games [default: bridge]
+    --players PLAYERS          The bots of the synthetic games, like
+                               terminator:2,sniper [default: terminator]
+    --initial-zombies ZOMBIES  [default: 20]
+    --minimum-zombies ZOMBIES  [default: 10]
+
+Each session plays a stream of requests in a game, sending a request once the
+response to the previous one is read (and, with a target rate, not before its
+time). A synthetic stream configures the game (GameConfigUpdate), starts it
+(StartGame), plays some GameAction requests cycling through a few actions (a
+dict of actions by agent id in the multi-agent mode) and exits. Whatever the
+stream, when a response reports the end of the game (every agent done), the
+session starts it again (StartGame) before the next GameAction.
+
+The games are either played by a zombsole-stdio-json process each (the
+default), by a single multi-game server process (--multi-game), or by a
+zombsole-server over a connection (--connect), the requests and responses of
+each game being routed by their "game_id".
+
+The requests are sent with "timing" set, so their responses carry the time
+the server took handling them (see zombsole.interactive_json). The latency of
+each request is split in phases:
+
+- encode: encoding the request as a JSON line, in the client.
+- step: handling the request in the server (playing the game), as reported
+  in the response.
+- decode: decoding the response, in the client.
+- round_trip: from writing the request to reading its response, which
+  includes the step, decoding the request and encoding the response in the
+  server, and the transfer of both.
+
+The report has the throughput (responses per second) and the p50, p99 and
+p999 latency of each phase, by request tag. Run it from the root of the
+repository with `python -m zombsole.loadtest`.
+"""
+from __future__ import print_function
+
+import json
+import math
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+
+PHASES = ("encode", "step", "decode", "round_trip")
+PERCENTILES = (50, 99, 99.9)
+SYNTHETIC_ACTIONS = [
+    {"action_type": "attack_closest"},
+    {"action_type": "move", "parameter": [1, 0]},
+    {"action_type": "heal_closest"},
+    {"action_type": "move", "parameter": [0, 1]},
+    {"action_type": "attack_closest"},
+    {"action_type": "move", "parameter": [-1, 0]},
+]
+# Seconds waited for a response before a session gives up
+RESPONSE_TIMEOUT = 60
+
+
+def game_config(rules_name, map_name, players, agent_ids, initial_zombies, minimum_zombies):
+    """The parameters of the GameConfigUpdate request of a synthetic game."""
+    return {
+        "rules_name": rules_name,
+        "map_name": map_name,
+        "players": players,
+        "agent_ids": agent_ids,
+        "initial_zombies": initial_zombies,
+        "minimum_zombies": minimum_zombies,
+    }
+
+
+def synthetic_stream(config, actions=200, multi_agent=False):
+    """The requests of a synthetic session: GameConfigUpdate, StartGame,
+       some GameAction requests and Exit."""
+    requests = [{"tag": "GameConfigUpdate", "parameters": config}, {"tag": "StartGame"}]
+    for index in range(actions):
+        action = SYNTHETIC_ACTIONS[index % len(SYNTHETIC_ACTIONS)]
+        if multi_agent:
+            # each agent plays a different action of the cycle
+            action = {agent_id: SYNTHETIC_ACTIONS[(index + position) % len(SYNTHETIC_ACTIONS)]
+                      for position, agent_id in enumerate(config["agent_ids"])}
+        requests.append({"tag": "GameAction", "parameters": action})
+    requests.append({"tag": "Exit"})
+    return requests
+
+
+def load_stream(file_path):
+    """The requests of a JSON lines file (blank lines are skipped)."""
+    requests = []
+    with open(file_path) as stream_file:
+        for line in stream_file:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            if request.get("tag") == "SetProtocol":
+                raise ValueError("Only the JSON protocol can be load tested, the stream can't have SetProtocol requests")
+            request.pop("game_id", None)
+            requests.append(request)
+    return requests
+
+
+def percentile(sorted_values, percent):
+    """The nearest-rank percentile of some sorted values."""
+    if not sorted_values:
+        return None
+    # rounded, so 99.9% of 1000 values is the 999th and not the 1000th
+    rank = max(int(math.ceil(round(percent * len(sorted_values) / 100, 9))), 1)
+    return sorted_values[rank - 1]
+
+
+class LatencyStats(object):
+    """The latencies (in seconds) of the phases of the requests, by tag."""
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = 0
+        self.restarts = 0
+
+    def add(self, tag, encode, step, decode, round_trip):
+        """Add the latencies of a request (step is None if the server didn't
+           report it)."""
+        self.latencies[(tag, "encode")].append(encode)
+        if step is not None:
+            self.latencies[(tag, "step")].append(step)
+        self.latencies[(tag, "decode")].append(decode)
+        self.latencies[(tag, "round_trip")].append(round_trip)
+
+    def merge(self, other):
+        for key, values in other.latencies.items():
+            self.latencies[key].extend(values)
+        self.errors += other.errors
+        self.restarts += other.restarts
+
+    def tags(self):
+        return sorted(set(tag for tag, _ in self.latencies))
+
+    def count(self, tag=None):
+        return sum(len(values) for (values_tag, phase), values in self.latencies.items()
+                   if phase == "round_trip" and (tag is None or values_tag == tag))
+
+    def percentiles(self, tag, phase):
+        """The PERCENTILES of the latency of a phase of a tag, in seconds."""
+        values = sorted(self.latencies.get((tag, phase), []))
+        return [percentile(values, percent) for percent in PERCENTILES]
+
+
+class LoadTestReport(object):
+    def __init__(self, stats, duration, sessions):
+        self.stats = stats
+        self.duration = duration
+        self.sessions = sessions
+
+    @property
+    def throughput(self):
+        return self.stats.count() / self.duration if self.duration else 0.0
+
+    def format(self):
+        lines = [f"{self.stats.count()} responses from {self.sessions} sessions in {self.duration:.2f} s: "
+                 f"{self.throughput:.1f} responses/s, {self.stats.errors} errors, "
+                 f"{self.stats.restarts} games restarted",
+                 f"{'tag':<18}{'phase':<12}{'count':>8}{'rate/s':>9}"
+                 + "".join(f"{'p' + format(percent, 'g') + ' ms':>11}" for percent in PERCENTILES)]
+        for tag in self.stats.tags():
+            count = self.stats.count(tag)
+            for phase in PHASES:
+                values = self.stats.percentiles(tag, phase)
+                if values[0] is None:
+                    continue
+                lines.append(f"{tag:<18}{phase:<12}{count:>8}{count / self.duration:>9.1f}"
+                             + "".join(f"{value * 1000:>11.3f}" for value in values))
+        return "\n".join(lines)
+
+
+class Channel(ABC):
+    """Sends the request lines of a game, and receives its responses."""
+    def address(self, request):
+        """The request (a dict) to encode, with what routes it to the game."""
+        return request
+
+    @abstractmethod
+    def send(self, line):
+        pass
+
+    @abstractmethod
+    def receive(self):
+        """The next response (decoded), and the seconds spent decoding it."""
+        pass
+
+    def close(self):
+        pass
+
+
+class ProcessChannel(Channel):
+    """A zombsole-stdio-json process playing a single game."""
+    def __init__(self, multi_agent=False):
+        command = [sys.executable, "-m", "zombsole.interactive_json"]
+        if multi_agent:
+            command.append("--multi-agent")
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        # the state of the game sent before any request
+        self.receive()
+
+    def send(self, line):
+        self.process.stdin.write(line)
+        self.process.stdin.flush()
+
+    def receive(self):
+        line = self.process.stdout.readline()
+        if not line:
+            raise EOFError("zombsole-stdio-json exited")
+        start = time.perf_counter()
+        response = json.loads(line)
+        return response, time.perf_counter() - start
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait(timeout=RESPONSE_TIMEOUT)
+
+
+class SessionChannel(Channel):
+    """A game of a multi-game server, addressed by its game id."""
+    def __init__(self, server, game_id):
+        self.server = server
+        self.game_id = game_id
+        self.responses = queue.Queue()
+
+    def address(self, request):
+        return dict(request, game_id=self.game_id)
+
+    def send(self, line):
+        self.server.send(line)
+
+    def receive(self):
+        try:
+            received = self.responses.get(timeout=RESPONSE_TIMEOUT)
+        except queue.Empty:
+            raise EOFError(f"no response for the game {self.game_id}")
+        if received is None:
+            raise EOFError("the server closed the connection")
+        return received
+
+
+class MultiGameServer(object):
+    """A connection to a server hosting many games, routing the responses
+       to the channels of the games by their game id."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.write_lock = threading.Lock()
+        self.channels = {}
+        self.unrouted = []
+        # the state (or the sessions) sent before any request
+        self.reader.readline()
+        self.thread = threading.Thread(target=self._route_responses, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def spawn(cls, multi_agent=False, workers="thread"):
+        """A zombsole-stdio-json --multi-game process."""
+        command = [sys.executable, "-m", "zombsole.interactive_json", "--multi-game", "--workers", workers]
+        if multi_agent:
+            command.append("--multi-agent")
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        server = cls(process.stdout, process.stdin)
+        server.process = process
+        return server
+
+    @classmethod
+    def connect(cls, address):
+        """A connection to a zombsole-server, at HOST:PORT."""
+        host, _, port = address.rpartition(":")
+        connection = socket.create_connection((host or "localhost", int(port)))
+        server = cls(connection.makefile("rb"), connection.makefile("wb"))
+        server.connection = connection
+        return server
+
+    def channel(self, game_id):
+        channel = SessionChannel(self, game_id)
+        self.channels[game_id] = channel
+        return channel
+
+    def send(self, line):
+        with self.write_lock:
+            self.writer.write(line)
+            self.writer.flush()
+
+    def _route_responses(self):
+        for line in iter(self.reader.readline, b""):
+            start = time.perf_counter()
+            response = json.loads(line)
+            decode = time.perf_counter() - start
+            channel = self.channels.get(response.get("game_id")) if isinstance(response, dict) else None
+            if channel is None:
+                self.unrouted.append(response)
+            else:
+                channel.responses.put((response, decode))
+        for channel in self.channels.values():
+            channel.responses.put(None)
+
+    def close(self):
+        process = getattr(self, "process", None)
+        if process is not None:
+            # Exit without a game id stops the server
+            self.send((json.dumps({"tag": "Exit"}) + "\n").encode("utf-8"))
+            self.writer.close()
+            process.wait(timeout=RESPONSE_TIMEOUT)
+        else:
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.connection.close()
+        self.thread.join(timeout=RESPONSE_TIMEOUT)
+
+
+def game_over(response):
+    """Whether a GameObservation response reports the end of the game."""
+    if response.get("tag") != "GameObservation":
+        return False
+    done = response["parameters"].get("done")
+    if isinstance(done, dict):
+        return bool(done) and all(done.values())
+    return bool(done)
+
+
+class Session(object):
+    """Plays a stream of requests in a game, pacing them to a rate."""
+    def __init__(self, channel, requests, rate=0.0):
+        self.channel = channel
+        self.requests = requests
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.stats = LatencyStats()
+        self.error = None
+
+    def request(self, request):
+        start = time.perf_counter()
+        line = (json.dumps(self.channel.address(dict(request, timing=True))) + "\n").encode("utf-8")
+        encoded = time.perf_counter()
+        self.channel.send(line)
+        response, decode = self.channel.receive()
+        received = time.perf_counter()
+        self.stats.add(request["tag"], encoded - start, response.get("step_time"), decode,
+                       received - encoded - decode)
+        if response.get("tag") == "Error":
+            self.stats.errors += 1
+        return response
+
+    def run(self):
+        try:
+            next_time = time.perf_counter()
+            last_response = {}
+            for request in self.requests:
+                if request["tag"] == "GameAction" and game_over(last_response):
+                    self.stats.restarts += 1
+                    last_response = self.request({"tag": "StartGame"})
+                if self.interval:
+                    next_time += self.interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                last_response = self.request(request)
+        except Exception as ex:
+            self.error = ex
+
+
+def run_load_test(requests, sessions=4, rate=0.0, multi_agent=False, multi_game=False,
+                  workers="thread", connect=None):
+    """Play a stream of requests (a list of request dicts) in each of some
+       sessions at the same time, with a target rate of all the requests,
+       and return a LoadTestReport."""
+    if sessions < 1:
+        raise ValueError(f"sessions must be at least 1, not {sessions}")
+    if rate < 0:
+        raise ValueError(f"rate must be positive, or 0 for no target, not {rate}")
+
+    server = None
+    channels = []
+    try:
+        if connect:
+            server = MultiGameServer.connect(connect)
+        elif multi_game:
+            server = MultiGameServer.spawn(multi_agent, workers)
+        for index in range(sessions):
+            if server is not None:
+                channels.append(server.channel(f"load-{index}"))
+            else:
+                channels.append(ProcessChannel(multi_agent))
+
+        runs = [Session(channel, requests, rate / sessions) for channel in channels]
+        threads = [threading.Thread(target=run.run) for run in runs]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+    finally:
+        for channel in channels:
+            channel.close()
+        if server is not None:
+            server.close()
+
+    for run in runs:
+        if run.error is not None:
+            raise run.error
+    stats = LatencyStats()
+    for run in runs:
+        stats.merge(run.stats)
+    return LoadTestReport(stats, duration, sessions)
+
+
+def main():
+    from docopt import docopt
+    from zombsole.play import parse_player_names
+
+    arguments = docopt(__doc__)
+    multi_agent = arguments["--multi-agent"]
+    agents = int(arguments["--agents"])
+    if agents > 1 and not multi_agent:
+        print("Only the multi-agent mode (--multi-agent) can play more than 1 agent.  Exiting...", file=sys.stderr)
+        return 1
+
+    if arguments["--stream"]:
+        requests = load_stream(arguments["--stream"])
+    else:
+        config = game_config(arguments["--rules"], arguments["--map"],
+                             parse_player_names(arguments["--players"]) if arguments["--players"] else [],
+                             [str(index) for index in range(agents)],
+                             int(arguments["--initial-zombies"]), int(arguments["--minimum-zombies"]))
+        requests = synthetic_stream(config, int(arguments["--actions"]), multi_agent)
+
+    report = run_load_test(requests, sessions=int(arguments["--sessions"]),
+                           rate=float(arguments["--rate"]), multi_agent=multi_agent,
+                           multi_game=arguments["--multi-game"], workers=arguments["--workers"],
+                           connect=arguments["--connect"])
+    print(report.format())
+    return 1 if report.stats.errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
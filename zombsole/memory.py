@@ -0,0 +1,118 @@
+# coding: utf-8
+"""Memory instrumentation of long-running games.
+
+A memory report of a game has the counts of what a world accumulates: the
+things by class, the terrain cells, the decorations by class, the events kept
+(all of them, unless the game has an event_history), the dead things waiting
+in the pool and the latency statistics. When tracemalloc is tracing, it also
+has the memory traced (current and peak) and the top allocators, by source
+line.
+
+A MemoryMonitor set as the memory_monitor of a game keeps a report every
+interval ticks, and on each reset (which builds a new world), so the growth
+of a long game, or of a long session resetting the same game, can be followed.
+The reports are also sent in the GameState response to the GameStatus
+requests of the JSON interface (see zombsole.interactive_json).
+"""
+import tracemalloc
+from collections import Counter, deque
+
+
+# Reports kept by a monitor (the first one is kept too, as the baseline)
+MAX_REPORTS = 1000
+# Frames stored by tracemalloc for each allocation, when started by a monitor
+TRACE_FRAMES = 1
+
+
+def top_allocators(top=10):
+    """The source lines allocating the most memory still traced."""
+    if not tracemalloc.is_tracing() or top <= 0:
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    return [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size": stat.size,
+             "count": stat.count}
+            for stat in snapshot.statistics('lineno')[:top]]
+
+
+def memory_report(game, top=10):
+    """A report of what the world of a game accumulates (see the module
+       docs), as a dict which can be sent as JSON."""
+    world = game.world
+    report = {
+        "tick": world.t,
+        "things": dict(Counter(type(thing).__name__ for thing in world.things.values())),
+        "terrain": sum(1 for kind in world.terrain.kinds if kind),
+        "decorations": dict(Counter(type(thing).__name__ for thing in world.decoration.values())),
+        "events": len(world.events),
+        "pool": len(world.pool),
+        "latency": len(world.latency),
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report["tracemalloc"] = {
+            "current": current,
+            "peak": peak,
+            "top": top_allocators(top),
+        }
+    return report
+
+
+class MemoryMonitor(object):
+    """Keeps memory reports of a game, every interval ticks and on resets."""
+    def __init__(self, interval=100, top=10, trace=False, max_reports=MAX_REPORTS):
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.interval = interval
+        self.top = top
+        self.trace = trace
+        self.first_report = None
+        self.reports = deque(maxlen=max_reports)
+        self.resets = 0
+        self.started_tracing = False
+
+    def start(self):
+        """Start tracing the allocations, if the monitor traces them."""
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self.started_tracing = True
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def record(self, game, reason):
+        report = memory_report(game, self.top)
+        report["reason"] = reason
+        report["resets"] = self.resets
+        if self.first_report is None:
+            self.first_report = report
+        self.reports.append(report)
+        return report
+
+    def record_tick(self, game):
+        if game.world.t % self.interval == 0:
+            self.record(game, "tick")
+
+    def record_reset(self, game):
+        self.resets += 1
+        self.record(game, "reset")
+
+    @property
+    def last_report(self):
+        return self.reports[-1] if self.reports else None
+
+    def traced_growth(self, baseline=None):
+        """The growth of the memory traced (in bytes) between a baseline report
+           (the first one by default) and the last one, or None when not
+           traced."""
+        baseline = baseline or self.first_report
+        last = self.last_report
+        if baseline is None or "tracemalloc" not in baseline or "tracemalloc" not in last:
+            return None
+        return last["tracemalloc"]["current"] - baseline["tracemalloc"]["current"]
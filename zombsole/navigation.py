@@ -0,0 +1,257 @@
+# coding: utf-8
+"""Navigation over the static terrain of a map.
+
+The walkable graph of a map (the cells without walls or boxes, connected to
+their 4 adjacent cells) is built once per map, along with its connected
+components and a BFS distance field for each objective. Each world gets its
+own copy, updated when walls or boxes are destroyed.
+
+Paths are found with A*, and cached keyed on (start, goal, obstacle version).
+Destroying an obstacle bumps the version, and only the cached paths which could
+now be shorter are dropped, the others are kept for the new version.
+
+Moving things (players, zombies) aren't obstacles for the navigation, as they
+don't stay in the way.
+"""
+import heapq
+from array import array
+from collections import deque
+
+from zombsole.grid import FlatGrid
+
+
+UNREACHABLE = -1
+
+# Cached paths, per navigation, before the cache is emptied
+PATH_CACHE_SIZE = 4096
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class Navigation(object):
+    """Walkable graph, components, distance fields and paths of a world."""
+    def __init__(self, size, obstacles, objectives=()):
+        self.grid = FlatGrid(size)
+        # the extra last cell (outside of the world) isn't walkable
+        self.walkable = bytearray([1]) * self.grid.cell_count + bytearray(1)
+        for position in obstacles:
+            self.walkable[self.grid.index(position)] = 0
+        self.version = 0
+        self.objectives = list(objectives)
+
+        self.components = array('i', [UNREACHABLE]) * (self.grid.cell_count + 1)
+        self.component_count = 0
+        for index in range(self.grid.cell_count):
+            if self.walkable[index] and self.components[index] == UNREACHABLE:
+                self._label_component(index, self.component_count)
+                self.component_count += 1
+
+        # distance fields by goals (a tuple of positions)
+        self.fields = {}
+        for objective in self.objectives:
+            self.distance_field([objective])
+        if self.objectives:
+            self.distance_field(self.objectives)
+
+        self.paths = {}
+
+    @classmethod
+    def from_map(cls, map_):
+        obstacles = [thing.position for thing in map_.things if thing.TERRAIN]
+        return cls(map_.size, obstacles, map_.objectives or ())
+
+    def copy(self):
+        """A copy to be updated by a world, sharing nothing mutable."""
+        other = Navigation.__new__(Navigation)
+        other.grid = self.grid
+        other.walkable = bytearray(self.walkable)
+        other.version = self.version
+        other.objectives = self.objectives
+        other.components = array('i', self.components)
+        other.component_count = self.component_count
+        other.fields = {goals: array('i', field) for goals, field in self.fields.items()}
+        other.paths = dict(self.paths)
+        return other
+
+    def _label_component(self, start, label):
+        self.components[start] = label
+        pending = deque([start])
+        while pending:
+            index = pending.popleft()
+            for neighbour, _ in self.grid.neighbours[index]:
+                if self.walkable[neighbour] and self.components[neighbour] != label:
+                    self.components[neighbour] = label
+                    pending.append(neighbour)
+
+    def _index(self, position):
+        index = self.grid.index(position)
+        return self.grid.outside if index is None else index
+
+    def is_walkable(self, position):
+        return bool(self.walkable[self._index(position)])
+
+    def walkable_neighbours(self, position):
+        """The adjacent positions of a position which are walkable."""
+        return [neighbour for index, neighbour in self.grid.neighbours[self._index(position)]
+                if self.walkable[index]]
+
+    def component(self, position):
+        """The connected component of a walkable position, or None."""
+        component = self.components[self._index(position)]
+        return None if component == UNREACHABLE else component
+
+    def connected(self, a, b):
+        component = self.component(a)
+        return component is not None and component == self.component(b)
+
+    def distance_field(self, goals):
+        """The walkable distance from each cell to the closest of the goals.
+
+           The field is a flat array (indexed as in zombsole.grid), with -1
+           for the cells the goals can't be reached from. It is computed once,
+           and kept up to date when obstacles are destroyed.
+        """
+        key = tuple(sorted(goals))
+        field = self.fields.get(key)
+        if field is None:
+            field = self.compute_distance_field(key)
+            self.fields[key] = field
+        return field
+
+    def compute_distance_field(self, goals):
+        """The distance field of some goals (as in distance_field), computed
+           without caching it, for goals which change often."""
+        field = array('i', [UNREACHABLE]) * (self.grid.cell_count + 1)
+        pending = deque()
+        for goal in goals:
+            index = self.grid.index(goal)
+            if index is not None and self.walkable[index]:
+                field[index] = 0
+                pending.append(index)
+        self._propagate(field, pending)
+        return field
+
+    def _propagate(self, field, pending):
+        """Lower the distances of a field from the pending cells (BFS)."""
+        while pending:
+            index = pending.popleft()
+            distance = field[index] + 1
+            for neighbour, _ in self.grid.neighbours[index]:
+                if self.walkable[neighbour] and (field[neighbour] == UNREACHABLE or
+                                                 field[neighbour] > distance):
+                    field[neighbour] = distance
+                    pending.append(neighbour)
+
+    def distance(self, position, goals):
+        """The walkable distance from a position to the closest of the goals,
+           or None if they can't be reached."""
+        distance = self.distance_field(goals)[self._index(position)]
+        return None if distance == UNREACHABLE else distance
+
+    def objective_distance(self, position):
+        """The walkable distance from a position to the closest objective."""
+        if not self.objectives:
+            return None
+        return self.distance(position, self.objectives)
+
+    def find_path(self, start, goal):
+        """The shortest walkable path from start to goal (A*), as the list of
+           positions after start, ending with goal. None if there's no path.
+
+           The start and the goal don't need to be walkable (things can stand
+           on them, or be targeted there).
+        """
+        key = (start, goal, self.version)
+        if key in self.paths:
+            path = self.paths[key]
+            return None if path is None else list(path)
+
+        path = self._a_star(start, goal)
+        if len(self.paths) >= PATH_CACHE_SIZE:
+            self.paths = {}
+        self.paths[key] = None if path is None else tuple(path)
+        return path
+
+    def next_step(self, start, goal):
+        """The first position of the shortest path from start to goal."""
+        path = self.find_path(start, goal)
+        return path[0] if path else None
+
+    def _a_star(self, start, goal):
+        if start == goal:
+            return []
+        start_index = self.grid.index(start)
+        goal_index = self.grid.index(goal)
+        if start_index is None or goal_index is None:
+            return None
+
+        neighbours = self.grid.neighbours
+        positions = self.grid.positions
+        walkable = self.walkable
+        came_from = {start_index: None}
+        costs = {start_index: 0}
+        # ties are broken by insertion order, so paths are deterministic
+        counter = 0
+        frontier = [(_manhattan(start, goal), counter, start_index)]
+        while frontier:
+            _, _, index = heapq.heappop(frontier)
+            if index == goal_index:
+                path = []
+                while index != start_index:
+                    path.append(positions[index])
+                    index = came_from[index]
+                path.reverse()
+                return path
+            cost = costs[index] + 1
+            for neighbour, position in neighbours[index]:
+                if not (walkable[neighbour] or neighbour == goal_index):
+                    continue
+                if cost < costs.get(neighbour, cost + 1):
+                    costs[neighbour] = cost
+                    came_from[neighbour] = index
+                    counter += 1
+                    heapq.heappush(frontier, (cost + _manhattan(position, goal), counter, neighbour))
+        return None
+
+    def remove_obstacle(self, position):
+        """Make the position of a destroyed wall or box walkable."""
+        index = self.grid.index(position)
+        if index is None or self.walkable[index]:
+            return
+        self.walkable[index] = 1
+        self.version += 1
+
+        # merge the components around the position into one
+        labels = set(self.components[neighbour] for neighbour, _ in self.grid.neighbours[index]
+                     if self.walkable[neighbour])
+        merged = len(labels) != 1
+        if labels:
+            self._label_component(index, min(labels))
+        else:
+            self.components[index] = self.component_count
+            self.component_count += 1
+
+        # lower the distances around the position
+        for field in self.fields.values():
+            distances = [field[neighbour] for neighbour, _ in self.grid.neighbours[index]
+                         if self.walkable[neighbour] and field[neighbour] != UNREACHABLE]
+            if distances:
+                field[index] = min(distances) + 1
+                self._propagate(field, deque([index]))
+
+        # keep the cached paths which can't be shortened through the position
+        paths = {}
+        for (start, goal, version), path in self.paths.items():
+            if version != self.version - 1:
+                continue
+            if path is None:
+                # a goal next to the position can be reached through it, as
+                # the goal of a path doesn't have to be walkable
+                if merged or _manhattan(goal, position) <= 1:
+                    continue
+            elif _manhattan(start, position) + _manhattan(position, goal) < len(path):
+                continue
+            paths[(start, goal, self.version)] = path
+        self.paths = paths
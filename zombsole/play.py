@@ -4,7 +4,8 @@
 
 Usage:
     ./play.py --help
-    ./play.py RULES PLAYERS [-m MAP] [-s SIZE] [-z INITIAL_ZOMBIES] [-n MINIMUM_ZOMBIES] [-d] [-b] [-f MAX_FRAMES] [-r RENDERER]
+    ./play.py tournament RULES PLAYERS [-m MAP] [-s SIZE] [-z INITIAL_ZOMBIES] [-n MINIMUM_ZOMBIES] [--games GAMES] [-j CORES] [--max-ticks MAX_TICKS] [--seed SEED] [--precision PRECISION] [--cache DIR] [--no-cache]
+    ./play.py RULES PLAYERS [-m MAP] [-s SIZE] [-z INITIAL_ZOMBIES] [-n MINIMUM_ZOMBIES] [-d] [-b] [-f MAX_FRAMES] [-r RENDERER] [-e EXECUTOR] [-t TIME_BUDGET] [-l LOD] [-a RESOLUTION] [--targeting TARGETING] [--profile FILE] [--profiler PROFILER] [--profile-filter MODULE]
     ./play.py list_rules
     ./play.py list_maps
 
@@ -30,21 +31,115 @@ Options:
                          normal icons.
     -r RENDERER          The renderer to use, either terminal or opencv
                          [default: terminal]
+    -e EXECUTOR          Run the bots with an executor, either serial,
+                         threads or processes, optionally followed by the
+                         number of workers, like threads:8 [default: serial]
+    -t TIME_BUDGET       The time budget of each bot for each tick, in
+                         milliseconds. Bots taking longer are idle for the
+                         tick (no budget by default)
+    -l LOD               Update the zombies far from the players less often.
+                         Format: NEAR:INTERVAL or NEAR:INTERVAL:SLEEP, the
+                         zombies farther than NEAR act every INTERVAL ticks,
+                         and the ones farther than SLEEP don't act at all
+                         (every zombie acts every tick by default)
+    -a RESOLUTION        How the actions of each tick are applied, either
+                         sequential (shuffled, one after another) or
+                         simultaneous (all at once) [default: sequential]
+    --targeting TARGETING
+                         How the zombies and bots choose their targets,
+                         either closest (searched every tick) or sticky
+                         (remembered between ticks) [default: closest]
+    --profile FILE       Profile the game, writing the statistics (pstats)
+                         to FILE, and the collapsed stacks (for flame
+                         graphs) to FILE.folded
+    --profiler PROFILER  The profiler to use, either cprofile
+                         (deterministic) or sampling [default: cprofile]
+    --profile-filter MODULE
+                         Only report the frames of the modules of a
+                         package, like zombsole
+
+Tournament options:
+    --games GAMES            The maximum number of games [default: 100]
+    -j CORES                 The processes playing the games [default: 1]
+    --max-ticks MAX_TICKS    The ticks after which a game is stopped (and
+                             counted as capped) [default: 1000]
+    --seed SEED              The seed of the first game, the next ones use
+                             the following seeds [default: 0]
+    --precision PRECISION    Stop once the 95% confidence intervals are this
+                             tight (the half width of the win rate interval,
+                             and of the others relative to their means)
+    --cache DIR              The directory of the cached game results
+                             (~/.cache/zombsole/tournament by default)
+    --no-cache               Don't cache the game results
 
 list_rules:
     Will list available game rules.
 
 list_maps:
     Will list available game maps.
+
+tournament:
+    Will play many seeded games headless (no rendering, no waiting between
+    ticks) in parallel, and report the win rate, ticks and survivors with
+    confidence intervals.
 """
 from __future__ import print_function
 
-from os import path, listdir
+from os import listdir
 
 from docopt import docopt
 
-from zombsole.game import Game, Map
+from zombsole.game import Game
+from zombsole.latency import TimeBudgets
+from zombsole.scheduling import ZombieScheduler
+from zombsole.profiling import profile_call
 from zombsole.renderer import build_renderer
+from zombsole.tournament import DEFAULT_CACHE_DIR, build_map, run_tournament
+
+
+def parse_player_names(players):
+    """The player names of a list like playerA:3,playerB,playerC:10"""
+    player_names = []
+    for player_part in players.split(','):
+        if ':' in player_part:
+            player_name, count = player_part.split(':')
+            count = int(count)
+        else:
+            player_name = player_part
+            count = 1
+        player_names.extend([player_name, ] * count)
+    return player_names
+
+
+def tournament(arguments):
+    """Play a tournament, using the command line arguments as configuration."""
+    size = arguments['-s']
+    config = {
+        "rules_name": arguments['RULES'],
+        "player_names": parse_player_names(arguments['PLAYERS']),
+        "map_name": arguments['-m'],
+        "size": list(map(int, size.split('x'))) if size else None,
+        "initial_zombies": int(arguments['-z']),
+        "minimum_zombies": int(arguments['-n']),
+        "max_ticks": int(arguments['--max-ticks']),
+    }
+    precision = arguments['--precision']
+    cache_dir = None
+    if not arguments['--no-cache']:
+        cache_dir = arguments['--cache'] or DEFAULT_CACHE_DIR
+
+    def progress(stats):
+        print(u'%i games, win rate %.3f [%.3f, %.3f]' % (
+            (stats.games, stats.win_rate) + stats.win_rate_interval))
+
+    stats = run_tournament(config, int(arguments['--games']),
+                           jobs=int(arguments['-j']),
+                           seed=int(arguments['--seed']),
+                           precision=float(precision) if precision else None,
+                           cache_dir=cache_dir,
+                           progress=progress)
+    print('')
+    print(stats.format())
 
 
 def play():
@@ -60,6 +155,8 @@ def play():
     elif arguments['list_maps']:
         # list all possible maps
         print('\n'.join(listdir('maps')))
+    elif arguments['tournament']:
+        tournament(arguments)
     else:
         # start a game
         # parse arguments
@@ -70,39 +167,22 @@ def play():
         use_basic_icons = arguments['-b']
         max_frames = int(arguments['-f'])
         renderer_id = arguments['-r']
+        executor_id = arguments['-e']
+        time_budgets = None
+        if arguments['-t']:
+            time_budgets = TimeBudgets(float(arguments['-t']) / 1000)
+        zombie_scheduler = None
+        if arguments['-l']:
+            zombie_scheduler = ZombieScheduler(*map(int, arguments['-l'].split(':')))
 
-        player_names = []
-        for player_part in arguments['PLAYERS'].split(','):
-            if ':' in player_part:
-                player_name, count = player_part.split(':')
-                count = int(count)
-            else:
-                player_name = player_part
-                count = 1
-            player_names.extend([player_name, ] * count)
+        player_names = parse_player_names(arguments['PLAYERS'])
 
         size = arguments['-s']
         if size:
             size = tuple(map(int, size.split('x')))
 
-        map_name = arguments['-m']
-        if map_name:
-            map_file = path.join(path.dirname(__file__), 'maps', map_name)
-            map_ = Map.from_file(map_file)
-
-            if size:
-                if size[0] < map_.size[0] or size[1] < map_.size[1]:
-                    message = "Map (%s) doesn't fit in specified size (%s) " \
-                              "(leave it empty to use best fit)"
-                    raise Exception(message % (str(map_.size), str(size)))
-                else:
-                    map_.size = size
-        else:
-            if not size:
-                size = 30, 10
+        map_ = build_map(arguments['-m'], size)
 
-            map_ = Map(size, [])
-        
 
         renderer = build_renderer(
                 renderer_id,
@@ -120,9 +200,19 @@ def play():
                  minimum_zombies=minimum_zombies,
                  debug=debug,
                  use_basic_icons=use_basic_icons,
-                 renderer=renderer
+                 renderer=renderer,
+                 executor=executor_id,
+                 time_budgets=time_budgets,
+                 zombie_scheduler=zombie_scheduler,
+                 action_resolution=arguments['-a'],
+                 targeting=arguments['--targeting']
         )
-        g.play(max_frames)
+        if arguments['--profile']:
+            profile_call(lambda: g.play(max_frames), arguments['--profile'],
+                         profiler=arguments['--profiler'],
+                         module_filter=arguments['--profile-filter'])
+        else:
+            g.play(max_frames)
 
 
 if __name__ == '__main__':
@@ -2,13 +2,16 @@
 from __future__ import print_function
 import sys
 
+from zombsole.targeting import sticky_closest
 from zombsole.things import Player, Zombie, Wall, Box
-from zombsole.utils import closest
 
 
 class Agent(Player):
     ICON = u'\u2A51'
     ICON_BASIC = u'A'
+    # Its next_step changes the action set by the environment, so it's run in
+    # the main thread (see zombsole.executors)
+    CONCURRENT_NEXT_STEP = False
 
     def __init__(self, agent_id, color, position=None, 
                  weapon=None, rules=None, objectives=None
@@ -36,18 +39,17 @@ class Agent(Player):
             target = (self.position[0] + self.action_parameter[0],
                       self.position[1] + self.action_parameter[1])
         elif self.action_type == 'attack_closest':
-            zombies = [thing for thing in things.values()
-                       if isinstance(thing, Zombie)]
+            target = sticky_closest(self, things, t, Zombie)
 
-            if zombies:
+            if target is not None:
                 self.status = u'shooting closest zombie'
                 self.action_type = 'attack'
-                target = closest(self, zombies)
             else:
                 self.status = u'killing flies, because no zombies left'
                 self.action_type = None
         elif self.action_type == 'attack':
-            self.status = u'shooting at {}'.format(self.action_parameter)
+            if not self.headless:
+                self.status = u'shooting at {}'.format(self.action_parameter)
             targetpos = (self.position[0] + self.action_parameter[0],
                          self.position[1] + self.action_parameter[1])
             target = things.get(targetpos, None)
@@ -55,14 +57,16 @@ class Agent(Player):
                 # Reset the action type and target
                 self.action_type = None
                 target = None
-                self.status = u'No target at position {} to attack'.format(self.action_parameter)
+                if not self.headless:
+                    self.status = u'No target at position {} to attack'.format(self.action_parameter)
         elif self.action_type == 'heal':
             # Heal a target specified by the relative coordinates in self.action_parameter
             if (not self.action_parameter) or (tuple(self.action_parameter) == (0, 0)):
                 self.status = u'healing self'
                 target=self 
             else:
-                self.status = u'healing thing at {}'.format(self.action_parameter)
+                if not self.headless:
+                    self.status = u'healing thing at {}'.format(self.action_parameter)
                 targetpos = (self.position[0] + self.action_parameter[0],
                              self.position[1] + self.action_parameter[1])
                 target = things.get(targetpos, None)
@@ -72,16 +76,15 @@ class Agent(Player):
                     # Reset the action type and target
                     self.action_type = None
                     target = None
-                    self.status = u'unable to heal thing at {}'.format(self.action_parameter)
+                    if not self.headless:
+                        self.status = u'unable to heal thing at {}'.format(self.action_parameter)
         elif self.action_type == 'heal_closest':
             # Heal the closest player, or self if no other players 
-            players = [thing for thing in things.values()
-                       if isinstance(thing, Player) and thing is not self]
+            target = sticky_closest(self, things, t, Player, exclude=self)
 
-            if players:
+            if target is not None:
                 self.status = u'healing closest friend'
                 self.action_type = 'heal'
-                target = closest(self, players)
             else:
                 self.status = u'healing self, because no other players are left'
                 self.action_type = 'heal'
@@ -1,17 +1,18 @@
 # coding: utf-8
-import random
-
 from zombsole.things import Player
 from zombsole.utils import possible_moves
 
 
 class Hamster(Player):
     """A player that always moves."""
+    # Draws random numbers, so it's run in order (see zombsole.executors)
+    CONCURRENT_NEXT_STEP = False
+
     def next_step(self, things, t):
         self.status = u'wii wi wiii'
         moves = possible_moves(self, things)
         if moves:
-            return 'move', random.choice(moves)
+            return 'move', things.random.choice(moves)
 
 
 def create(rules, objectives=None):
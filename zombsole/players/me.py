@@ -2,13 +2,16 @@
 from __future__ import print_function
 import sys
 
+from zombsole.targeting import sticky_closest
 from zombsole.things import Player, Zombie
-from zombsole.utils import closest
 from zombsole.weapons import Rifle
 
 
 class Me(Player):
     """An interactive player, controlled with the keyboard."""
+    # Reads the keyboard, so it's run in the main thread
+    CONCURRENT_NEXT_STEP = False
+
     def next_step(self, things, t):
         print('Which action?')
         print('w, a, s, d: movement (up, left down, right, like all games)')
@@ -39,13 +42,11 @@ class Me(Player):
             target = (self.position[0] + delta[0],
                       self.position[1] + delta[1])
         elif action == 'j':
-            zombies = [thing for thing in things.values()
-                       if isinstance(thing, Zombie)]
+            target = sticky_closest(self, things, t, Zombie)
 
-            if zombies:
+            if target is not None:
                 self.status = u'shooting closest zombie'
                 action = 'attack'
-                target = closest(self, zombies)
             else:
                 self.status = u'killing flies, because no zombies left'
                 action = None
@@ -53,13 +54,11 @@ class Me(Player):
             self.status = u'healing self'
             return 'heal', self
         elif action == 'l':
-            players = [thing for thing in things.values()
-                       if isinstance(thing, Player) and thing is not self]
+            target = sticky_closest(self, things, t, Player, exclude=self)
 
-            if players:
+            if target is not None:
                 self.status = u'healing closest friend'
                 action = 'heal'
-                target = closest(self, players)
             else:
                 self.status = u'healing flies, because no players left'
                 action = None
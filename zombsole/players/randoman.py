@@ -1,21 +1,26 @@
 # coding: utf-8
-import random
-
 from zombsole.things import Player
 
 
 class RandoMan(Player):
     """A player that decides what to do with a dice."""
+    # Draws random numbers, so it's run in order (see zombsole.executors)
+    CONCURRENT_NEXT_STEP = False
+
     def next_step(self, things, t):
-        action = random.choice(('move', 'attack', 'heal'))
+        action = things.random.choice(('move', 'attack', 'heal'))
 
         if action in ('attack', 'heal'):
             self.status = action + 'ing'
-            target = random.choice(list(things.values()))
+            # the static terrain (walls and boxes) isn't in the values, but
+            # it's a target too
+            target = things.random.choice(list(things.values()) + things.terrain.positions())
+            if isinstance(target, tuple):
+                target = things[target]
         else:
             self.status = u'moving'
             target = list(self.position)
-            target[random.choice((0, 1))] += random.choice((-1, 1))
+            target[things.random.choice((0, 1))] += things.random.choice((-1, 1))
             target = tuple(target)
 
         return action, target
@@ -1,18 +1,20 @@
 # coding: utf-8
+from zombsole.targeting import sticky_closest
 from zombsole.things import Player, Zombie
-from zombsole.utils import closest
 from zombsole.weapons import Rifle
 
 
 class Sniper(Player):
     """A player that stays still and shoots zombies."""
+    # Doesn't draw random numbers, and only changes itself (see
+    # zombsole.executors)
+    CONCURRENT_NEXT_STEP = True
+
     def next_step(self, things, t):
-        zombies = [thing for thing in things.values()
-                   if isinstance(thing, Zombie)]
+        target = sticky_closest(self, things, t, Zombie)
 
-        if zombies:
+        if target is not None:
             self.status = u'shooting stuff'
-            target = closest(self, zombies)
             return 'attack', target
         else:
             self.status = u'waiting for targets'
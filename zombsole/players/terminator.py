@@ -1,4 +1,5 @@
 # coding: utf-8
+from zombsole.targeting import sticky_closest
 from zombsole.things import Player, Zombie
 from zombsole.utils import closest, distance, adjacent_positions
 from zombsole.weapons import Shotgun
@@ -6,12 +7,14 @@ from zombsole.weapons import Shotgun
 
 class Terminator(Player):
     """A player that stays still and shoots zombies."""
+    # Doesn't draw random numbers, and only changes itself (see
+    # zombsole.executors)
+    CONCURRENT_NEXT_STEP = True
+
     def next_step(self, things, t):
-        zombies = [thing for thing in things.values()
-                   if isinstance(thing, Zombie)]
+        target = sticky_closest(self, things, t, Zombie)
 
-        if zombies:
-            target = closest(self, zombies)
+        if target is not None:
             if distance(self, target) > self.weapon.max_range:
                 best_move = closest(target, adjacent_positions(self))
                 obstacle = things.get(best_move)
@@ -7,6 +7,10 @@ class Troll(Player):
 
        (trolls have regenerative capabilities, hence the name).
     """
+    # Doesn't draw random numbers, and only changes itself (see
+    # zombsole.executors)
+    CONCURRENT_NEXT_STEP = True
+
     def next_step(self, things, t):
         self.status = u'healing myself'
         return 'heal', self
@@ -0,0 +1,39 @@
+# coding: utf-8
+"""Pools of dead things, recycled instead of creating new ones.
+
+Games with a high minimum of zombies create and discard zombies (and their
+remains) all the time. Instead, a world keeps the dead things of the classes
+with POOLED set, and the game revives them as new zombies, so a long game
+reaches a steady state instead of allocating things on every death.
+
+A recycled thing is the same object as the dead one, so code keeping a
+reference to a dead thing must not assume it stays dead (check it's still in
+the world at its position instead).
+"""
+
+
+# Dead things kept per class, the others are left to the garbage collector
+MAX_POOL_SIZE = 1024
+
+
+class ThingPool(object):
+    """Dead things waiting to be recycled, by class."""
+    def __init__(self, max_size=MAX_POOL_SIZE):
+        self.max_size = max_size
+        self.free = {}
+
+    def __len__(self):
+        return sum(len(things) for things in self.free.values())
+
+    def release(self, thing):
+        """Keep a thing which is no longer in the world."""
+        things = self.free.setdefault(type(thing), [])
+        if len(things) < self.max_size:
+            things.append(thing)
+
+    def acquire(self, thing_class):
+        """A released thing of a class (to be reset by the caller), or None."""
+        things = self.free.get(thing_class)
+        if things:
+            return things.pop()
+        return None
@@ -0,0 +1,259 @@
+# coding: utf-8
+"""Profiling of whole sessions, for the --profile option of the entry points.
+
+A session (a game, or a JSON session) is run under a profiler, and when it
+ends (or is interrupted) two files are written:
+
+- FILE: the statistics in the pstats format (for pstats, snakeviz, ...).
+- FILE.folded: collapsed stacks, a "frame;frame;frame weight" line per stack
+  (for flamegraph.pl, speedscope, inferno, ...).
+
+The profilers are:
+
+- cprofile: deterministic (cProfile), every call is measured. cProfile only
+  knows the callers of each function, so the collapsed stacks are rebuilt from
+  the call graph, apportioning the time of each function between its callers.
+  The weights are microseconds.
+- sampling: the stack of the profiled thread is sampled every interval by a
+  background thread, which has little overhead, but misses short calls. The
+  weights of the collapsed stacks are samples, and the pstats have the sampled
+  times (and the samples as call counts). The switch interval of the
+  interpreter is lowered to the sampling interval meanwhile, so the sampling
+  thread gets the GIL in time.
+
+A module filter (like "zombsole") restricts the report to the frames of the
+modules in a package: the other frames are dropped from the pstats, and from
+the collapsed stacks (their time goes to the closest frame kept).
+"""
+import cProfile
+import marshal
+import pstats
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from os import path
+
+
+# Seconds between the samples of the sampling profiler
+SAMPLING_INTERVAL = 0.001
+
+
+class ModuleNames(object):
+    """The names of the modules of source files, from the imported modules."""
+    def __init__(self):
+        self.names = {}
+        for name, module in list(sys.modules.items()):
+            file_name = getattr(module, '__file__', None)
+            if file_name:
+                self.names[path.abspath(file_name)] = name
+
+    def module(self, file_name):
+        return self.names.get(path.abspath(file_name))
+
+    def label(self, function):
+        """A label for a function of the pstats, like "zombsole.core:step:253"."""
+        file_name, line, name = function
+        if file_name == '~':
+            return name
+        module = self.module(file_name) or path.basename(file_name)
+        return f"{module}:{name}:{line}"
+
+    def matches(self, function, module_filter):
+        module = self.module(function[0]) if function[0] != '~' else None
+        return module is not None and (module == module_filter or
+                                       module.startswith(module_filter + '.'))
+
+
+def filter_stats(stats, keep):
+    """The pstats (as a dict) of the functions kept, called by functions kept."""
+    return {function: (cc, nc, tt, ct, {caller: timing for caller, timing in callers.items()
+                                          if keep(caller)})
+            for function, (cc, nc, tt, ct, callers) in stats.items()
+            if keep(function)}
+
+
+def filter_stacks(stacks, keep):
+    """The collapsed stacks with only the frames kept (the ones left empty
+       are dropped)."""
+    filtered = Counter()
+    for stack, weight in stacks.items():
+        stack = tuple(function for function in stack if keep(function))
+        if stack:
+            filtered[stack] += weight
+    return filtered
+
+
+class SessionProfiler(ABC):
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+    @abstractmethod
+    def stats(self):
+        """The statistics, as the dict of the pstats format."""
+        pass
+
+    @abstractmethod
+    def stacks(self):
+        """The collapsed stacks, as a Counter of weights by tuples of
+           functions (from the root), with the functions as pstats keys."""
+        pass
+
+    def write(self, file_path, module_filter=None):
+        """Write the pstats to file_path, and the collapsed stacks to
+           file_path.folded."""
+        names = ModuleNames()
+        stats = self.stats()
+        stacks = self.stacks()
+        if module_filter:
+            def keep(function):
+                return names.matches(function, module_filter)
+
+            stats = filter_stats(stats, keep)
+            stacks = filter_stacks(stacks, keep)
+
+        with open(file_path, 'wb') as stats_file:
+            marshal.dump(stats, stats_file)
+        with open(file_path + '.folded', 'w') as stacks_file:
+            for stack, weight in sorted(stacks.items()):
+                if weight > 0:
+                    labels = ';'.join(names.label(function).replace(';', ',')
+                                      for function in stack)
+                    stacks_file.write(f"{labels} {weight}\n")
+
+
+class DeterministicProfiler(SessionProfiler):
+    """Profiles with cProfile."""
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def stats(self):
+        return pstats.Stats(self.profile).stats
+
+    def stacks(self, min_weight=1):
+        """The stacks rebuilt from the call graph: the time of a function
+           called from several callers is apportioned by the time of each
+           call edge. Recursive calls are folded into the first frame."""
+        stats = self.stats()
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, _, edge_time) in callers.items():
+                callees.setdefault(caller, []).append((function, edge_time))
+
+        stacks = Counter()
+        roots = [function for function, (_, _, _, _, callers) in stats.items()
+                 if not callers]
+        # (stack, fraction of the time of its last function spent in it)
+        pending = [((root,), 1.0) for root in roots]
+        while pending:
+            stack, fraction = pending.pop()
+            function = stack[-1]
+            _, _, own_time, total_time, _ = stats[function]
+            weight = int(own_time * fraction * 1e6)
+            if weight >= min_weight:
+                stacks[stack] += weight
+            for callee, edge_time in callees.get(function, []):
+                callee_total = stats[callee][3]
+                if callee in stack or callee_total <= 0:
+                    continue
+                callee_fraction = fraction * edge_time / callee_total
+                if callee_fraction * callee_total * 1e6 >= min_weight:
+                    pending.append((stack + (callee,), callee_fraction))
+        return stacks
+
+
+class SamplingProfiler(SessionProfiler):
+    """Samples the stack of the thread which started it."""
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.thread_id = None
+        self.running = threading.Event()
+        self.sampler = None
+        self.switch_interval = None
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval))
+        self.running.set()
+        self.sampler = threading.Thread(target=self._sample, name='zombsole-profiler',
+                                        daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.running.clear()
+        self.sampler.join()
+        sys.setswitchinterval(self.switch_interval)
+
+    def _sample(self):
+        while self.running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def stats(self):
+        own = Counter()
+        total = Counter()
+        edges = {}
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+            for caller, function in set(zip(stack, stack[1:])):
+                function_edges = edges.setdefault(function, Counter())
+                function_edges[caller] += count
+
+        stats = {}
+        for function, count in total.items():
+            callers = {caller: (edge_count, edge_count, 0.0, edge_count * self.interval)
+                       for caller, edge_count in edges.get(function, {}).items()}
+            stats[function] = (count, count, own[function] * self.interval,
+                               count * self.interval, callers)
+        return stats
+
+    def stacks(self):
+        return Counter(self.samples)
+
+
+def build_profiler(profiler_id):
+    """Build a profiler from its id: "cprofile" or "sampling"."""
+    if profiler_id == "cprofile":
+        return DeterministicProfiler()
+    elif profiler_id == "sampling":
+        return SamplingProfiler()
+    else:
+        raise ValueError(f"{profiler_id} is not a valid profiler, must be \"cprofile\" or \"sampling\".")
+
+
+def profile_call(function, file_path, profiler="cprofile", module_filter=None):
+    """Call a function under a profiler (an id or an instance), writing its
+       results (see SessionProfiler.write) when it returns or raises."""
+    if isinstance(profiler, str):
+        profiler = build_profiler(profiler)
+    profiler.start()
+    try:
+        return function()
+    finally:
+        profiler.stop()
+        profiler.write(file_path, module_filter)
+        # stdout can be the channel of a session, like in the JSON mode
+        print(f"Profile written to {file_path} and {file_path}.folded", file=sys.stderr)
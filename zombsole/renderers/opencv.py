@@ -0,0 +1,198 @@
+from typing import TypeAlias, Union, Tuple
+from PIL import Image, ImageDraw, ImageFont
+import cv2
+import numpy as np
+
+from zombsole.core import (World, Thing)
+from zombsole.renderer import GameRenderer
+from zombsole.things import (Wall, Box, Zombie, Player, ObjectiveLocation, DeadBody)
+
+
+ColorType: TypeAlias = Union[str, float, Tuple[int, int, int], Tuple[int, int, int, int]]
+
+class OpencvRenderer(GameRenderer):
+    def __init__(self, gridwidth, gridheight, cellwidth = 10, cellheight = 10):
+        self.counter = 0
+        self.cellwidth = cellwidth
+        self.cellheight = cellheight
+        self.imagewidth = cellwidth * gridwidth
+        self.imageheight = cellheight * gridheight
+        self.lifebar_width = 20
+
+    def _draw_x(self, img: ImageDraw, x: int, y: int, color: ColorType, boxwidth: int=1, boxheight: int=1, width: int=1):
+        img.line(
+            [
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + boxwidth) * self.cellwidth, (y + boxheight) * self.cellheight),
+            ],
+            fill=color,
+            width=width
+        )
+        img.line(
+            [
+                ((x + boxwidth) * self.cellwidth, y * self.cellheight),
+                (x * self.cellwidth, (y + boxheight) * self.cellheight),
+            ],
+            fill=color,
+            width=width
+        )
+
+    def _render_wall(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        img.rectangle(
+            [
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + 1) * self.cellwidth, (y + 1) * self.cellheight),
+            ],
+            fill=color,
+            outline=None,
+        )
+
+    def _draw_rectangle(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        img.rectangle(
+            [
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + 1) * self.cellwidth, (y + 1) * self.cellheight),
+            ],
+            fill=None,
+            outline=color,
+            width=2
+        )
+
+    def _render_box(self, img, x: int, y: int, color: ColorType):
+        self._draw_rectangle(img, x, y, color)
+        self._draw_x(img, x, y, color)
+    
+    # `circle` method is introduced for ImageDraw in version 10.4.0
+    # def _draw_circle(self, img, x: int, y: int, color: ColorType):
+    #     img.circle(
+    #         (x * self.cellwidth + self.cellwidth / 2, y * self.cellheight + self.cellheight / 2),
+    #         self.cellwidth / 2,
+    #         fill = None,
+    #         outline = color,
+    #         width = 1
+    #     )
+
+    # def _draw_solid_circle(self, img, x: int, y: int, color: ColorType):
+    #     img.circle(
+    #         (x * self.cellwidth + self.cellwidth / 2, y * self.cellheight + self.cellheight / 2),
+    #         self.cellwidth / 2,
+    #         fill = color,
+    #         width = 1
+    #     )
+
+    def _draw_ellipse(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        img.ellipse(
+            [
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + 1) * self.cellwidth, (y + 1) * self.cellheight),
+            ],
+            fill = None,
+            outline = color,
+            width = 1
+        )
+
+    def _draw_solid_ellipse(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        img.ellipse(
+            [
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + 1) * self.cellwidth, (y + 1) * self.cellheight),
+            ],
+            fill = color,
+            width = 1
+        )
+
+    def _render_zombie(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        self._draw_solid_ellipse(img, x, y, color)
+
+    def _render_player(self, img: ImageDraw, x: int, y: int, color: ColorType):
+        self._draw_solid_ellipse(img, x, y, color)
+
+    def _render_thing(self, img: ImageDraw, x: int, y: int, thing: Thing):
+        if isinstance(thing, (Wall,)):
+            self._render_wall(img, x, y, thing.color)
+        elif isinstance(thing, (Box,)):
+            self._render_box(img, x, y, thing.color)
+        elif isinstance(thing, (Zombie,)):
+            self._render_zombie(img, x, y, thing.color)
+        elif isinstance(thing, (Player,)):
+            self._render_player(img, x, y, thing.color)
+        elif isinstance(thing, (ObjectiveLocation,)):
+            self._draw_rectangle(img, x, y, thing.color)
+        elif isinstance(thing, (DeadBody,)):
+            self._draw_ellipse(img, x, y, thing.color)
+            self._draw_x(img, x, y, thing.color)
+
+    def _render_player_lifebar(self, img, x: int, y: int, player: Player):
+        life_pixels_count = int(self.lifebar_width * self.cellwidth  * player.life / player.MAX_LIFE)
+        img.rectangle(
+            [ 
+                (x * self.cellwidth, y * self.cellheight),
+                ((x + self.lifebar_width) * self.cellwidth, (y + 1) * self.cellheight)
+            ],
+            fill=None,
+            outline=player.color if life_pixels_count > 0 else "red",
+            width=2
+        )
+        if life_pixels_count > 0:
+            # Here we use the custom life bar width, rather than coloring 
+            # a specified number of cells
+            img.rectangle(
+                [ 
+                    (x * self.cellwidth, y * self.cellheight),
+                    (x * self.cellwidth + life_pixels_count, (y + 1) * self.cellheight)
+                ],
+                fill=player.color,
+                outline=None,
+                width=2
+            )
+        else:
+            self._draw_x(img, x, y, "red", boxwidth=self.lifebar_width, boxheight=1, width=3)
+
+    def render(self, world: World, players):
+        image = Image.new("RGB", (self.imagewidth, self.imageheight), "black")
+        img = ImageDraw.Draw(image)
+
+        # print the world
+        for x in range(world.size[0]):
+            for y in range(world.size[1]):
+                position = (x, y)
+                thing = (world.terrain.prototype(position) or
+                         world.things.get(position) or
+                         world.decoration.get(position))
+                if thing is not None:
+                    self._render_thing(img, x, y, thing)
+        
+        # game stats
+        img.text((0, world.size[1] * self.cellheight),  f"ticks: {world.t} deaths: {world.deaths}", font=None, fill="yellow", anchor="la", font_size=14)
+
+        # print player stats
+        for idx, player in enumerate(players):
+            try:
+                weapon_name = player.weapon.name
+            except AttributeError:
+                weapon_name = u'unarmed'
+
+            self._render_player_lifebar(
+                img, 
+                1,
+                world.size[1] + 2 + 1 * idx,
+                player
+            )
+
+            player_stats = u'%s <%i %s %s>: %s' % (player.name,
+                                                   player.life,
+                                                   str(player.position),
+                                                   weapon_name,
+                                                   player.status or u'-')
+            latency = world.latency.get(player)
+            if latency is not None:
+                player_stats += u' [%s]' % latency.format()
+
+            img.text(((1 + self.lifebar_width + 1) * self.cellwidth, (world.size[1] + 2 + 1 * idx) * self.cellheight),  player_stats, font=None, fill=player.color, anchor="la", font_size=8)
+
+        open_cv_image = np.array(image)
+        # Convert RGB to BGR
+        open_cv_image = open_cv_image[:, :, ::-1].copy()
+
+        cv2.imshow("zombsole", open_cv_image)
+        cv2.waitKey(100)
@@ -0,0 +1,83 @@
+import os
+from termcolor import colored
+
+from zombsole.core import World
+from zombsole.renderer import GameRenderer
+
+
+class TerminalRenderer(GameRenderer):
+    def __init__(self, use_basic_icons, debug=False):
+        self.use_basic_icons = use_basic_icons
+        self.debug = debug
+
+    def _position_draw(self, world, position):
+        """Get the string to draw for a given position of the world."""
+        # static terrain first (drawn without materializing it), then
+        # decorations, then things over them
+        thing = (world.terrain.prototype(position) or
+                 world.things.get(position) or
+                 world.decoration.get(position))
+
+        if thing is not None:
+            if self.use_basic_icons:
+                icon = thing.icon_basic
+            else:
+                icon = thing.icon
+            return colored(icon, thing.color)
+        else:
+            return u' '
+
+    def _draw(self, world: World, players):
+        """Draw the world."""
+        screen = ''
+
+        # print the world
+        screen += '\n'.join(u''.join(self._position_draw(world, (x, y))
+                            for x in range(world.size[0]))
+                            for y in range(world.size[1]))
+
+        # game stats
+        screen += '\nticks: %i deaths: %i, zombie deaths: %i' % (world.t, world.deaths, world.zombie_deaths)
+
+        # print player stats
+        players = sorted(players, key=lambda x: x.name)
+        for player in players:
+            try:
+                weapon_name = player.weapon.name
+            except AttributeError:
+                weapon_name = u'unarmed'
+
+            if player.life > 0:
+                # a small "health bar" with unicode chars, from 0 to 10 chars
+                life_chars_count = int((10.0 / player.MAX_LIFE) * player.life)
+                life_chars = life_chars_count * u'\u2588'
+                no_life_chars = (10 - life_chars_count) * u'\u2591'
+                life_bar = u'\u2665 %s%s' % (life_chars, no_life_chars)
+            else:
+                life_bar = u'\u2620 [dead]'
+
+            player_stats = u'%s %s <%i %s %s>: %s' % (life_bar,
+                                                      player.name,
+                                                      player.life,
+                                                      str(player.position),
+                                                      weapon_name,
+                                                      player.status or u'-')
+            latency = world.latency.get(player)
+            if latency is not None:
+                player_stats += u' [%s]' % latency.format()
+
+            screen += '\n' + colored(player_stats, player.color)
+
+        # print events (of last step) for debugging
+        if self.debug:
+            screen += u'\n'
+            screen += u'\n'.join([colored(u'%s: %s' % (thing.name, event),
+                                          thing.color)
+                                  for t, thing, event in world.events
+                                  if t == world.t])
+        return screen
+
+    def render(self, world: World, players):
+        screen = self._draw(world, players)
+        os.system('clear')
+        print(screen)
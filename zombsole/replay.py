@@ -0,0 +1,844 @@
+# coding: utf-8
+"""Compact replay logs of games, and offline re-simulation of them.
+
+A replay stores what is needed to re-simulate a game deterministically: the
+seed of the random number generator, the map, the game configuration and the
+per-tick stream of agent actions. The actions chosen by the scripted bots (and
+the zombies) are stored as well, encoded as small integers, so a replay can be
+analysed without being re-simulated, and a re-simulation can be checked
+against the recorded game. Periodic keyframes (every keyframe_interval ticks)
+make it possible to seek to any tick without re-simulating the game from the
+start. A keyframe isn't a snapshot of the objects of the game, but the state
+the game is rebuilt from (see encode_keyframe), so loading a replay never runs
+code from the file. The initial state has no keyframe, as it's rebuilt from
+the seed.
+
+File layout:
+
+    magic | format version (1 byte) | header length (4 bytes, little endian)
+    header (utf-8 JSON) | zlib compressed stream of records
+
+Each record is a record type byte, a varint payload length and the payload.
+
+The game draws its random numbers from its own generator (see Game), whose
+state is stored in the keyframes. Re-simulations verify the bots' actions
+against the recorded ones by default, raising ``ReplayDivergenceError`` on a
+mismatch.
+"""
+import json
+import random
+from array import array
+import struct
+import zlib
+
+from zombsole.core import FightingThing, Thing
+from zombsole.game import Game, Map
+from zombsole.things import DeadBody, ObjectiveLocation, Player, Zombie, ZombieRemains
+from zombsole.weapons import Axe, Gun, Knife, Rifle, Shotgun, ZombieClaws
+
+
+MAGIC = b'ZSRP'
+FORMAT_VERSION = 4
+
+RECORD_TICK = 1
+RECORD_KEYFRAME = 2
+RECORD_END = 3
+
+# Agent action types, encoded by their index. Other action types are encoded
+# as CUSTOM_CODE followed by the action type string.
+AGENT_ACTION_TYPES = [None, 'move', 'attack', 'attack_closest', 'heal',
+                      'heal_closest']
+# Actions returned by next_step, encoded by their index (or as CUSTOM_CODE)
+THING_ACTIONS = ['move', 'attack', 'heal']
+CUSTOM_CODE = 0x0f
+HAS_PARAMETER_FLAG = 0x80
+
+# Kinds of parameters of the actions returned by next_step
+PARAMETER_NONE = 0
+PARAMETER_POSITION = 1
+PARAMETER_THING = 2
+PARAMETER_OTHER = 3
+
+# Kinds of the things of the world in keyframes: the players and agents of the
+# game (by index), and other things (by class)
+KEYFRAME_PLAYER = 0
+KEYFRAME_AGENT = 1
+KEYFRAME_OTHER = 2
+# The classes of the things stored in keyframes (other than the players and
+# agents), and of the targets in target memories, by name
+KEYFRAME_CLASSES = {thing_class.__name__: thing_class
+                    for thing_class in (Zombie, ZombieRemains, DeadBody,
+                                        ObjectiveLocation, Player)}
+KEYFRAME_WEAPONS = {weapon_class.__name__: weapon_class
+                    for weapon_class in (ZombieClaws, Knife, Axe, Gun, Rifle,
+                                         Shotgun)}
+# Size of the internal state of the random number generator (random.Random)
+RANDOM_STATE_SIZE = 625
+
+
+class ReplayFormatError(Exception):
+    """The file isn't a valid replay."""
+
+
+class ReplayDivergenceError(Exception):
+    """A re-simulation didn't match the recorded game."""
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+def _write_varint(buf, value):
+    while value > 0x7f:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _write_signed(buf, value):
+    _write_varint(buf, _zigzag(int(value)))
+
+
+def _write_string(buf, value):
+    data = value.encode('utf-8')
+    _write_varint(buf, len(data))
+    buf.extend(data)
+
+
+def _write_position(buf, position):
+    _write_signed(buf, position[0])
+    _write_signed(buf, position[1])
+
+
+def _write_double(buf, value):
+    buf.extend(struct.pack('<d', value))
+
+
+class _Reader(object):
+    """Sequential reader of the values written by the _write_* functions."""
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def at_end(self):
+        return self.offset >= len(self.data)
+
+    def byte(self):
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def varint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def signed(self):
+        return _unzigzag(self.varint())
+
+    def string(self):
+        size = self.varint()
+        value = bytes(self.data[self.offset:self.offset + size])
+        self.offset += size
+        return value.decode('utf-8')
+
+    def raw(self, size):
+        value = bytes(self.data[self.offset:self.offset + size])
+        self.offset += size
+        return value
+
+    def position(self):
+        x = self.signed()
+        return x, self.signed()
+
+    def double(self):
+        return struct.unpack('<d', self.raw(8))[0]
+
+
+def encode_agent_action(buf, action):
+    """Encode an agent action dict (as given to Agent.set_action)."""
+    if action is None:
+        action_type, parameter = None, None
+    else:
+        action_type = action.get('action_type', None)
+        parameter = action.get('parameter', None)
+
+    if action_type in AGENT_ACTION_TYPES:
+        code = AGENT_ACTION_TYPES.index(action_type)
+    else:
+        code = CUSTOM_CODE
+
+    if parameter is not None:
+        buf.append(code | HAS_PARAMETER_FLAG)
+    else:
+        buf.append(code)
+    if code == CUSTOM_CODE:
+        _write_string(buf, str(action_type))
+    if parameter is not None:
+        _write_signed(buf, parameter[0])
+        _write_signed(buf, parameter[1])
+
+
+def decode_agent_action(reader):
+    """Decode an agent action dict written by encode_agent_action."""
+    code = reader.byte()
+    has_parameter = code & HAS_PARAMETER_FLAG
+    code &= ~HAS_PARAMETER_FLAG
+    if code == CUSTOM_CODE:
+        action_type = reader.string()
+    else:
+        action_type = AGENT_ACTION_TYPES[code]
+
+    action = {'action_type': action_type}
+    if has_parameter:
+        action['parameter'] = [reader.signed(), reader.signed()]
+    return action
+
+
+def encode_thing_action(buf, position, action, parameter):
+    """Encode an action returned by a thing's next_step.
+
+       The thing is identified by its position when it chose the action
+       (before the actions of the tick are applied), and the target of the
+       action is stored relative to it.
+    """
+    x, y = position
+    _write_signed(buf, x)
+    _write_signed(buf, y)
+
+    if action in THING_ACTIONS:
+        code = THING_ACTIONS.index(action)
+    else:
+        code = CUSTOM_CODE
+
+    if parameter is None:
+        kind = PARAMETER_NONE
+    elif isinstance(parameter, tuple) and len(parameter) == 2:
+        kind = PARAMETER_POSITION
+        target_position = parameter
+    elif isinstance(parameter, Thing):
+        kind = PARAMETER_THING
+        target_position = parameter.position
+    else:
+        kind = PARAMETER_OTHER
+
+    buf.append(code | (kind << 4))
+    if code == CUSTOM_CODE:
+        _write_string(buf, str(action))
+    if kind in (PARAMETER_POSITION, PARAMETER_THING):
+        _write_signed(buf, target_position[0] - x)
+        _write_signed(buf, target_position[1] - y)
+
+
+def decode_thing_action(reader):
+    """Decode an action written by encode_thing_action.
+
+       Returns a tuple (position of the thing, action, target position), with
+       the target position being None when the action had no position or thing
+       as parameter.
+    """
+    x = reader.signed()
+    y = reader.signed()
+    byte = reader.byte()
+    code = byte & 0x0f
+    kind = byte >> 4
+    if code == CUSTOM_CODE:
+        action = reader.string()
+    else:
+        action = THING_ACTIONS[code]
+
+    target = None
+    if kind in (PARAMETER_POSITION, PARAMETER_THING):
+        target = (x + reader.signed(), y + reader.signed())
+    return (x, y), action, target
+
+
+def encode_tick(t, agent_actions, thing_actions):
+    buf = bytearray()
+    _write_varint(buf, t)
+    _write_varint(buf, len(agent_actions))
+    for action in agent_actions:
+        encode_agent_action(buf, action)
+    _write_varint(buf, len(thing_actions))
+    for _, position, action, parameter in thing_actions:
+        encode_thing_action(buf, position, action, parameter)
+    return buf
+
+
+def _class_name(thing_class):
+    name = thing_class.__name__
+    if KEYFRAME_CLASSES.get(name) is not thing_class:
+        raise ValueError("%s things can't be stored in a keyframe" % name)
+    return name
+
+
+def _keyframe_class(name):
+    thing_class = KEYFRAME_CLASSES.get(name)
+    if thing_class is None:
+        raise ReplayFormatError('unknown class of thing %s' % name)
+    return thing_class
+
+
+def _new_thing(thing_class, position, rng):
+    if thing_class is Zombie:
+        return Zombie(position, rng)
+    return thing_class(position)
+
+
+def _write_fighter(buf, fighter):
+    _write_signed(buf, fighter.life)
+    if fighter.position is None:
+        buf.append(0)
+    else:
+        buf.append(1)
+        _write_position(buf, fighter.position)
+    _write_string(buf, fighter.status)
+    _write_string(buf, fighter.weapon.name if fighter.weapon is not None else '')
+
+
+def _read_fighter(reader, fighter):
+    fighter.life = reader.signed()
+    fighter.position = reader.position() if reader.byte() else None
+    fighter.status = reader.string()
+    weapon_name = reader.string()
+    if weapon_name:
+        weapon_class = KEYFRAME_WEAPONS.get(weapon_name)
+        if weapon_class is None:
+            raise ReplayFormatError('unknown weapon %s' % weapon_name)
+        fighter.weapon = weapon_class()
+    else:
+        fighter.weapon = None
+
+
+def encode_keyframe(game, initial_lives):
+    """Encode the state of a game as a keyframe (without the tick).
+
+       Instead of a snapshot of the objects, a keyframe has the state the
+       game is rebuilt from (see decode_keyframe): the counters of the world,
+       the life of the terrain cells changed since the start of the game
+       (initial_lives), the players and agents, the things of the world
+       (class, position, life and status), the dead things kept to be
+       recycled, the target memories, the last actions of the zombie
+       scheduler, the decorations, the free cells of the spawn regions and the
+       state of the random number generator.
+
+       The things are referenced (by the target memories and the scheduler)
+       by their index in the things of the world, followed by the players,
+       the agents and the pooled things.
+    """
+    world = game.world
+    buf = bytearray()
+    _write_varint(buf, world.deaths)
+    _write_varint(buf, world.zombie_deaths)
+
+    lives = world.terrain.lives
+    changed = [index for index in range(len(lives))
+               if lives[index] != initial_lives[index]]
+    _write_varint(buf, len(changed))
+    previous = 0
+    for index in changed:
+        _write_varint(buf, index - previous)
+        _write_signed(buf, lives[index])
+        previous = index
+
+    for fighters in (game.players, game.agents):
+        _write_varint(buf, len(fighters))
+        for fighter in fighters:
+            _write_fighter(buf, fighter)
+
+    players = {id(player): index for index, player in enumerate(game.players)}
+    agents = {id(agent): index for index, agent in enumerate(game.agents)}
+    things = list(world.things.values())
+    _write_varint(buf, len(things))
+    for thing in things:
+        if id(thing) in players:
+            buf.append(KEYFRAME_PLAYER)
+            _write_varint(buf, players[id(thing)])
+        elif id(thing) in agents:
+            buf.append(KEYFRAME_AGENT)
+            _write_varint(buf, agents[id(thing)])
+        else:
+            buf.append(KEYFRAME_OTHER)
+            _write_string(buf, _class_name(type(thing)))
+            _write_position(buf, thing.position)
+            _write_signed(buf, thing.life)
+            _write_string(buf, thing.status)
+
+    pooled = []
+    _write_varint(buf, len(world.pool.free))
+    for thing_class, free in world.pool.free.items():
+        _write_string(buf, _class_name(thing_class))
+        _write_varint(buf, len(free))
+        for thing in free:
+            _write_signed(buf, thing.life)
+        pooled.extend(free)
+
+    objects = things + game.players + game.agents + pooled
+    indexes = {}
+    for index, thing in enumerate(objects):
+        indexes.setdefault(id(thing), index)
+
+    memories = []
+    for index, thing in enumerate(objects):
+        memory = getattr(thing, 'target_memory', None)
+        if memory is not None and indexes[id(thing)] == index:
+            # the targets no longer in the game (and so dead) are left out, as
+            # they are searched again anyway
+            memories.append((index, [
+                (target_class, target, chosen_distance, chosen_tick)
+                for target_class, (target, chosen_distance, chosen_tick) in memory.items()
+                if target is None or id(target) in indexes]))
+    _write_varint(buf, len(memories))
+    for index, entries in memories:
+        _write_varint(buf, index)
+        _write_varint(buf, len(entries))
+        for target_class, target, chosen_distance, chosen_tick in entries:
+            _write_string(buf, _class_name(target_class))
+            if target is None:
+                _write_varint(buf, 0)
+            else:
+                _write_varint(buf, indexes[id(target)] + 1)
+                _write_double(buf, chosen_distance)
+            _write_signed(buf, chosen_tick)
+
+    scheduler = game.zombie_scheduler
+    last_actions = scheduler.last_actions if scheduler is not None else {}
+    _write_varint(buf, len(last_actions))
+    for thing, last_action in last_actions.items():
+        _write_varint(buf, indexes[id(thing)])
+        _write_signed(buf, last_action)
+
+    _write_varint(buf, len(world.decoration))
+    for decoration in world.decoration.values():
+        _write_string(buf, _class_name(type(decoration)))
+        _write_position(buf, decoration.position)
+        if type(decoration) is DeadBody:
+            _write_string(buf, decoration.name)
+            _write_string(buf, decoration.color)
+
+    _write_varint(buf, len(world.spawn_regions))
+    for name, region in world.spawn_regions.items():
+        if name is None:
+            buf.append(0)
+        else:
+            buf.append(1)
+            _write_string(buf, name)
+        # the order of the free cells matters, as they are sampled by index
+        _write_varint(buf, len(region.positions))
+        for position in region.positions:
+            _write_position(buf, position)
+
+    version, internal_state, gauss_next = game.random.getstate()
+    buf.append(version)
+    buf.extend(struct.pack('<%iI' % RANDOM_STATE_SIZE, *internal_state))
+    if gauss_next is None:
+        buf.append(0)
+    else:
+        buf.append(1)
+        _write_double(buf, gauss_next)
+    return buf
+
+
+def decode_keyframe(payload, game, tick):
+    """Rebuild a game in the state of a keyframe (see encode_keyframe), taken
+       after the given tick.
+
+       The game gets a new world, built from the map, and new players and
+       agents, which are then set to the state of the keyframe. Only the
+       attributes every player has are stored, so bots keeping state of their
+       own start without it, as do the events of the world.
+    """
+    reader = _Reader(payload)
+    world = game.build_world()
+    game.world = world
+    game.create_players()
+    world.t = tick - 1
+    world.deaths = reader.varint()
+    world.zombie_deaths = reader.varint()
+
+    terrain = world.terrain
+    width = world.size[0]
+    index = 0
+    for _ in range(reader.varint()):
+        index += reader.varint()
+        life = reader.signed()
+        terrain.lives[index] = max(life, 0)
+        if life <= 0:
+            terrain.kinds[index] = 0
+            world.destroyed_terrain.append((index % width, index // width))
+
+    for fighters in (game.players, game.agents):
+        if reader.varint() != len(fighters):
+            raise ReplayFormatError("the keyframe doesn't match the players "
+                                    "of the game")
+        for fighter in fighters:
+            _read_fighter(reader, fighter)
+            fighter.headless = world.headless
+
+    things = []
+    for _ in range(reader.varint()):
+        kind = reader.byte()
+        if kind == KEYFRAME_PLAYER:
+            thing = game.players[reader.varint()]
+        elif kind == KEYFRAME_AGENT:
+            thing = game.agents[reader.varint()]
+        else:
+            thing_class = _keyframe_class(reader.string())
+            thing = _new_thing(thing_class, reader.position(), world.random)
+            thing.life = reader.signed()
+            thing.status = reader.string()
+        world.spawn_thing(thing)
+        things.append(thing)
+
+    pooled = []
+    for _ in range(reader.varint()):
+        thing_class = _keyframe_class(reader.string())
+        for _ in range(reader.varint()):
+            thing = _new_thing(thing_class, None, world.random)
+            thing.life = reader.signed()
+            world.pool.release(thing)
+            pooled.append(thing)
+
+    objects = things + game.players + game.agents + pooled
+    for thing in objects:
+        if isinstance(thing, FightingThing):
+            thing.target_memory = None
+    for _ in range(reader.varint()):
+        thing = objects[reader.varint()]
+        memory = {}
+        for _ in range(reader.varint()):
+            target_class = _keyframe_class(reader.string())
+            target_index = reader.varint()
+            if target_index:
+                target = objects[target_index - 1]
+                chosen_distance = reader.double()
+            else:
+                target, chosen_distance = None, None
+            memory[target_class] = (target, chosen_distance, reader.signed())
+        thing.target_memory = memory
+
+    last_actions = {}
+    for _ in range(reader.varint()):
+        thing = objects[reader.varint()]
+        last_actions[thing] = reader.signed()
+    if game.zombie_scheduler is not None:
+        game.zombie_scheduler.last_actions = last_actions
+
+    world.decoration = {}
+    for _ in range(reader.varint()):
+        thing_class = _keyframe_class(reader.string())
+        position = reader.position()
+        if thing_class is DeadBody:
+            name = reader.string()
+            decoration = DeadBody(name, reader.string(), position)
+        else:
+            decoration = _new_thing(thing_class, position, world.random)
+        world.spawn_thing(decoration)
+
+    for _ in range(reader.varint()):
+        name = reader.string() if reader.byte() else None
+        positions = [reader.position() for _ in range(reader.varint())]
+        region = world.spawn_regions.get(name)
+        if region is None:
+            region = world.add_spawn_region(name)
+        region.positions = positions
+        region.slots = {position: index for index, position in enumerate(positions)}
+
+    # the world draws from the generator of the game
+    version = reader.byte()
+    internal_state = struct.unpack('<%iI' % RANDOM_STATE_SIZE,
+                                   reader.raw(4 * RANDOM_STATE_SIZE))
+    gauss_next = reader.double() if reader.byte() else None
+    game.random.setstate((version, internal_state, gauss_next))
+
+
+def _scheduler_config(scheduler):
+    if scheduler is None:
+        return None
+    return {
+        'near_distance': scheduler.near_distance,
+        'interval': scheduler.interval,
+        'sleep_distance': scheduler.sleep_distance,
+    }
+
+
+def _game_config(game, map_name):
+    # the options changing the game are recorded, the ones only changing how
+    # it's played (like executors) aren't
+    return {
+        'map_name': map_name,
+        'map_size': list(game.map.size),
+        'rules_name': game.rules_name,
+        'player_names': list(game.player_names),
+        'agent_ids': list(game.agent_ids or []),
+        'agent_weapons': list(game.agent_weapons),
+        'initial_zombies': game.initial_zombies,
+        'minimum_zombies': game.minimum_zombies,
+        'action_resolution': game.action_resolution,
+        'targeting': game.targeting,
+        'zombie_scheduler': _scheduler_config(game.zombie_scheduler),
+        'flat_grid': game.flat_grid,
+    }
+
+
+class ReplayRecorder(object):
+    """Records a game into a replay file.
+
+       Usage:
+
+           recorder = ReplayRecorder(game, 'game.zsr', 'bridge', seed=42)
+           recorder.start()  # resets the game using the seed
+           while not game.rules.game_ended():
+               ...  # set the agents actions
+               game.step()
+           recorder.close()
+
+       When a game is being recorded, game.step() must be used to forward the
+       game (it notifies the recorder).
+    """
+    def __init__(self, game, file_path, map_name, seed=None,
+                 keyframe_interval=100, compression_level=9):
+        self.game = game
+        self.file_path = file_path
+        self.map_name = map_name
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.keyframe_interval = keyframe_interval
+        self.compression_level = compression_level
+        self.file = None
+        self.compressor = None
+        self.initial_lives = None
+
+    def start(self):
+        """Reset the game with the seed, and start recording it."""
+        header = {
+            'seed': self.seed,
+            'keyframe_interval': self.keyframe_interval,
+            'config': _game_config(self.game, self.map_name),
+        }
+        header_data = json.dumps(header).encode('utf-8')
+
+        self.file = open(self.file_path, 'wb')
+        self.file.write(MAGIC)
+        self.file.write(struct.pack('<BI', FORMAT_VERSION, len(header_data)))
+        self.file.write(header_data)
+        self.compressor = zlib.compressobj(self.compression_level)
+
+        # the initial state is rebuilt from the seed, so there's no keyframe
+        # for it
+        self.game.reset(self.seed)
+        self.game.recorder = self
+        # the keyframes only have the terrain changed since
+        self.initial_lives = array('i', self.game.world.terrain.lives)
+
+    def _write_record(self, record_type, payload):
+        buf = bytearray([record_type])
+        _write_varint(buf, len(payload))
+        buf.extend(payload)
+        self.file.write(self.compressor.compress(bytes(buf)))
+
+    def _write_keyframe(self, game):
+        buf = bytearray()
+        # the tick the keyframe was taken after
+        _write_varint(buf, game.world.t + 1)
+        buf.extend(encode_keyframe(game, self.initial_lives))
+        self._write_record(RECORD_KEYFRAME, buf)
+
+    def record_tick(self, game):
+        """Record the actions of the tick the game just played."""
+        agent_actions = [getattr(agent, 'action', None)
+                         for agent in game.agents]
+        self._write_record(RECORD_TICK, encode_tick(game.world.t,
+                                                    agent_actions,
+                                                    game.world.last_actions))
+
+        ticks = game.world.t + 1
+        if self.keyframe_interval and ticks % self.keyframe_interval == 0:
+            self._write_keyframe(game)
+
+    def close(self):
+        """Record the result of the game (if ended) and close the file."""
+        if self.file is None:
+            return
+
+        if self.game.rules.game_ended():
+            won, description = self.game.rules.game_won()
+            result = {'won': won, 'description': description}
+        else:
+            result = {'won': None, 'description': None}
+        result['ticks'] = self.game.world.t + 1
+        self._write_record(RECORD_END, json.dumps(result).encode('utf-8'))
+
+        self.file.write(self.compressor.flush())
+        self.file.close()
+        self.file = None
+        self.game.recorder = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+class ReplayTick(object):
+    """The recorded actions of a single tick."""
+    def __init__(self, t, agent_actions, thing_actions, payload):
+        self.t = t
+        self.agent_actions = agent_actions
+        self.thing_actions = thing_actions
+        self.payload = payload
+
+
+class Replay(object):
+    """A recorded game, which can be analysed and re-simulated."""
+    def __init__(self, header, ticks, keyframes, result):
+        self.header = header
+        self.seed = header['seed']
+        self.config = header['config']
+        self.ticks = ticks
+        self.keyframes = keyframes
+        self.result = result
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        if data[:len(MAGIC)] != MAGIC:
+            raise ReplayFormatError('%s is not a zombsole replay' % file_path)
+        offset = len(MAGIC)
+        version, header_size = struct.unpack_from('<BI', data, offset)
+        if version != FORMAT_VERSION:
+            raise ReplayFormatError('unsupported replay format version %i'
+                                    % version)
+        offset += struct.calcsize('<BI')
+        header = json.loads(data[offset:offset + header_size].decode('utf-8'))
+        offset += header_size
+
+        reader = _Reader(zlib.decompress(data[offset:]))
+        ticks = []
+        keyframes = {}
+        result = None
+        while not reader.at_end():
+            record_type = reader.byte()
+            payload = reader.raw(reader.varint())
+            if record_type == RECORD_TICK:
+                ticks.append(cls._decode_tick(payload))
+            elif record_type == RECORD_KEYFRAME:
+                keyframe_reader = _Reader(payload)
+                tick = keyframe_reader.varint()
+                keyframes[tick] = payload[keyframe_reader.offset:]
+            elif record_type == RECORD_END:
+                result = json.loads(payload.decode('utf-8'))
+            else:
+                raise ReplayFormatError('unknown record type %i' % record_type)
+
+        return cls(header, ticks, keyframes, result)
+
+    @staticmethod
+    def _decode_tick(payload):
+        reader = _Reader(payload)
+        t = reader.varint()
+        agent_actions = [decode_agent_action(reader)
+                         for _ in range(reader.varint())]
+        thing_actions = [decode_thing_action(reader)
+                         for _ in range(reader.varint())]
+        return ReplayTick(t, agent_actions, thing_actions, payload)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def build_game(self, renderer=None, **game_options):
+        """Create a game with the recorded configuration (not yet seeded).
+
+           game_options: extra arguments of Game which don't change the
+           game, like an executor.
+        """
+        config = self.config
+        if config['map_name']:
+            map_ = Map.from_map_name(config['map_name'])
+        else:
+            map_ = Map(tuple(config['map_size']), [])
+        map_.size = tuple(config['map_size'])
+
+        game_kwargs = dict(
+            initial_zombies=config['initial_zombies'],
+            minimum_zombies=config['minimum_zombies'],
+            agent_ids=config['agent_ids'],
+            agent_weapons=config['agent_weapons'] or 'rifle',
+            action_resolution=config['action_resolution'],
+            targeting=config['targeting'],
+            flat_grid=config['flat_grid'],
+        )
+        if config['zombie_scheduler'] is not None:
+            from zombsole.scheduling import ZombieScheduler
+            game_kwargs['zombie_scheduler'] = ZombieScheduler(**config['zombie_scheduler'])
+        if renderer is not None:
+            game_kwargs['renderer'] = renderer
+        game_kwargs.update(game_options)
+        return Game(config['rules_name'], config['player_names'], map_,
+                    **game_kwargs)
+
+    def _restore_keyframe(self, game, tick):
+        decode_keyframe(self.keyframes[tick], game, tick)
+
+    def iter_ticks(self, start=0, stop=None, game=None, verify=True):
+        """Re-simulate the game, yielding it after each tick.
+
+           Ticks are numbered from 1 (tick 0 is the initial state). Starting
+           at a tick other than 0 seeks using the closest keyframe.
+        """
+        if stop is None:
+            stop = len(self.ticks)
+        if game is None:
+            game = self.build_game()
+
+        keyframe_ticks = [tick for tick in self.keyframes if tick <= start]
+        if keyframe_ticks:
+            current = max(keyframe_ticks)
+            self._restore_keyframe(game, current)
+        else:
+            current = 0
+            game.reset(self.seed)
+
+        if current == start:
+            yield game
+
+        while current < stop:
+            tick = self.ticks[current]
+            for agent, action in zip(game.agents, tick.agent_actions):
+                agent.set_action(action)
+            game.step()
+            current += 1
+
+            if verify:
+                agent_actions = [getattr(agent, 'action', None)
+                                 for agent in game.agents]
+                payload = encode_tick(game.world.t, agent_actions,
+                                      game.world.last_actions)
+                if bytes(payload) != bytes(tick.payload):
+                    raise ReplayDivergenceError(
+                        'the re-simulation diverged at tick %i' % current)
+
+            if current >= start:
+                yield game
+
+    def seek(self, tick, game=None, verify=True):
+        """Get the game in the state it was after the given tick."""
+        if not 0 <= tick <= len(self.ticks):
+            raise ValueError('tick %i is out of the range of the replay (0 to '
+                             '%i)' % (tick, len(self.ticks)))
+        for game in self.iter_ticks(tick, tick, game=game, verify=verify):
+            pass
+        return game
@@ -0,0 +1,182 @@
+# coding: utf-8
+"""Simultaneous resolution of the actions of a tick.
+
+By default, a world shuffles the actions of a tick and applies them one after
+another, so the result of an action depends on the ones applied before it. In
+the simultaneous mode, all the actions are checked against the state of the
+world at the start of the tick, and resolved at once, independently of their
+order:
+
+- attacks and heals use the positions at the start of the tick (a thing
+  moving away is still hit), and things dying in the tick still act.
+- the damage and the healing received by each thing are added up, and
+  applied at once: the healing first (up to the maximum life of the thing),
+  then the damage.
+- a move succeeds if its destination is free, or left by a thing whose own
+  move succeeds. Moves to a cell contested by several things fail, as do
+  moves in cycles (like two things swapping positions).
+
+The random numbers (damage and healing amounts) are drawn from the generator
+of the world in the order of the actions, which is the order of the things, and the actions aren't shuffled.
+The damage and healing are added up with array operations.
+"""
+
+import numpy as np
+
+from zombsole.core import HEALING_RANGE, Thing
+from zombsole.utils import distance
+
+
+class ActionError(Exception):
+    """An invalid action, reported as an error executing it."""
+    pass
+
+
+class SimultaneousResolver(object):
+    """Resolves all the actions of a tick at once (see the module docs)."""
+    def resolve(self, world, actions):
+        """Apply the actions of a tick, adding their results as events."""
+        events = [None] * len(actions)
+        moves = {}
+        # indexes of the actions, targets and amounts of the damage and heals
+        effects = []
+        for index, (thing, action, parameter) in enumerate(actions):
+            try:
+                if action == 'move':
+                    events[index] = self.check_move(world, thing, parameter, index, moves)
+                elif action in ('attack', 'heal'):
+                    events[index] = self.check_effect(world, thing, action, parameter,
+                                                      index, effects)
+                else:
+                    events[index] = u'unknown action "%s"' % action
+            except Exception as err:
+                events[index] = u'error executing %s action: %s' % (action, str(err))
+                if world.debug:
+                    raise
+
+        self.apply_moves(world, moves, events)
+        self.apply_effects(world, actions, effects, events)
+
+        for (thing, _, _), event in zip(actions, events):
+            world.event(thing, event)
+
+    def check_move(self, world, thing, destination, index, moves):
+        if not isinstance(destination, tuple):
+            raise ActionError(u'Destination of movement should be a tuple or list')
+        if not world.within_bounds(destination):
+            if not world.headless:
+                return u'Tried to move out of bounds to %s' % str(destination)
+        elif distance(thing.position, destination) > 1:
+            return u'tried to walk too fast, but physics forbade it'
+        else:
+            moves[thing] = (index, destination)
+        return None
+
+    def check_effect(self, world, thing, action, target, index, effects):
+        if not isinstance(target, Thing):
+            raise ActionError(u'Target of %s should be a thing' % action)
+        if action == 'attack':
+            if distance(thing.position, target.position) > thing.weapon.max_range:
+                if not world.headless:
+                    event = u'tried to attack %s, but it is too far for a %s'
+                    return event % (target.name, thing.weapon.name)
+                return None
+            amount = world.random.randint(*thing.weapon.damage_range)
+        else:
+            if distance(thing.position, target.position) > HEALING_RANGE:
+                if not world.headless:
+                    return u'tried to heal %s, but it is too far away' % target.name
+                return None
+            amount = world.random.randint(target.MAX_LIFE // 10, target.MAX_LIFE // 4)
+        effects.append((index, target, amount))
+        return None
+
+    def apply_moves(self, world, moves, events):
+        """Apply the successful moves, and add the events of all the moves."""
+        things = world.things
+        contenders = {}
+        for _, destination in moves.values():
+            contenders[destination] = contenders.get(destination, 0) + 1
+
+        # a move succeeds if its destination is free, or left by a thing
+        # moving successfully: the chains of moves are followed until a free
+        # cell (success), a blocked or contested cell, or a cycle (failure)
+        succeeded = {}
+        for thing in moves:
+            chain = []
+            current = thing
+            while True:
+                if current in succeeded:
+                    result = succeeded[current]
+                    break
+                if current in chain:
+                    result = False
+                    break
+                chain.append(current)
+                destination = moves[current][1]
+                occupant = things.get(destination)
+                if contenders[destination] > 1:
+                    result = False
+                    break
+                if occupant is None:
+                    result = True
+                    break
+                if occupant not in moves:
+                    result = False
+                    break
+                current = occupant
+            for link in chain:
+                succeeded[link] = result
+
+        successful = [thing for thing in moves if succeeded[thing]]
+        if not world.headless:
+            for thing, (index, destination) in moves.items():
+                if succeeded[thing]:
+                    events[index] = u'moved to ' + str(destination)
+                elif contenders[destination] > 1:
+                    events[index] = u'tried to move to %s, but it was contested' % str(destination)
+                else:
+                    obstacle = things.get(destination)
+                    events[index] = u'hit %s with his head' % obstacle.name
+
+        # all the things leave their positions before taking the new ones
+        for thing in successful:
+            del things[thing.position]
+            world.vacate(thing.position)
+        for thing in successful:
+            thing.position = moves[thing][1]
+            things[thing.position] = thing
+            world.occupy(thing.position)
+
+    def apply_effects(self, world, actions, effects, events):
+        """Add up the damage and heals of each target, and apply them."""
+        if not effects:
+            return
+        targets = []
+        target_indexes = {}
+        for _, target, _ in effects:
+            if target not in target_indexes:
+                target_indexes[target] = len(targets)
+                targets.append(target)
+
+        indexes = np.array([target_indexes[target] for _, target, _ in effects])
+        amounts = np.array([amount for _, _, amount in effects])
+        is_attack = np.array([actions[index][1] == 'attack' for index, _, _ in effects])
+        damage = np.zeros(len(targets), dtype=np.int64)
+        healing = np.zeros(len(targets), dtype=np.int64)
+        np.add.at(damage, indexes[is_attack], amounts[is_attack])
+        np.add.at(healing, indexes[~is_attack], amounts[~is_attack])
+
+        lives = np.array([target.life for target in targets])
+        max_lives = np.array([target.MAX_LIFE for target in targets])
+        healed = np.where(healing > 0, np.minimum(max_lives, lives + healing), lives)
+        for target, life in zip(targets, (healed - damage).tolist()):
+            target.life = life
+
+        if not world.headless:
+            for index, target, _ in effects:
+                thing, action, _ = actions[index]
+                if action == 'attack':
+                    events[index] = u'injured %s with a %s' % (target.name, thing.weapon.name)
+                else:
+                    events[index] = u'healed ' + target.name
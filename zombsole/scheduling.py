@@ -0,0 +1,67 @@
+# coding: utf-8
+"""Level of detail scheduling of the zombies.
+
+On big maps most zombies are far from any human, and spend their next_step
+wandering around or taking a step towards a far away target. A scheduler
+makes the world ask those zombies for actions less often:
+
+- zombies within near_distance of a human act every tick, as usual.
+- zombies farther away act once every interval ticks (each one on its own
+  ticks, the first time they are seen, and then interval ticks after their
+  last action).
+- zombies farther than sleep_distance (if set) don't act at all, until a human
+  comes within that distance (their wake radius).
+
+A zombie which doesn't act in a tick is simply not asked for an action (no
+idle event). This changes the game: far zombies move slower (or not at all),
+and as they draw fewer random numbers, a seeded game plays differently than
+without a scheduler. Without one (the default), every thing acts every tick.
+The distances are straight line distances (as zombsole.utils.distance).
+"""
+from zombsole.things import Player, Zombie
+
+
+class ZombieScheduler(object):
+    """Chooses the zombies asked for actions in each tick."""
+    def __init__(self, near_distance=20, interval=4, sleep_distance=None):
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        if sleep_distance is not None and sleep_distance < near_distance:
+            raise ValueError("sleep_distance can't be smaller than near_distance")
+        self.near_distance = near_distance
+        self.interval = interval
+        self.sleep_distance = sleep_distance
+        # the last tick each zombie acted in (only for the current zombies)
+        self.last_actions = {}
+
+    def select(self, actors, t):
+        """The actors (in the same order) to ask for actions in the tick t."""
+        humans = [thing.position for thing in actors if isinstance(thing, Player)]
+        near = self.near_distance ** 2
+        sleep = self.sleep_distance ** 2 if self.sleep_distance is not None else None
+
+        selected = []
+        last_actions = {}
+        for thing in actors:
+            if not isinstance(thing, Zombie):
+                selected.append(thing)
+                continue
+
+            x, y = thing.position
+            closest = min([(hx - x) ** 2 + (hy - y) ** 2 for hx, hy in humans],
+                          default=None)
+            last_action = self.last_actions.get(thing)
+            if closest is not None and closest <= near:
+                act = True
+            elif sleep is not None and (closest is None or closest > sleep):
+                act = False
+            else:
+                act = last_action is None or t - last_action >= self.interval
+
+            if act:
+                selected.append(thing)
+                last_action = t
+            if last_action is not None:
+                last_actions[thing] = last_action
+        self.last_actions = last_actions
+        return selected
@@ -0,0 +1,59 @@
+# coding: utf-8
+"""Free cells of the spawn regions of a world.
+
+Spawning used to filter and shuffle every position of a spawn region each
+time. Instead, a world keeps the free cells of each spawn region indexed,
+updated when things spawn, move and die, so spawning k things only samples k
+cells and never looks at the occupied ones.
+"""
+import random
+
+
+class FreeCells(object):
+    """The free positions of a spawn region, with O(1) updates and O(k)
+       sampling."""
+    def __init__(self, positions=()):
+        # the free positions, in no particular order, and the index of each
+        # one in the list
+        self.positions = []
+        self.slots = {}
+        for position in positions:
+            self.add(position)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, position):
+        return position in self.slots
+
+    def add(self, position):
+        """Mark a position of the region as free."""
+        if position not in self.slots:
+            self.slots[position] = len(self.positions)
+            self.positions.append(position)
+
+    def discard(self, position):
+        """Mark a position of the region as occupied."""
+        index = self.slots.pop(position, None)
+        if index is not None:
+            # the last position takes the place of the removed one
+            last = self.positions.pop()
+            if index < len(self.positions):
+                self.positions[index] = last
+                self.slots[last] = index
+
+    def sample(self, count, rng=random):
+        """Up to count distinct random free positions (a partial shuffle),
+           drawn from a random number generator."""
+        positions = self.positions
+        slots = self.slots
+        size = len(positions)
+        count = min(count, size)
+        for index in range(count):
+            other = rng.randrange(index, size)
+            position = positions[other]
+            positions[other] = positions[index]
+            positions[index] = position
+            slots[positions[other]] = other
+            slots[position] = index
+        return positions[:count]
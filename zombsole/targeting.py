@@ -0,0 +1,50 @@
+# coding: utf-8
+"""Sticky targeting of the fighting things.
+
+By default, the fighting things search their closest target every tick. With
+sticky targeting (Game(targeting="sticky"), --targeting in play.py), which changes the
+game, the world gives the fighting things it spawns a target memory.
+
+Finding the closest target means scanning all the things of the world, but
+targets barely move from one tick to the next. Instead, a thing remembers its
+target for each target class (in its target_memory, a dict by class, so a
+thing alternating between attacking zombies and healing players keeps both
+targets), and keeps each one with a cheap check while it's
+still alive and in the world, and not farther than TARGET_HYSTERESIS beyond
+the distance it had when chosen. The closest target is searched again when
+that check fails, and every TARGET_REFRESH_INTERVAL ticks, so a closer target
+is eventually noticed. Not finding any target is remembered too, until the
+next refresh.
+
+This changes the game a little: a thing can keep chasing its target while
+another one gets closer. A TARGET_REFRESH_INTERVAL of 1 (for a class of
+things) searches the closest target every tick, as without a memory.
+"""
+from zombsole.utils import closest, distance
+
+
+def sticky_closest(thing, things, t, target_class, exclude=None):
+    """The target of a thing: the closest of the things of a class (other
+       than exclude), remembered between ticks for each target class if the
+       thing has a target memory."""
+    memory = thing.target_memory
+    remembered = memory.get(target_class) if memory is not None else None
+    if remembered is not None:
+        target, chosen_distance, chosen_tick = remembered
+        if t - chosen_tick < thing.TARGET_REFRESH_INTERVAL:
+            if target is None:
+                return None
+            if (target.life > 0 and
+                    things.get(target.position) is target and
+                    distance(thing, target) <= chosen_distance + thing.TARGET_HYSTERESIS):
+                return target
+
+    candidates = [other for other in things.values()
+                  if isinstance(other, target_class) and other is not exclude]
+    target = closest(thing, candidates)
+    if memory is not None:
+        if target is None:
+            memory[target_class] = (None, None, t)
+        else:
+            memory[target_class] = (target, distance(thing, target), t)
+    return target
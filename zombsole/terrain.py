@@ -0,0 +1,109 @@
+# coding: utf-8
+"""Static terrain of a world, stored as a grid.
+
+Walls and boxes are most of the things of a map, and almost all of them never
+change, so instead of being Thing objects they are stored as a kind and a
+life per cell. A Thing object is only materialized when something needs it
+(like a zombie attacking an obstacle, or an agent healing a box), and it is
+dropped back into the grid at the end of the tick.
+"""
+from array import array
+
+
+class Terrain(object):
+    """Kind and life of the static things in each cell of a world."""
+    def __init__(self, size, headless=False):
+        self.size = size
+        self.headless = headless
+        # kind 0 is an empty cell, other kinds index the thing classes. The
+        # extra last cell, always empty, stands for the positions outside of
+        # the world (see zombsole.grid)
+        cell_count = size[0] * size[1] + 1
+        self.kinds = bytearray(cell_count)
+        self.lives = array('i', bytes(4 * cell_count))
+        self.classes = [None]
+        self.prototypes = [None]
+        self.materialized = {}
+
+    def _index(self, position):
+        """Index of a position in the grid, or None if out of bounds."""
+        x, y = position
+        if 0 <= x < self.size[0] and 0 <= y < self.size[1]:
+            return y * self.size[0] + x
+        return None
+
+    def add(self, thing):
+        """Store a static thing in the grid (the thing itself isn't kept)."""
+        thing_class = type(thing)
+        if thing_class not in self.classes:
+            self.classes.append(thing_class)
+            self.prototypes.append(thing_class(None))
+        index = self._index(thing.position)
+        self.kinds[index] = self.classes.index(thing_class)
+        self.lives[index] = thing.life
+
+    def __contains__(self, position):
+        index = self._index(position)
+        return index is not None and self.kinds[index] != 0
+
+    def kind(self, position):
+        """The class of the static thing in a position, or None."""
+        index = self._index(position)
+        if index is None:
+            return None
+        return self.classes[self.kinds[index]]
+
+    def life(self, position):
+        """The life of the static thing in a position."""
+        thing = self.materialized.get(position)
+        if thing is not None:
+            return thing.life
+        return self.lives[self._index(position)]
+
+    def prototype(self, position):
+        """A shared instance of the class of the static thing in a position,
+           for drawing it. Only its class data is meaningful."""
+        index = self._index(position)
+        if index is None:
+            return None
+        return self.prototypes[self.kinds[index]]
+
+    def get(self, position):
+        """The static thing in a position (materialized if needed), or None."""
+        thing = self.materialized.get(position)
+        if thing is None:
+            index = self._index(position)
+            if index is None or self.kinds[index] == 0:
+                return None
+            thing = self.classes[self.kinds[index]](position)
+            thing.life = self.lives[index]
+            thing.headless = self.headless
+            # if another thread materialized it meanwhile (see
+            # zombsole.executors), that one is kept
+            thing = self.materialized.setdefault(position, thing)
+        return thing
+
+    def positions(self):
+        """The positions of the static things, in row major order."""
+        width = self.size[0]
+        return [(index % width, index // width)
+                for index, kind in enumerate(self.kinds) if kind]
+
+    def drop_materialized(self):
+        """Store the life of the materialized things back in the grid.
+
+           The dead ones are removed from the grid, and returned in row major
+           order.
+        """
+        dead_things = []
+        for position, thing in self.materialized.items():
+            index = self._index(position)
+            if thing.life <= 0:
+                self.kinds[index] = 0
+                self.lives[index] = 0
+                dead_things.append(thing)
+            else:
+                self.lives[index] = thing.life
+        self.materialized = {}
+        dead_things.sort(key=lambda thing: (thing.position[1], thing.position[0]))
+        return dead_things
@@ -2,6 +2,7 @@
 import random
 
 from zombsole.core import Thing, FightingThing
+from zombsole.targeting import sticky_closest
 from zombsole.utils import (
     closest, distance, possible_moves, adjacent_positions, sort_by_distance)
 from zombsole.weapons import ZombieClaws, Knife, Axe, Gun, Rifle, Shotgun
@@ -9,17 +10,22 @@ from zombsole.weapons import ZombieClaws, Knife, Axe, Gun, Rifle, Shotgun
 
 class Box(Thing):
     """Solid box."""
+    __slots__ = ()
+    NAME = u'box'
+    COLOR = 'yellow'
+    TERRAIN = True
     MAX_LIFE = 10
     ICON = u'\u2612'
     ICON_BASIC = u'@'
 
     def __init__(self, position):
-        super(Box, self).__init__(u'box', Box.ICON, Box.ICON_BASIC, 'yellow',
-                                  Box.MAX_LIFE, position)
+        super(Box, self).__init__(Box.NAME, Box.ICON, Box.ICON_BASIC,
+                                  Box.COLOR, Box.MAX_LIFE, position)
 
 
 class DeadBody(Thing):
     """Dead body."""
+    __slots__ = ()
     ICON = u'\u2620'
     ICON_BASIC = u'='
 
@@ -29,57 +35,93 @@ class DeadBody(Thing):
                                        is_decoration=True)
 
 
+class ZombieRemains(DeadBody):
+    """Remains of a zombie, recycled when covered by another decoration."""
+    __slots__ = ()
+    NAME = u'zombie remains'
+    POOLED = True
+
+    def __init__(self, position=None):
+        super(ZombieRemains, self).__init__(ZombieRemains.NAME, Zombie.COLOR,
+                                            position)
+
+
 class ObjectiveLocation(Thing):
     """Objective location."""
+    __slots__ = ()
+    NAME = 'objective'
+    COLOR = 'blue'
     ICON = u'\u2591'
     ICON_BASIC = u'*'
 
     def __init__(self, position):
-        super(ObjectiveLocation, self).__init__('objective',
+        super(ObjectiveLocation, self).__init__(ObjectiveLocation.NAME,
                                                 ObjectiveLocation.ICON,
                                                 ObjectiveLocation.ICON_BASIC,
-                                                'blue', 0, position,
+                                                ObjectiveLocation.COLOR, 0,
+                                                position,
                                                 is_decoration=True)
 
 
 class Wall(Thing):
     """Solid section of wall."""
+    __slots__ = ()
+    NAME = u'wall'
+    COLOR = 'white'
+    TERRAIN = True
     MAX_LIFE = 200
     ICON = u'\u2593'
     ICON_BASIC = u'#'
 
     def __init__(self, position):
-        super(Wall, self).__init__(u'wall', Wall.ICON, Wall.ICON_BASIC,
-                                   'white', Wall.MAX_LIFE, position)
+        super(Wall, self).__init__(Wall.NAME, Wall.ICON, Wall.ICON_BASIC,
+                                   Wall.COLOR, Wall.MAX_LIFE, position)
 
 
 class Zombie(FightingThing):
+    __slots__ = ()
+    NAME = u'zombie'
+    COLOR = 'green'
     MAX_LIFE = 100
     ICON = u'\u2A30'
     ICON_BASIC = u'x'
-
-    def __init__(self, position=None):
-        life = random.randint(Zombie.MAX_LIFE // 2, Zombie.MAX_LIFE)
-
-        dead_decoration = DeadBody('zombie remains', 'green', None)
-
-        super(Zombie, self).__init__(u'zombie', Zombie.ICON, Zombie.ICON_BASIC,
-                                     'green', life, ZombieClaws(), position,
-                                     dead_decoration)
+    # Shared by all the zombies
+    WEAPON = ZombieClaws()
+    # Dead zombies are revived as new ones (see zombsole.pools)
+    POOLED = True
+
+    def __init__(self, position=None, rng=random):
+        super(Zombie, self).__init__(Zombie.NAME, Zombie.ICON,
+                                     Zombie.ICON_BASIC, Zombie.COLOR, 0,
+                                     Zombie.WEAPON, position)
+        self.revive(position, rng)
+
+    def revive(self, position=None, rng=random):
+        """Bring the zombie (back) to life, as a new zombie, with a life
+           drawn from a random number generator (the one of the world, in a
+           game)."""
+        self.life = rng.randint(Zombie.MAX_LIFE // 2, Zombie.MAX_LIFE)
+        self.position = position
+        self.status = u''
+        self.target_memory = None
+
+    def create_dead_decoration(self, pool):
+        """The remains are only created when the zombie dies."""
+        remains = pool.acquire(ZombieRemains)
+        if remains is None:
+            remains = ZombieRemains()
+        return remains
 
     def next_step(self, things, t):
         """Zombies attack if in range, else move in direction of players."""
         action = None
 
-        # possible targets for movement and attack
-        humans = [thing for thing in things.values()
-                  if isinstance(thing, Player)]
+        # target for movement and attack
+        target = sticky_closest(self, things, t, Player)
         positions = possible_moves(self.position, things)
 
-        if humans:
-            # targets available
-            target = closest(self, humans)
-
+        if target is not None:
+            # target available
             if distance(self.position, target.position) < self.weapon.max_range:
                 # target in range, attack
                 action = 'attack', target
@@ -100,21 +142,27 @@ class Zombie(FightingThing):
         else:
             # no targets, just wander around
             if positions:
-                action = 'move', random.choice(positions)
+                action = 'move', things.random.choice(positions)
 
         return action
 
 
 class Player(FightingThing):
+    # Subclasses (the bots) can declare __slots__ too, or keep a __dict__
+    __slots__ = ('rules', 'objectives')
     MAX_LIFE = 100
+    # Bots are run in order, unless they declare that they can be run
+    # concurrently by an executor (see zombsole.executors)
+    CONCURRENT_NEXT_STEP = False
+    TIMED = True
+    # A player created without a weapon gets one of these, from the random
+    # number generator of its world (see World.arm)
+    RANDOM_WEAPONS = (Gun, Shotgun, Rifle, Knife, Axe)
     ICON = u'\u2A30'
     ICON_BASIC = u'P'
 
     def __init__(self, name, color, position=None, weapon=None, rules=None,
                  objectives=None, icon=None, icon_basic=None):
-        if weapon is None:
-            weapon = random.choice([Gun, Shotgun, Rifle, Knife, Axe])()
-
         dead_decoration = DeadBody('dead ' + name, color, None)
 
         local_icon = icon if icon is not None else Player.ICON
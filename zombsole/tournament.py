@@ -0,0 +1,239 @@
+# coding: utf-8
+"""Headless tournaments: many seeded games of a line-up of bots, in parallel.
+
+Each game is played headless (no rendering, no events, no sleeping between
+ticks) until the rules end it, or until max_ticks (the game is then counted
+as capped, neither won nor lost). The games are played with consecutive seeds
+by a pool of processes, in batches, and after each batch the statistics are
+aggregated with 95% confidence intervals:
+
+- win rate: the fraction of games won (Wilson score interval).
+- ticks: the ticks played until the end (or the cap) of the games.
+- survivors: the players alive at the end (or the cap) of the games.
+
+The tournament stops early once the intervals are tight enough: the half
+width of the win rate interval within precision, and the ones of the ticks
+and survivors within precision times their means.
+
+The result of each game is cached on disk, keyed by the configuration, the
+seed and the code version (the version of zombsole and a hash of its sources
+and maps), so playing the same tournament again, or a longer one, only plays
+the games missing.
+"""
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from os import path
+
+from zombsole import __version__
+from zombsole.game import Game, Map
+from zombsole.renderer import NoRender
+
+
+# z for the 95% confidence intervals
+CONFIDENCE_Z = 1.96
+# Games played before the intervals are checked for early stopping
+MIN_GAMES = 20
+DEFAULT_CACHE_DIR = path.join(path.expanduser('~'), '.cache', 'zombsole', 'tournament')
+
+
+def build_map(map_name=None, size=None):
+    """A bundled map (optionally in a bigger world), or an empty world."""
+    if map_name:
+        map_ = Map.from_map_name(map_name)
+        if size:
+            if size[0] < map_.size[0] or size[1] < map_.size[1]:
+                message = "Map (%s) doesn't fit in specified size (%s) " \
+                          "(leave it empty to use best fit)"
+                raise Exception(message % (str(map_.size), str(size)))
+            map_.size = tuple(size)
+        return map_
+    return Map(tuple(size) if size else (30, 10), [])
+
+
+def play_game(config, seed):
+    """Play a seeded game headless, returning its result as a dict."""
+    game = Game(config["rules_name"], config["player_names"],
+                build_map(config.get("map_name"), config.get("size")),
+                initial_zombies=config.get("initial_zombies", 0),
+                minimum_zombies=config.get("minimum_zombies", 0),
+                renderer=NoRender(), headless=True)
+    game.reset(seed=seed)
+    ticks = 0
+    ended = False
+    while ticks < config["max_ticks"]:
+        game.step()
+        ticks += 1
+        if game.rules.game_ended():
+            ended = True
+            break
+    return {
+        "won": ended and game.rules.game_won()[0],
+        "capped": not ended,
+        "ticks": ticks,
+        "survivors": sum(1 for player in game.get_all_players() if player.life > 0),
+    }
+
+
+def wilson_interval(successes, count, z=CONFIDENCE_Z):
+    """Confidence interval of a proportion (Wilson score interval)."""
+    if count == 0:
+        return 0.0, 1.0
+    rate = successes / count
+    denominator = 1 + z ** 2 / count
+    center = (rate + z ** 2 / (2 * count)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / count + z ** 2 / (4 * count ** 2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def mean_interval(values, z=CONFIDENCE_Z):
+    """Mean of some values, and its confidence interval (normal approximation)."""
+    count = len(values)
+    if count == 0:
+        return 0.0, (0.0, 0.0)
+    mean = sum(values) / count
+    if count == 1:
+        return mean, (mean, mean)
+    variance = sum((value - mean) ** 2 for value in values) / (count - 1)
+    half_width = z * math.sqrt(variance / count)
+    return mean, (mean - half_width, mean + half_width)
+
+
+class TournamentStats(object):
+    """Aggregated results of the games of a tournament."""
+    def __init__(self, results):
+        self.games = len(results)
+        self.wins = sum(1 for result in results if result["won"])
+        self.capped = sum(1 for result in results if result["capped"])
+        self.win_rate = self.wins / self.games if self.games else 0.0
+        self.win_rate_interval = wilson_interval(self.wins, self.games)
+        self.ticks, self.ticks_interval = mean_interval(
+            [result["ticks"] for result in results])
+        self.survivors, self.survivors_interval = mean_interval(
+            [result["survivors"] for result in results])
+
+    def is_tight(self, precision):
+        """Are the confidence intervals within the precision?"""
+        def half_width(interval):
+            return (interval[1] - interval[0]) / 2
+
+        return (half_width(self.win_rate_interval) <= precision and
+                half_width(self.ticks_interval) <= precision * max(self.ticks, 1) and
+                half_width(self.survivors_interval) <= precision * max(self.survivors, 1))
+
+    def to_dict(self):
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "capped": self.capped,
+            "win_rate": [self.win_rate] + list(self.win_rate_interval),
+            "ticks": [self.ticks] + list(self.ticks_interval),
+            "survivors": [self.survivors] + list(self.survivors_interval),
+        }
+
+    def format(self):
+        lines = [
+            u'games: %i (%i capped)' % (self.games, self.capped),
+            u'win rate: %.3f [%.3f, %.3f]' % ((self.win_rate,) + self.win_rate_interval),
+            u'ticks: %.1f [%.1f, %.1f]' % ((self.ticks,) + self.ticks_interval),
+            u'survivors: %.2f [%.2f, %.2f]' % ((self.survivors,) + self.survivors_interval),
+        ]
+        return u'\n'.join(lines)
+
+
+def code_version():
+    """The version of zombsole, and a hash of its sources and maps."""
+    digest = blake2b(digest_size=8)
+    root = path.dirname(path.abspath(__file__))
+    for directory, directories, files in os.walk(root):
+        directories.sort()
+        for file_name in sorted(files):
+            if file_name.endswith('.py') or path.basename(directory) == 'maps':
+                file_path = path.join(directory, file_name)
+                digest.update(path.relpath(file_path, root).encode('utf-8'))
+                with open(file_path, 'rb') as source:
+                    digest.update(source.read())
+    return f"{__version__}+{digest.hexdigest()}"
+
+
+class ResultCache(object):
+    """Results of the games of a configuration, by seed, stored in a JSON
+       file per configuration and code version."""
+    def __init__(self, cache_dir, config, version=None):
+        self.version = version or code_version()
+        key = json.dumps({"config": config, "code_version": self.version}, sort_keys=True)
+        self.file_path = path.join(cache_dir, blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.json')
+        self.config = config
+        self.results = {}
+        if path.exists(self.file_path):
+            with open(self.file_path) as cache_file:
+                self.results = {int(seed): result
+                                for seed, result in json.load(cache_file)["results"].items()}
+
+    def get(self, seed):
+        return self.results.get(seed)
+
+    def add(self, seed, result):
+        self.results[seed] = result
+
+    def save(self):
+        os.makedirs(path.dirname(self.file_path), exist_ok=True)
+        temporary_path = self.file_path + '.tmp'
+        with open(temporary_path, 'w') as cache_file:
+            json.dump({"config": self.config, "code_version": self.version,
+                       "results": self.results}, cache_file)
+        os.replace(temporary_path, self.file_path)
+
+
+def run_tournament(config, games, jobs=1, seed=0, precision=None, cache_dir=None,
+                   progress=None):
+    """Play up to games seeded games of a configuration (seeds seed, seed + 1,
+       ...), and return their TournamentStats.
+
+       config: a dict with rules_name, player_names, max_ticks, and optionally
+       map_name, size, initial_zombies and minimum_zombies.
+       jobs: the processes playing the games (1 plays them in this process).
+       precision: stop early once the intervals are this tight (see the
+       module docs), after at least MIN_GAMES games.
+       cache_dir: the directory of the cached results, None to disable it.
+       progress: called with the TournamentStats after each batch of games.
+    """
+    if games < 1:
+        raise ValueError(f"{games} is not a valid number of games, must be at least 1")
+    if jobs < 1:
+        raise ValueError(f"{jobs} is not a valid number of jobs, must be at least 1")
+    cache = ResultCache(cache_dir, config) if cache_dir else None
+    batch_size = max(jobs * 4, MIN_GAMES)
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    results = []
+    try:
+        seeds = list(range(seed, seed + games))
+        while seeds:
+            batch, seeds = seeds[:batch_size], seeds[batch_size:]
+            cached = {seed: cache.get(seed) for seed in batch} if cache else {}
+            missing = [seed for seed in batch if cached.get(seed) is None]
+            if pool is not None:
+                played = pool.map(play_game, [config] * len(missing), missing)
+            else:
+                played = (play_game(config, seed) for seed in missing)
+            for seed, result in zip(missing, played):
+                cached[seed] = result
+                if cache is not None:
+                    cache.add(seed, result)
+            if cache is not None and missing:
+                cache.save()
+            results.extend(cached[seed] for seed in batch)
+
+            stats = TournamentStats(results)
+            if progress is not None:
+                progress(stats)
+            if (precision is not None and stats.games >= MIN_GAMES and
+                    stats.is_tight(precision)):
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return TournamentStats(results)
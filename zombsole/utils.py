@@ -28,7 +28,8 @@ def sort_by_distance(something, others):
 def closest(something, others):
     """Returns the closest other to something (things/positions)."""
     if others:
-        return sort_by_distance(something, others)[0]
+        # the first of the closest ones, as sorting by distance would give
+        return min(others, key=lambda other: distance(something, other))
 
 
 def adjacent_positions(something):
@@ -46,7 +47,12 @@ def adjacent_positions(something):
 
 def possible_moves(something, things):
     """Calculates the possible moves for a thing."""
+    # the things of a world in flat grid mode have precomputed neighbours
+    free_moves = getattr(things, 'free_moves', None)
+    if free_moves is not None:
+        return free_moves(to_position(something))
+
     positions = [position for position in adjacent_positions(something)
-                 if things.get(position) is None]
+                 if position not in things]
 
     return positions
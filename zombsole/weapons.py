@@ -4,14 +4,29 @@ from zombsole.core import Weapon
 
 
 def _new_weapon_class(name, max_range, damage_range):
-    """Create new weapon class."""
+    """Create new weapon class.
+
+       All the instances of the class are the same shared (immutable) weapon.
+    """
     class NewWeapon(Weapon):
+        __slots__ = ()
+        instance = None
+
+        def __new__(cls):
+            if cls.instance is None:
+                cls.instance = super(NewWeapon, cls).__new__(cls)
+                Weapon.__init__(cls.instance, name, max_range, damage_range)
+            return cls.instance
+
         def __init__(self):
-            super(NewWeapon, self).__init__(name,
-                                            max_range,
-                                            damage_range)
+            pass
+
+        def __reduce__(self):
+            return (type(self), ())
 
     NewWeapon.__name__ = name
+    # Allows weapons to be pickled (as in the snapshots of process executors)
+    NewWeapon.__qualname__ = name
     return NewWeapon
 
 
@@ -27,7 +42,9 @@ Shotgun = _new_weapon_class('Shotgun', 3, (75, 100))
 
 class WeaponFactory(object):
     @staticmethod
-    def create_player_weapon(weapon_name):
+    def create_player_weapon(weapon_name, rng=random):
+        """A weapon by name, "random" drawing one from a random number
+           generator."""
         lc_weapon_name = weapon_name.lower()
         if lc_weapon_name == "knife":
             return Knife()
@@ -40,7 +57,7 @@ class WeaponFactory(object):
         elif lc_weapon_name == "shotgun":
             return Shotgun()
         elif lc_weapon_name == "random":
-            return random.choice([Knife(), Axe(), Gun(), Rifle(), Shotgun()])
+            return rng.choice([Knife(), Axe(), Gun(), Rifle(), Shotgun()])
         else:
             raise ValueError(f"{weapon_name} is not a valid player weapon name.  Valid options are knife, axe, gun, rifle, shotgun, and random.")
 